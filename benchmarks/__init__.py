@@ -0,0 +1,9 @@
+"""
+Benchmarks for the velbusaio hot paths
+
+    python -m benchmarks --output results.json --baseline baseline.json
+
+Every benchmark is a coroutine function registered with the benchmark
+decorator, see hotpaths.py. The runner times them, writes the results as
+json and compares them with a baseline from an earlier run.
+"""
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Measure the decode throughput of every registered message class.
+
+For every class a set of valid frames is generated from seeded random data,
+frames that the class refuses are skipped. Each class decodes its frames
+repeatedly; the time per populate call is reported, slowest first. Classes
+using a declarative layout are marked with an asterisk.
+"""
+
+import argparse
+import random
+import time
+
+from velbusaio.command_registry import commandRegistry
+from velbusaio.const import PRIORITY_FIRMWARE, PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.message import ParserError
+
+
+def sample_frames(cls: type, count: int) -> list[tuple]:
+    """Find frames (priority, rtr, data) the class accepts."""
+    rnd = random.Random(cls.__name__)
+    frames = []
+    for _ in range(count * 20):
+        priority = rnd.choice((PRIORITY_LOW, PRIORITY_HIGH, PRIORITY_FIRMWARE))
+        rtr = rnd.random() < 0.1
+        data = bytearray(rnd.getrandbits(8) for _ in range(rnd.randint(0, 8)))
+        if data and rnd.random() < 0.5:
+            # most messages start with a single channel byte
+            data[0] = 1 << rnd.randrange(8)
+        data = bytes(data)
+        try:
+            cls().populate(priority, 1, rtr, data)
+        except ParserError:
+            continue
+        except Exception:
+            # not every hand written message validates its data
+            continue
+        frames.append((priority, rtr, data))
+        if len(frames) == count:
+            break
+    return frames
+
+
+def measure(cls: type, frames: list[tuple], rounds: int) -> float:
+    msg = cls()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for priority, rtr, data in frames:
+            msg.populate(priority, 1, rtr, data)
+    return (time.perf_counter() - start) / (rounds * len(frames))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    results = []
+    skipped = []
+    for cls in {cls for _, cls in commandRegistry.registered_commands()}:
+        frames = sample_frames(cls, args.frames)
+        if not frames:
+            skipped.append(cls.__name__)
+            continue
+        results.append((measure(cls, frames, args.rounds), cls))
+
+    total = 0.0
+    for per_call, cls in sorted(results, key=lambda item: item[0], reverse=True):
+        total += per_call
+        mark = "*" if cls._layout else " "
+        print(f"{mark} {cls.__name__:40} {per_call * 1e9:8.0f} ns")
+    print(
+        f"{len(results)} classes, mean {total / len(results) * 1e9:.0f} ns/decode, "
+        f"{len(results) / total:,.0f} decodes/s"
+    )
+    if skipped:
+        print(f"no valid frame found for: {', '.join(sorted(skipped))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+The hot path benchmarks
+
+raw.*              frame parsing and encoding
+protocol.receive   frames read by the protocol up to its callback
+decode.<class>     populate of every registered message class
+handler.*          PacketHandler.handle of a received frame
+module.<type>      Module.on_message for the messages a module type handles
+channel.*          Channel.update and the status callbacks
+send.*             encoding and queueing a command
+cache.*            writing and reading the module cache
+scan.simulator     a full bus scan against the in-process simulator
+scan.virtual       the same with the real timeouts, on a virtual clock
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import itertools
+import tempfile
+import time
+
+from benchmarks.decode import sample_frames
+from benchmarks.runner import benchmark, register
+from velbusaio import virtual_clock
+from velbusaio.cache import ModuleCache
+from velbusaio.catalog import get_catalog
+from velbusaio.command_registry import commandRegistry
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.message import Message
+from velbusaio.messages.cover_position import CoverPosMessage
+from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
+from velbusaio.messages.set_dimmer import SetDimmerMessage
+from velbusaio.messages.set_led import SetLedMessage
+from velbusaio.messages.switch_relay_on import SwitchRelayOnMessage
+from velbusaio.module import Module
+from velbusaio.protocol import VelbusProtocol
+from velbusaio.raw_message import RawMessage
+from velbusaio.raw_message import create as create_message_info
+from velbusaio.simulator import BusSimulator
+
+VMB4RYLD = 0x10
+ADDRESS = 0x20
+
+_tmp = tempfile.TemporaryDirectory()
+atexit.register(_tmp.cleanup)
+
+
+def _cache_dir() -> str:
+    return tempfile.mkdtemp(dir=_tmp.name)
+
+
+async def _writer(msg: Message) -> None:
+    pass
+
+
+async def _relay_velbus() -> Velbus:
+    velbus = Velbus("", cache_dir=_cache_dir())
+    await velbus._handler.read_protocol_data()
+    velbus._handler._scan_complete = True
+    velbus.add_module(ADDRESS, VMB4RYLD, velbus._handler.pdata.module_type(VMB4RYLD))
+    await velbus.get_module(ADDRESS)._Module__load_default_channels()
+    return velbus
+
+
+def _relay_status(channel: int, on: bool) -> RawMessage:
+    return RawMessage(
+        PRIORITY_LOW,
+        ADDRESS,
+        False,
+        bytes([0xFB, 1 << (channel - 1), 0, int(on), 0, 0, 0, 0]),
+    )
+
+
+@benchmark("raw.create", number=20000)
+async def raw_create(number: int) -> float:
+    frame = bytearray(_relay_status(1, True).to_bytes())
+    start = time.perf_counter()
+    for _ in range(number):
+        create_message_info(frame)
+    return time.perf_counter() - start
+
+
+@benchmark("protocol.receive", number=5000)
+async def protocol_receive(number: int) -> float:
+    """
+    Frames through VelbusProtocol.buffer_updated, read like the transport does
+    """
+    count = 0
+
+    async def on_message(msg: RawMessage) -> None:
+        nonlocal count
+        count += 1
+
+    protocol = VelbusProtocol(message_received_callback=on_message)
+    stream = b"".join(
+        _relay_status(1 + num % 4, True).to_bytes() for num in range(number)
+    )
+    start = time.perf_counter()
+    while stream:
+        buffer = protocol.get_buffer(-1)
+        size = min(len(buffer), len(stream))
+        buffer[:size] = stream[:size]
+        protocol.buffer_updated(size)
+        stream = stream[size:]
+        if count < number:
+            # let the scheduled callbacks run
+            await asyncio.sleep(0)
+    while count < number:
+        await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+@benchmark("raw.to_bytes", number=20000)
+async def raw_to_bytes(number: int) -> float:
+    frame = _relay_status(1, True)
+    start = time.perf_counter()
+    for _ in range(number):
+        frame.to_bytes()
+    return time.perf_counter() - start
+
+
+def _decode_benchmark(cls: type, frames: list[tuple]):
+    async def run(number: int) -> float:
+        msg = cls()
+        rounds = itertools.islice(itertools.cycle(frames), number)
+        start = time.perf_counter()
+        for priority, rtr, data in rounds:
+            msg.populate(priority, 1, rtr, data)
+        return time.perf_counter() - start
+
+    return run
+
+
+def _register_decode() -> None:
+    classes = {cls for _, cls in commandRegistry.registered_commands()}
+    names = set()
+    for cls in sorted(classes, key=lambda cls: (cls.__name__, cls.__module__)):
+        frames = sample_frames(cls, 16)
+        if not frames:
+            continue
+        name = cls.__name__
+        if name in names:
+            name = f"{cls.__module__.rsplit('.', 1)[-1]}.{name}"
+        names.add(name)
+        register(f"decode.{name}", _decode_benchmark(cls, frames), 2000)
+
+
+@benchmark("handler.handle.status", number=5000)
+async def handler_status(number: int) -> float:
+    velbus = await _relay_velbus()
+    frames = [_relay_status(1 + num % 4, num % 8 < 4) for num in range(8)]
+    handle = velbus._handler.handle
+    start = time.perf_counter()
+    for frame in itertools.islice(itertools.cycle(frames), number):
+        await handle(frame)
+    elapsed = time.perf_counter() - start
+    await velbus._cache.close()
+    return elapsed
+
+
+@benchmark("handler.handle.skipped", number=5000)
+async def handler_skipped(number: int) -> float:
+    """
+    A frame no handler wants, the lazy decoding skips it
+    """
+    velbus = await _relay_velbus()
+    # led status
+    frame = RawMessage(PRIORITY_LOW, ADDRESS, False, bytes([0xF4, 0, 0, 0, 0]))
+    handle = velbus._handler.handle
+    start = time.perf_counter()
+    for _ in range(number):
+        await handle(frame)
+    elapsed = time.perf_counter() - start
+    await velbus._cache.close()
+    return elapsed
+
+
+def _module_benchmark(module_type: int, data: dict):
+    # built on the first run
+    messages: list[Message] = []
+
+    async def run(number: int) -> float:
+        module = Module.factory(ADDRESS, module_type, data)
+        module.initialize(_writer)
+        await module._Module__load_default_channels()
+        if not messages:
+            for code, cls in commandRegistry.registered_commands():
+                if commandRegistry.get_command(code, module_type) is not cls:
+                    continue
+                if type(module)._message_handler(cls) is None:
+                    continue
+                for priority, rtr, frame in sample_frames(cls, 4):
+                    msg = cls()
+                    msg.populate(priority, ADDRESS, rtr, frame)
+                    try:
+                        await module.on_message(msg)
+                    except Exception:
+                        # random data the handler does not expect
+                        continue
+                    messages.append(msg)
+        if not messages:
+            return 0.0
+        on_message = module.on_message
+        start = time.perf_counter()
+        for msg in itertools.islice(itertools.cycle(messages), number):
+            await on_message(msg)
+        return time.perf_counter() - start
+
+    return run
+
+
+def _register_modules() -> None:
+    catalog = get_catalog()
+    names = set()
+    for module_type in sorted(catalog.module_types()):
+        data = catalog.module_type(module_type)
+        name = f"module.{data.get('Type', f'{module_type:02X}')}"
+        if name in names:
+            # some types share a name
+            name = f"{name}.{module_type:02X}"
+        names.add(name)
+        register(name, _module_benchmark(module_type, data), 1000)
+
+
+def _channel_benchmark(callbacks: int, change: bool):
+    async def run(number: int) -> float:
+        velbus = await _relay_velbus()
+        relay = velbus.get_module(ADDRESS).get_channels()[1]
+        relay._module._module_cache = None
+        for _ in range(callbacks):
+            relay.on_status_update(_callback)
+        updates = [{"on": True}, {"on": False}] if change else [{"on": True}]
+        start = time.perf_counter()
+        for data in itertools.islice(itertools.cycle(updates), number):
+            await relay.update(data)
+        return time.perf_counter() - start
+
+    return run
+
+
+async def _callback() -> None:
+    pass
+
+
+register("channel.update.unchanged", _channel_benchmark(10, False), 10000)
+register("channel.update.fanout1", _channel_benchmark(1, True), 10000)
+register("channel.update.fanout10", _channel_benchmark(10, True), 10000)
+
+
+def _command(cls: type, **attrs) -> Message:
+    msg = cls(ADDRESS)
+    for attr, value in attrs.items():
+        setattr(msg, attr, value)
+    return msg
+
+
+def _send_encode_benchmark(msg: Message):
+    async def run(number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            RawMessage(
+                msg.priority, msg.address, msg.rtr, msg.data_to_binary()
+            ).to_bytes()
+        return time.perf_counter() - start
+
+    return run
+
+
+for _msg in (
+    _command(SwitchRelayOnMessage, relay_channels=[1, 2]),
+    _command(SetDimmerMessage, dimmer_channels=[1], dimmer_state=50),
+    _command(CoverPosMessage, channel=1, position=40),
+    _command(ModuleStatusRequestMessage, channels=[1, 2, 3, 4]),
+    _command(SetLedMessage, leds=[1]),
+):
+    register(f"send.encode.{type(_msg).__name__}", _send_encode_benchmark(_msg), 20000)
+
+
+@benchmark("send.queue", number=10000)
+async def send_queue(number: int) -> float:
+    """
+    Velbus.send up to the send queue
+    """
+    velbus = Velbus("", cache_dir=_cache_dir())
+    msg = _command(SwitchRelayOnMessage, relay_channels=[1])
+    start = time.perf_counter()
+    for _ in range(number):
+        await velbus.send(msg)
+    return time.perf_counter() - start
+
+
+async def _cached_modules(cache_dir: str, modules: int) -> ModuleCache:
+    velbus = Velbus("", cache_dir=cache_dir)
+    await velbus._handler.read_protocol_data()
+    await velbus._cache.load()
+    for address in range(1, modules + 1):
+        velbus.add_module(
+            address, VMB4RYLD, velbus._handler.pdata.module_type(VMB4RYLD)
+        )
+        module = velbus.get_module(address)
+        await module._Module__load_default_channels()
+        module._name = f"Module {address}"
+        velbus._cache.mark_dirty(module)
+    return velbus._cache
+
+
+@benchmark("cache.save", number=5)
+async def cache_save(number: int) -> float:
+    """
+    Write 50 modules
+    """
+    elapsed = 0.0
+    for _ in range(number):
+        cache = await _cached_modules(_cache_dir(), 50)
+        start = time.perf_counter()
+        await cache.flush()
+        elapsed += time.perf_counter() - start
+        await cache.close()
+    return elapsed
+
+
+@benchmark("cache.load", number=5)
+async def cache_load(number: int) -> float:
+    """
+    Read 50 modules
+    """
+    cache_dir = _cache_dir()
+    await (await _cached_modules(cache_dir, 50)).close()
+    elapsed = 0.0
+    for _ in range(number):
+        cache = ModuleCache(cache_dir)
+        start = time.perf_counter()
+        await cache.load()
+        elapsed += time.perf_counter() - start
+        await cache.close()
+    return elapsed
+
+
+# the modules on the simulated bus
+SCAN_MODULES = {
+    0x01: 0x10,
+    0x02: 0x05,
+    0x03: 0x1D,
+    0x04: 0x22,
+    0x05: 0x23,
+    0x06: 0x1E,
+}
+
+
+@benchmark("scan.simulator", number=1)
+async def scan_simulator(number: int) -> float:
+    """
+    Scan all addresses, with a short timeout for the empty ones
+
+    The simulator answers at once and the send pacing is off, so this
+    measures the work of the library, not the bus.
+    """
+    import velbusaio.handler
+    import velbusaio.protocol
+
+    timeout = velbusaio.handler.SCAN_MODULETYPE_TIMEOUT
+    sleep_time = velbusaio.protocol.SLEEP_TIME
+    velbusaio.handler.SCAN_MODULETYPE_TIMEOUT = 2
+    velbusaio.protocol.SLEEP_TIME = 0
+    elapsed = 0.0
+    try:
+        for _ in range(number):
+            simulator = BusSimulator(SCAN_MODULES, speed=0)
+            port = await simulator.serve_tcp()
+            velbus = Velbus(f"127.0.0.1:{port}", cache_dir=_cache_dir())
+            start = time.perf_counter()
+            await velbus.connect()
+            elapsed += time.perf_counter() - start
+            await velbus.stop()
+            await simulator.close()
+    finally:
+        velbusaio.handler.SCAN_MODULETYPE_TIMEOUT = timeout
+        velbusaio.protocol.SLEEP_TIME = sleep_time
+    return elapsed
+
+
+@benchmark("scan.virtual", number=1)
+async def scan_virtual(number: int) -> float:
+    """
+    Scan all addresses with the real timeouts and pacing, on virtual time
+    """
+    loop = asyncio.get_running_loop()
+    elapsed = 0.0
+    for _ in range(number):
+        start = time.perf_counter()
+        # a virtual clock loop of its own, in another thread
+        await loop.run_in_executor(
+            None, virtual_clock.run, virtual_clock.measure_scan(SCAN_MODULES)
+        )
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+_register_decode()
+_register_modules()
@@ -0,0 +1,182 @@
+"""
+Benchmark runner
+
+A benchmark is a coroutine function that gets the number of operations to
+run and returns the seconds they took, without its setup. It runs repeat
+times, the fastest run counts, like timeit does. The results are written as
+json; with a baseline every benchmark that got slower than the threshold is
+reported as a regression and the runner exits with status 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable
+
+BenchmarkFunc = Callable[[int], Awaitable[float]]
+
+# name => (function, number of operations per run)
+BENCHMARKS: dict[str, tuple[BenchmarkFunc, int]] = {}
+
+# a benchmark is a regression when it is this much slower than the baseline
+THRESHOLD = 0.2
+
+
+def register(name: str, func: BenchmarkFunc, number: int) -> None:
+    if name in BENCHMARKS:
+        raise ValueError(f"Benchmark {name} is registered twice")
+    BENCHMARKS[name] = (func, number)
+
+
+def benchmark(
+    name: str, number: int = 1000
+) -> Callable[[BenchmarkFunc], BenchmarkFunc]:
+    """
+    Register a benchmark function
+    """
+
+    def decorator(func: BenchmarkFunc) -> BenchmarkFunc:
+        register(name, func, number)
+        return func
+
+    return decorator
+
+
+def select(patterns: list[str] | None) -> list[str]:
+    """
+    The benchmark names matching any of the glob patterns
+    """
+    if not patterns:
+        return list(BENCHMARKS)
+    return [
+        name
+        for name in BENCHMARKS
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+async def run(names: list[str], repeat: int = 5, scale: float = 1.0) -> dict:
+    """
+    Run the benchmarks, returns name => result
+    """
+    results = {}
+    for name in names:
+        func, number = BENCHMARKS[name]
+        number = max(1, int(number * scale))
+        times = [await func(number) for _ in range(repeat)]
+        best = min(times) / number
+        results[name] = {
+            "per_op": best,
+            "median": statistics.median(times) / number,
+            "ops_per_sec": 1 / best if best else None,
+            "number": number,
+            "repeat": repeat,
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list[dict]:
+    """
+    Compare the results with the baseline results, both name => result
+
+    change is the relative change of the time per operation, positive is
+    slower.
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["per_op"]
+        after = result["per_op"]
+        change = (after - before) / before if before else 0.0
+        rows.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def _metadata() -> dict:
+    try:
+        from importlib.metadata import version
+
+        package = version("velbus-aio")
+    except Exception:
+        package = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "velbusaio": package,
+    }
+
+
+def _format(per_op: float) -> str:
+    for unit, factor in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if per_op * factor >= 1:
+            return f"{per_op * factor:8.2f} {unit}"
+    return f"{per_op * 1e9:8.0f} ns"
+
+
+def main() -> None:
+    # importing registers the benchmarks
+    importlib.import_module("benchmarks.hotpaths")
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "pattern", nargs="*", help="Glob patterns of the benchmarks to run"
+    )
+    parser.add_argument("--list", action="store_true", help="List the benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Factor for the number of operations"
+    )
+    parser.add_argument("--output", help="Write the results to this json file")
+    parser.add_argument("--baseline", help="Results json file to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    names = select(args.pattern)
+    if args.list:
+        for name in names:
+            print(name)
+        return
+    results = asyncio.run(run(names, args.repeat, args.scale))
+    report = {"meta": _metadata(), "results": results}
+    for name, result in results.items():
+        print(f"{name:50} {_format(result['per_op'])}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as fl:
+            baseline = json.load(fl)["results"]
+        report["comparison"] = compare(results, baseline, args.threshold)
+        print()
+        for row in report["comparison"]:
+            mark = "REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:50} {row['change']:+8.1%} {mark}")
+            if row["regression"]:
+                regressions.append(row["name"])
+    if args.output:
+        with open(args.output, "w") as fl:
+            json.dump(report, fl, indent=2)
+    if regressions:
+        print(f"{len(regressions)} regressions", file=sys.stderr)
+        sys.exit(1)
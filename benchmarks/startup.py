@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Measure the import time of the controller and the time needed to get the
+protocol data on the first connect.
+
+The message classes are imported on first use (lazy), the eager mode imports
+all of them up front, like importing velbusaio.messages used to do.
+
+Every measurement runs in a fresh interpreter, so nothing is shared between
+runs except the compiled protocol catalog on disk.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MEASURE = """
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+from velbusaio.controller import Velbus
+from velbusaio.handler import PacketHandler
+if sys.argv[1] == "eager":
+    from velbusaio.command_registry import commandRegistry
+    commandRegistry.load_all()
+t1 = time.perf_counter()
+async def main():
+    ph = PacketHandler(None)
+    await ph.read_protocol_data()
+    for typ in (0x08, 0x0E, 0x20, 0x28, 0x45):
+        ph.pdata["ModuleTypes"][f"{typ:02X}"]
+asyncio.run(main())
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "protocol": t2 - t1}))
+"""
+
+
+def measure(runs: int, mode: str) -> dict:
+    results: dict = {"import": [], "protocol": []}
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", MEASURE, mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        for key, val in json.loads(out.stdout).items():
+            results[key].append(val * 1000)
+    return {key: statistics.median(val) for key, val in results.items()}
+
+
+parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+parser.add_argument("--runs", help="Number of runs", type=int, default=10)
+args = parser.parse_args()
+
+for mode in ("lazy", "eager"):
+    for name, val in measure(args.runs, mode).items():
+        print(f"{mode:<6} {name:<10} {val:8.2f} ms (median)")
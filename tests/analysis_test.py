@@ -0,0 +1,81 @@
+import pytest
+
+from velbusaio.analysis import analyse
+from velbusaio.capture import RX, TX, CaptureWriter
+from velbusaio.const import PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.raw_message import RawMessage
+
+pytest.importorskip("numpy")
+
+
+def _status(address: int) -> bytes:
+    return RawMessage(PRIORITY_LOW, address, False, bytes([0xFB, 1, 0, 1])).to_bytes()
+
+
+def _request(address: int) -> bytes:
+    return RawMessage(PRIORITY_HIGH, address, True, b"").to_bytes()
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    for num in range(100):
+        writer.write(TX, _request(1 + num % 4))
+        writer.write(RX, _status(1 + num % 4))
+    corrupt = bytearray(_status(9))
+    corrupt[-2] ^= 0xFF
+    writer.write(RX, bytes(corrupt))
+    writer.close()
+    return path
+
+
+def test_capture(capture):
+    report = analyse([capture], workers=1)
+    assert report["frames"] == 200
+    assert report["rx"] == 100
+    assert report["tx"] == 100
+    assert report["errors"]["checksum"] == 1
+    assert sorted(report["addresses"]) == [1, 2, 3, 4]
+    assert report["addresses"][1] == {"rx": 25, "tx": 25, "commands": {0xFB: 25}}
+    assert report["commands"] == {0xFB: 100}
+    assert report["intervals"]["count"] == 200
+
+
+def test_chunks_in_a_process_pool(capture):
+    single = analyse([capture], workers=1)
+    pooled = analyse([capture], workers=2, chunk_size=7)
+    assert pooled == single
+
+
+def test_raw_dump(tmp_path):
+    path = tmp_path / "dump.bin"
+    corrupt = bytearray(_status(9))
+    corrupt[-2] ^= 0xFF
+    data = b"\x0f\x00garbage" + _status(1) + bytes(corrupt) + _request(2) + _status(3)
+    path.write_bytes(data * 10)
+    for chunk_size in (len(data) * 10, 13):
+        report = analyse([str(path)], raw=True, workers=1, chunk_size=chunk_size)
+        assert report["frames"] == 30
+        assert report["errors"]["checksum"] == 10
+        assert report["garbage_bytes"] == 10 * (9 + len(corrupt))
+        assert sorted(report["addresses"]) == [1, 2, 3]
+        assert report["commands"] == {0xFB: 20}
+
+
+def test_discarded_records(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    writer.write(RX, _status(1))
+    corrupt = bytearray(_status(9))
+    corrupt[-2] ^= 0xFF
+    writer.write_discarded(bytes(corrupt))
+    writer.write_discarded(b"garbage")
+    writer.write(RX, _status(2))
+    writer.close()
+    report = analyse([path], workers=1)
+    assert report["frames"] == 2
+    assert report["errors"]["checksum"] == 1
+    assert report["errors"]["start"] == 1
+    assert report["garbage_bytes"] == len(corrupt) + len(b"garbage")
+    assert report["intervals"]["count"] == 1
@@ -0,0 +1,87 @@
+import pytest
+
+from velbusaio.batch import build_frames
+from velbusaio.const import PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.messages.module_status import ModuleStatusMessage
+from velbusaio.messages.relay_status import RelayStatusMessage
+from velbusaio.messages.set_dimmer import SetDimmerMessage, SetDimmerMessage2
+from velbusaio.messages.switch_relay_on import SwitchRelayOnMessage
+
+VMB6IN = 0x05
+VMB4RYLD = 0x10
+
+MODULES = {0x20: VMB4RYLD, 0x21: VMB4RYLD, 0x30: VMB6IN}
+
+
+def _sent(velbus: Velbus) -> list:
+    queue = velbus._protocol._send_queue
+    return [queue.get_nowait()[0] for _ in range(queue.qsize())]
+
+
+@pytest.mark.asyncio
+async def test_one_frame_per_module_and_command(tmp_path, add_modules):
+    velbus = await add_modules(Velbus("", cache_dir=str(tmp_path)), MODULES)
+    first = velbus.get_channels(0x20)
+    second = velbus.get_channels(0x21)
+    buttons = velbus.get_channels(0x30)
+    actions = [
+        (buttons[1], "set_led_state", "on"),
+        (buttons[2], "set_led_state", "on"),
+        *[(first[num], "turn_on") for num in (1, 2, 3)],
+        (first[4], "turn_off"),
+        *[(second[num], "turn_on") for num in (1, 2, 3, 4)],
+    ]
+    assert await velbus.batch(actions) == 4
+
+    frames = [(f.priority, f.address, f.data) for f in _sent(velbus)]
+    assert frames == [
+        # the relays go first
+        (PRIORITY_HIGH, 0x20, bytes([0x02, 0b0111])),
+        (PRIORITY_HIGH, 0x20, bytes([0x01, 0b1000])),
+        (PRIORITY_HIGH, 0x21, bytes([0x02, 0b1111])),
+        (PRIORITY_LOW, 0x30, bytes([0xF6, 0b0011])),
+    ]
+    # the led state is set like set_led_state does
+    assert buttons[1].is_on()
+
+
+@pytest.mark.asyncio
+async def test_unsupported_action(tmp_path, add_modules):
+    velbus = await add_modules(Velbus("", cache_dir=str(tmp_path)), MODULES)
+    with pytest.raises(ValueError):
+        await velbus.batch([(velbus.get_channels(0x20)[1], "press")])
+    assert _sent(velbus) == []
+
+
+def test_channel_mask():
+    # a single bitmask field holds several channels
+    assert SwitchRelayOnMessage.channel_mask == "relay_channels"
+    assert SetDimmerMessage.channel_mask == "dimmer_channels"
+    # a channel number, or several masks
+    assert SetDimmerMessage2.channel_mask is None
+    assert RelayStatusMessage.channel_mask is None
+    assert ModuleStatusMessage.channel_mask is None
+
+
+class _Dimmer:
+    def __init__(self, message: type, num: int) -> None:
+        self._message = message
+        self._num = num
+
+    def _set_dimmer_state_message(self, state: int) -> SetDimmerMessage:
+        msg = self._message(0x40)
+        msg.dimmer_channels = [self._num]
+        msg.dimmer_state = state
+        return msg
+
+
+def test_single_channel_messages_are_kept():
+    actions = [
+        (_Dimmer(SetDimmerMessage, num), "set_dimmer_state", 50) for num in (1, 2)
+    ]
+    assert [msg.dimmer_channels for msg in build_frames(actions)] == [[1, 2]]
+    actions = [
+        (_Dimmer(SetDimmerMessage2, num), "set_dimmer_state", 50) for num in (1, 2)
+    ]
+    assert [msg.dimmer_channels for msg in build_frames(actions)] == [[1], [2]]
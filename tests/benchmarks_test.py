@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks import runner
+
+
+def test_compare():
+    baseline = {"fast": {"per_op": 1.0}, "slow": {"per_op": 1.0}}
+    results = {
+        "fast": {"per_op": 1.1},
+        "slow": {"per_op": 1.5},
+        "new": {"per_op": 1.0},
+    }
+    rows = {row["name"]: row for row in runner.compare(results, baseline)}
+    assert sorted(rows) == ["fast", "slow"]
+    assert not rows["fast"]["regression"]
+    assert rows["slow"]["regression"]
+    assert rows["slow"]["change"] == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_run(monkeypatch):
+    calls = []
+
+    async def func(number):
+        calls.append(number)
+        return number * 0.001
+
+    monkeypatch.setattr(runner, "BENCHMARKS", {})
+    runner.register("test.one", func, 100)
+    runner.register("other", func, 100)
+    with pytest.raises(ValueError):
+        runner.register("other", func, 100)
+    assert runner.select(["test.*"]) == ["test.one"]
+
+    results = await runner.run(["test.one"], repeat=3, scale=0.5)
+    assert calls == [50, 50, 50]
+    assert results["test.one"]["per_op"] == pytest.approx(0.001)
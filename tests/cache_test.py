@@ -0,0 +1,178 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from velbusaio.cache import ModuleCache
+from velbusaio.catalog import get_catalog
+from velbusaio.module import Module
+from velbusaio.store import MIGRATIONS, SCHEMA_VERSION, STORE_FILE, CacheStore
+
+VMB4RYLD = 0x10
+
+
+def _module(address: int, cache: ModuleCache) -> Module:
+    module = Module(
+        address,
+        VMB4RYLD,
+        get_catalog().module_type(VMB4RYLD),
+        serial=1234,
+        memorymap=1,
+        build_year=21,
+        build_week=14,
+    )
+    module.initialize(None, cache)
+    module._name = f"module {address}"
+    return module
+
+
+@pytest.mark.asyncio
+async def test_debounced_write(tmp_path):
+    cache = ModuleCache(str(tmp_path), delay=0.05)
+    await cache.load()
+    first = _module(1, cache)
+    second = _module(2, cache)
+    for _ in range(10):
+        first._cache()
+        second._cache()
+    # nothing is written on the event loop
+    assert cache.stats()["pending"] == 2
+
+    await asyncio.sleep(0.2)
+    stats = cache.stats()
+    assert stats["writes"] == 2
+    assert stats["flushes"] == 1
+    assert stats["pending"] == 0
+    assert stats["max_flush_latency"] >= stats["last_flush_latency"] > 0
+    await cache.close()
+
+    store = CacheStore(str(tmp_path))
+    store.open()
+    records = store.load_all()
+    assert sorted(records) == [1, 2]
+    assert records[1]["name"] == "module 1"
+    assert records[1]["serial"] == 1234
+
+
+@pytest.mark.asyncio
+async def test_flush_on_close_and_reload(tmp_path):
+    cache = ModuleCache(str(tmp_path), delay=60)
+    await cache.load()
+    module = _module(3, cache)
+    await module._Module__load_default_channels()
+    module._sub_address = {1: 4}
+    await module._channels[1].update({"on": True})
+    module._cache()
+    await cache.close()
+    assert cache.stats()["writes"] == 1
+
+    cache = ModuleCache(str(tmp_path))
+    await cache.load()
+    record = cache.get(3)
+    assert record["sub_addresses"] == {1: 4}
+    assert record["build_week"] == 14
+    # the state is only kept in the journal
+    assert "state" not in record["channels"][1]
+
+    # the journal state comes back when loading the module
+    module = _module(3, cache)
+    module._request_module_status = _noop
+    await module.load(from_cache=True)
+    assert module.get_name() == "module 3"
+    assert module._channels[1].is_on() is True
+    await cache.close()
+
+
+async def _noop() -> None:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_forget(tmp_path):
+    cache = ModuleCache(str(tmp_path), delay=60)
+    await cache.load()
+    _module(5, cache)._cache()
+    await cache.flush()
+    cache.forget(5)
+    assert cache.get(5) is None
+    await cache.close()
+    cache = ModuleCache(str(tmp_path))
+    await cache.load()
+    assert cache.is_empty()
+    await cache.close()
+
+
+def test_json_migration(tmp_path):
+    legacy = {"name": "Kitchen", "channels": {"1": {"name": "Light", "type": "Relay"}}}
+    (tmp_path / "7.json").write_text(json.dumps(legacy))
+    (tmp_path / "other.json").write_text("{}")
+    store = CacheStore(str(tmp_path))
+    store.open()
+    records = store.load_all()
+    assert list(records) == [7]
+    assert records[7]["name"] == "Kitchen"
+    assert records[7]["channels"][1]["name"] == "Light"
+    store.close()
+
+    # the json files are only imported once
+    (tmp_path / "8.json").write_text(json.dumps(legacy))
+    store = CacheStore(str(tmp_path))
+    store.open()
+    assert list(store.load_all()) == [7]
+    store.close()
+
+
+def test_unusable_store(tmp_path):
+    (tmp_path / STORE_FILE).write_bytes(b"this is not a database")
+    store = CacheStore(str(tmp_path))
+    store.open()
+    assert store.load_all() == {}
+    store.close()
+    conn = sqlite3.connect(tmp_path / STORE_FILE)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+    assert (tmp_path / f"{STORE_FILE}.corrupt").exists()
+
+
+def test_schema_upgrade(tmp_path):
+    conn = sqlite3.connect(tmp_path / STORE_FILE)
+    with conn:
+        for statement in MIGRATIONS[1]:
+            conn.execute(statement)
+        conn.execute("PRAGMA user_version = 1")
+        conn.execute("INSERT INTO modules (address) VALUES (7)")
+        conn.execute("INSERT INTO channels VALUES (7, 1, 'Relay', 'Light', NULL, '{}')")
+        conn.execute("INSERT INTO meta VALUES ('json_import', '1')")
+    conn.close()
+    store = CacheStore(str(tmp_path))
+    store.open()
+    assert store.load_all()[7]["channels"] == {1: {"name": "Light", "type": "Relay"}}
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_validate_identity(tmp_path):
+    cache = ModuleCache(str(tmp_path), delay=60)
+    await cache.load()
+    for address in (1, 2):
+        _module(address, cache)._cache()
+    await cache.flush()
+    # a cache from the json files has no identity
+    cache._records[3] = {"name": "legacy", "channels": {}}
+
+    assert cache.validate(_module(1, cache)) == []
+    assert cache.get(1) is not None
+    assert cache.validate(_module(3, cache)) == []
+
+    swapped = _module(2, cache)
+    swapped.serial = 999
+    swapped.build_week = 30
+    reasons = [
+        "serial changed from 1234 to 999",
+        "build_week changed from 14 to 30",
+    ]
+    assert cache.validate(swapped) == reasons
+    assert cache.get(2) is None
+    assert cache.invalidations() == {2: reasons}
+    await cache.close()
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+
+from velbusaio.capture import (
+    DISCARDED,
+    HEADER,
+    RECORD,
+    RX,
+    TX,
+    CaptureWriter,
+    _replay,
+    capture_files,
+    read_capture,
+    replay,
+)
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.raw_message import RawMessage
+from velbusaio.simulator import BusSimulator
+from velbusaio.virtual_clock import connect, run
+
+VMB4RYLD = 0x10
+
+
+def _frame(address: int) -> bytes:
+    return RawMessage(PRIORITY_LOW, address, False, bytes([0xFB, 1, 0, 1])).to_bytes()
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path, max_bytes=HEADER.size + 3 * RECORD.size, backups=2)
+    for address in range(1, 11):
+        writer.write(RX, _frame(address))
+    writer.close()
+    assert writer.stats()["rotations"] == 3
+    files = capture_files(path)
+    assert files == [path + ".2", path + ".1", path]
+    records = [record for name in files for record in read_capture(name)]
+    # the oldest file was dropped
+    assert [record.frame for record in records] == [
+        _frame(address) for address in range(4, 11)
+    ]
+
+
+def test_existing_capture_is_kept(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    for address in (1, 2):
+        writer = CaptureWriter(path, backups=2)
+        writer.write(RX, _frame(address))
+        writer.close()
+    assert capture_files(path) == [path + ".1", path]
+    assert [record.frame for record in read_capture(path + ".1")] == [_frame(1)]
+    assert [record.frame for record in read_capture(path)] == [_frame(2)]
+
+
+def test_capture_and_replay(tmp_path):
+    path = str(tmp_path / "capture.bin")
+
+    async def record():
+        simulator = BusSimulator({0x20: VMB4RYLD}, speed=0)
+        velbus = Velbus("", cache_dir=str(tmp_path / "live"))
+        velbus.start_capture(path)
+        await connect(velbus, simulator)
+        await velbus.get_module(0x20).get_channels()[2].turn_on()
+        await asyncio.sleep(1)
+        stats = velbus.capture_stats()
+        await velbus.stop()
+        await simulator.close()
+        return stats
+
+    stats = run(record())
+    records = list(read_capture(path))
+    assert stats["records"] == len(records)
+    sent = [record.frame for record in records if record.direction == TX]
+    # the module type request of the scan and the relay command
+    assert any(frame[2] == 0x20 and frame[3] & 0x40 for frame in sent)
+    assert any(frame[2] == 0x20 and frame[4] == 0x02 for frame in sent)
+    assert any(record.direction == RX for record in records)
+
+    async def check():
+        velbus = Velbus("", cache_dir=str(tmp_path / "replay"))
+        result = await replay(velbus, [path], speed=0)
+        relay = velbus.get_module(0x20).get_channels()[2]
+        await velbus.stop()
+        return result, relay.is_on()
+
+    result, on = run(check())
+    assert result["modules"] == 1
+    assert result["frames"] == len([r for r in records if r.direction == RX])
+    assert on
+
+
+def test_discarded_bytes(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    garbage = b"\x01\x02\x03"
+
+    async def record():
+        simulator = BusSimulator({0x20: VMB4RYLD})
+        velbus = Velbus("", cache_dir=str(tmp_path / "live"))
+        velbus.start_capture(path)
+        await connect(velbus, simulator, scan=False)
+        velbus._protocol.transport.feed(garbage + _frame(0x20))
+        await asyncio.sleep(1)
+        await velbus.stop()
+        await simulator.close()
+
+    run(record())
+    records = list(read_capture(path))
+    assert [(r.direction, r.frame) for r in records] == [
+        (DISCARDED, garbage),
+        (RX, _frame(0x20)),
+    ]
+
+    async def check():
+        velbus = Velbus("", cache_dir=str(tmp_path / "replay"))
+        result = await replay(velbus, [path], speed=0)
+        await velbus.stop()
+        return result
+
+    result = run(check())
+    assert result["frames"] == 1
+    assert result["errors"] == 1
+    assert result["discarded_bytes"] == len(garbage)
+
+
+def _tree(path) -> dict:
+    return {
+        str(name.relative_to(path)): name.read_bytes()
+        for name in sorted(path.rglob("*"))
+        if name.is_file()
+    }
+
+
+def test_replay_leaves_the_cache_alone(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    cache_dir = tmp_path / "live"
+
+    async def record():
+        simulator = BusSimulator({0x20: VMB4RYLD}, speed=0)
+        velbus = Velbus("", cache_dir=str(cache_dir))
+        velbus.start_capture(path)
+        await connect(velbus, simulator)
+        await velbus.get_module(0x20).get_channels()[2].turn_on()
+        await asyncio.sleep(1)
+        await velbus.stop()
+        await simulator.close()
+
+    run(record())
+    before = _tree(cache_dir)
+    assert before
+    args = argparse.Namespace(file=path, cache_dir=str(cache_dir), speed=0, tx=True)
+    result = run(_replay(args))
+    assert result["modules"] == 1
+    assert _tree(cache_dir) == before
@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from velbusaio import catalog
+from velbusaio.catalog import (
+    PROTOCOL_FILE,
+    ProtocolCatalog,
+    _load_catalog,
+    compile_catalog,
+    get_catalog,
+    get_catalog_file,
+    load_catalog,
+)
+
+
+@pytest.fixture()
+def protocol_data():
+    with open(PROTOCOL_FILE) as fl:
+        return json.load(fl)
+
+
+def test_compiled_catalog_matches_protocol(protocol_data):
+    cat = ProtocolCatalog(compile_catalog())
+    assert cat.loaded_module_types() == []
+    assert cat.module_type(0x08) == protocol_data["ModuleTypes"]["08"]
+    assert cat.loaded_module_types() == [0x08]
+    assert cat.module_type(0x04) is None
+    assert sorted(cat["ModuleTypes"]) == sorted(protocol_data["ModuleTypes"])
+    assert cat["ModuleTypes"]["45"] == protocol_data["ModuleTypes"]["45"]
+    assert cat["MessagesBroadCast"] == protocol_data["MessagesBroadCast"]
+    assert len(cat.module_types()) == len(protocol_data["ModuleTypes"])
+
+
+def test_catalog_file_is_reused_and_refreshed(tmp_path):
+    cfile = str(tmp_path / "catalog" / "protocol.catalog")
+    _load_catalog(PROTOCOL_FILE, cfile)
+    assert os.path.isfile(cfile)
+    mtime = os.stat(cfile).st_mtime_ns
+    _load_catalog(PROTOCOL_FILE, cfile)
+    assert os.stat(cfile).st_mtime_ns == mtime
+
+    # a catalog compiled from another protocol.json is replaced
+    with open(cfile, "rb") as fl:
+        header, _, body = fl.read().partition(b"\n")
+    index = json.loads(header)
+    index["stamp"][1] += 1
+    with open(cfile, "wb") as fl:
+        fl.write(json.dumps(index).encode() + b"\n" + body)
+    cat = _load_catalog(PROTOCOL_FILE, cfile)
+    with open(cfile, "rb") as fl:
+        assert ProtocolCatalog(fl.read()).stamp == cat.stamp
+
+
+def test_catalog_corrupt_file(tmp_path):
+    cfile = tmp_path / "protocol.catalog"
+    cfile.write_bytes(b"garbage")
+    cat = _load_catalog(PROTOCOL_FILE, str(cfile))
+    assert cat.module_type(0x08)["Type"] == "VMB4RY"
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_shared(monkeypatch, tmp_path):
+    monkeypatch.setattr(catalog, "_catalog", None)
+    cat = await load_catalog(str(tmp_path))
+    assert os.path.isfile(get_catalog_file(str(tmp_path)))
+    assert cat is get_catalog()
+    assert cat is await load_catalog()
+
+
+def test_catalog_without_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(catalog, "_catalog", None)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert get_catalog().module_type(0x08)["Type"] == "VMB4RY"
+    assert os.listdir(tmp_path) == []
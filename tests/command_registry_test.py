@@ -2,7 +2,14 @@
 import pytest
 
 import velbusaio.command_registry
-from velbusaio.command_registry import CommandRegistry, register
+from velbusaio import command_index
+from velbusaio.command_registry import (
+    MODULE_DIRECTORY,
+    CommandRegistry,
+    commandRegistry,
+    generate_index,
+    register,
+)
 
 
 @pytest.fixture()
@@ -46,3 +53,21 @@ def test_defaults(own_command_registry):
         @register(256)
         class testclassV:
             pass
+
+
+def test_index_is_up_to_date():
+    with open(command_index.__file__) as fl:
+        assert fl.read() == generate_index()
+
+
+def test_lazy_lookup_matches_eager():
+    lazy = CommandRegistry(MODULE_DIRECTORY, command_index)
+    commandRegistry.load_all()
+    for module_type in [0, *MODULE_DIRECTORY]:
+        for command_value in range(256):
+            assert lazy.has_command(command_value, module_type) == (
+                commandRegistry.has_command(command_value, module_type)
+            )
+            assert lazy.get_command(command_value, module_type) is (
+                commandRegistry.get_command(command_value, module_type)
+            )
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from velbusaio.confirm import CommandConfirmer
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.exceptions import VelbusCommandNotConfirmed
+from velbusaio.raw_message import RawMessage
+
+VMB4RYLD = 0x10
+VMB4DC = 0x12
+ADDRESS = 0x20
+
+
+def _relay_status(channel: int) -> RawMessage:
+    return RawMessage(
+        PRIORITY_LOW, ADDRESS, False, bytes([0xFB, channel, 0, 1, 0, 0, 0, 0])
+    )
+
+
+async def _relay(tmp_path, add_modules):
+    velbus = Velbus("", cache_dir=str(tmp_path))
+    velbus._confirmer = CommandConfirmer(velbus.request, timeout=0.05, retries=2)
+    await add_modules(velbus, {ADDRESS: VMB4RYLD})
+    return velbus, velbus.get_channels(ADDRESS)[1]
+
+
+@pytest.mark.asyncio
+async def test_confirmed(tmp_path, add_modules):
+    velbus, relay = await _relay(tmp_path, add_modules)
+    task = asyncio.ensure_future(relay.turn_on(confirm=True))
+    frame, _ = await velbus._protocol._send_queue.get()
+    assert frame.command == 0x02
+    # the status of another channel does not confirm the command
+    await velbus._handler.handle(_relay_status(0x02))
+    await asyncio.sleep(0)
+    assert not task.done()
+    await velbus._handler.handle(_relay_status(0x01))
+    await task
+    assert relay.is_on()
+
+    stats = velbus.confirm_stats()[ADDRESS]
+    assert stats["confirmed"] == 1
+    assert stats["success_rate"] == 1.0
+    assert stats["ack_latency"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry(tmp_path, add_modules):
+    velbus, relay = await _relay(tmp_path, add_modules)
+    task = asyncio.ensure_future(relay.turn_off(confirm=True))
+    await velbus._protocol._send_queue.get()
+    # the first frame got lost, the second one is confirmed
+    await velbus._protocol._send_queue.get()
+    await velbus._handler.handle(_relay_status(0x01))
+    await task
+    stats = velbus.confirm_stats()[ADDRESS]
+    assert stats["retries"] == 1
+    assert stats["confirmed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_not_confirmed(tmp_path, add_modules):
+    velbus, relay = await _relay(tmp_path, add_modules)
+    with pytest.raises(VelbusCommandNotConfirmed):
+        await relay.turn_on(confirm=True)
+    assert velbus._protocol._send_queue.qsize() == 3
+    stats = velbus.confirm_stats()[ADDRESS]
+    assert stats["failed"] == 1
+    assert stats["success_rate"] == 0.0
+
+    # without confirm nothing waits
+    await relay.turn_on()
+    assert velbus._protocol._send_queue.qsize() == 4
+
+
+@pytest.mark.asyncio
+async def test_dimmer_channel(tmp_path, add_modules):
+    velbus = Velbus("", cache_dir=str(tmp_path))
+    velbus._confirmer = CommandConfirmer(velbus.request, timeout=0.05, retries=2)
+    await add_modules(velbus, {ADDRESS: VMB4DC})
+    dimmer = velbus.get_channels(ADDRESS)[3]
+    # 0xEE has no channel byte, it can not confirm one of four dimmers
+    assert dimmer._dimmer_status() == (0xB8,)
+    task = asyncio.ensure_future(dimmer.set_dimmer_state(50, confirm=True))
+    frame, _ = await velbus._protocol._send_queue.get()
+    assert frame.command == 0x07
+    # the status of channel 3
+    await velbus._handler.handle(
+        RawMessage(PRIORITY_LOW, ADDRESS, False, bytes([0xB8, 0x04, 0, 50, 0, 0, 0, 0]))
+    )
+    await task
+    assert dimmer.get_dimmer_state() == 50
+    assert velbus.confirm_stats()[ADDRESS]["retries"] == 0
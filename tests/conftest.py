@@ -0,0 +1,23 @@
+import pytest
+
+from velbusaio.controller import Velbus
+
+
+async def _add_modules(velbus: Velbus, modules: dict) -> Velbus:
+    await velbus._handler.read_protocol_data()
+    for address, typ in modules.items():
+        velbus.add_module(address, typ, velbus._handler.pdata.module_type(typ))
+        await velbus.get_module(address)._Module__load_default_channels()
+    velbus._handler._scan_complete = True
+    return velbus
+
+
+@pytest.fixture
+def add_modules():
+    """
+    Add modules, address => module type, to a controller as if it scanned them
+
+    The modules get their default channels. Set up the controller options
+    first, the modules take them over when they are added.
+    """
+    return _add_modules
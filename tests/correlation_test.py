@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
+from velbusaio.messages.relay_status import RelayStatusMessage
+from velbusaio.raw_message import RawMessage
+
+ADDRESS = 0x20
+
+
+def _relay_status(address: int, channel: int) -> RawMessage:
+    return RawMessage(
+        PRIORITY_LOW, address, False, bytes([0xFB, channel, 0, 1, 0, 0, 0, 0])
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_reply(tmp_path, add_modules):
+    velbus = await add_modules(Velbus("", cache_dir=str(tmp_path)), {})
+    future = velbus.request(ModuleStatusRequestMessage(ADDRESS), expect=0xFB)
+    frame, _ = await velbus._protocol._send_queue.get()
+    assert frame.address == ADDRESS
+    velbus._on_message_sent(frame)
+
+    # a reply from another module is not an answer
+    await velbus._handler.handle(_relay_status(ADDRESS + 1, 0x01))
+    assert not future.done()
+    await velbus._handler.handle(_relay_status(ADDRESS, 0x02))
+    reply = await future
+    assert isinstance(reply, RelayStatusMessage)
+    assert reply.channel == 2
+
+    stats = velbus.request_stats()
+    assert stats["pending"] == 0
+    assert stats["answered"] == 1
+    assert stats["rtt"]["count"] == 1
+    assert velbus._handler._routes == {}
+
+
+@pytest.mark.asyncio
+async def test_oldest_request_first(tmp_path, add_modules):
+    velbus = await add_modules(Velbus("", cache_dir=str(tmp_path)), {})
+    first = velbus.request(ModuleStatusRequestMessage(ADDRESS), expect=[0xFB, 0xED])
+    second = velbus.request(ModuleStatusRequestMessage(ADDRESS), expect=0xFB)
+    await asyncio.sleep(0)
+    assert velbus.request_stats()["pending"] == 2
+    await velbus._handler.handle(_relay_status(ADDRESS, 0x01))
+    await velbus._handler.handle(_relay_status(ADDRESS, 0x04))
+    assert (await first).channel == 1
+    assert (await second).channel == 3
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_cancel(tmp_path, add_modules):
+    velbus = await add_modules(Velbus("", cache_dir=str(tmp_path)), {})
+    with pytest.raises(asyncio.TimeoutError):
+        await velbus.request(ModuleStatusRequestMessage(ADDRESS), 0xFB, timeout=0.01)
+    assert velbus.request_stats()["timeouts"] == 1
+
+    future = velbus.request(ModuleStatusRequestMessage(ADDRESS), 0xFB)
+    future.cancel()
+    await asyncio.sleep(0)
+    assert velbus.request_stats()["pending"] == 0
+    assert velbus._handler._routes == {}
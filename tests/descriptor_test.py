@@ -0,0 +1,61 @@
+import dataclasses
+
+import pytest
+
+from velbusaio.catalog import get_catalog
+from velbusaio.channels import Relay, Temperature
+from velbusaio.descriptor import ModuleTypeDescriptor, get_descriptor
+from velbusaio.module import Module
+
+VMB4RY = 0x08
+VMB1TS = 0x0C
+VMBGPOD = 0x28
+VMB7IN = 0x22
+
+
+def test_descriptor_shared_between_modules():
+    data = get_catalog().module_type(VMB4RY)
+    mod1 = Module(1, VMB4RY, data)
+    mod2 = Module(2, VMB4RY, data)
+    assert mod1._descriptor is mod2._descriptor
+    assert mod1.get_type_name() == "VMB4RY"
+
+
+def test_descriptor_is_immutable():
+    desc = get_descriptor(VMB4RY, get_catalog().module_type(VMB4RY))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        desc.type_name = "other"
+    with pytest.raises(TypeError):
+        desc.name_map[1] = 2
+
+
+def test_descriptor_relay_module():
+    desc = get_descriptor(VMB4RY, get_catalog().module_type(VMB4RY))
+    assert [spec.num for spec in desc.channels] == [1, 2, 3, 4]
+    assert all(spec.cls is Relay and spec.editable for spec in desc.channels)
+    assert desc.status_channels == (1, 2, 3, 4)
+    assert desc.status_channel_mask == 0x0F
+    assert desc.counter_channels == ()
+    assert desc.temperature_channel is None
+
+
+def test_descriptor_thermostat_module():
+    data = get_catalog().module_type(VMBGPOD)
+    desc = get_descriptor(VMBGPOD, data)
+    assert desc.thermostat
+    assert desc.temperature_channel == 34
+    assert desc.translate_channel(0x21) == 34
+    assert desc.translate_channel("5") == 5
+    assert "heater" in dict(desc.thermostat_channels).values()
+    temp = [spec for spec in desc.channels if spec.cls is Temperature]
+    assert [spec.num for spec in temp] == [34]
+    assert desc.memory_plan == tuple(
+        int(addr, 16) for addr in data["Memory"]["Address"]
+    )
+
+
+def test_descriptor_memory_plan():
+    desc = ModuleTypeDescriptor.from_data(VMB1TS, get_catalog().module_type(VMB1TS))
+    assert desc.memory_plan is None
+    desc = ModuleTypeDescriptor.from_data(VMB7IN, get_catalog().module_type(VMB7IN))
+    assert desc.counter_channels == (1, 2, 3, 4)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+import random
+
+import pytest
+
+from velbusaio.command_registry import commandRegistry
+from velbusaio.const import PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.fields import Bit, Bits, ChannelByte, ChannelMask, Const, UInt, layout
+from velbusaio.message import Message, ParserError
+from velbusaio.messages.module_status import ModuleStatusPirMessage
+from velbusaio.messages.relay_status import RelayStatusMessage
+
+
+@layout(
+    0x10,
+    ChannelByte("channel"),
+    ChannelMask("channels"),
+    Bits(Bit("flag", 0), Bit("mode", 1, 3)),
+    Const(0xAA),
+    UInt("value", 2),
+    UInt("delay", 3),
+    priority=PRIORITY_HIGH,
+)
+class SampleMessage(Message):
+    pass
+
+
+def _attributes(msg: Message) -> dict:
+    return {key: val for key, val in msg.__dict__.items() if not key.startswith("_")}
+
+
+def _layout_messages() -> list:
+    # imports every message module, so only when the test runs
+    return sorted(
+        {cls for _, cls in commandRegistry.registered_commands() if cls._layout},
+        key=lambda cls: cls.__name__,
+    )
+
+
+def test_layout_messages_are_registered():
+    messages = _layout_messages()
+    assert RelayStatusMessage in messages
+    assert len(messages) > 20
+
+
+def test_decode():
+    msg = SampleMessage()
+    msg.populate(
+        PRIORITY_HIGH, 5, False, bytes([0x04, 0x81, 0x0B, 0xAA, 1, 2, 0, 1, 0])
+    )
+    assert msg.address == 5
+    assert msg.channel == 3
+    assert msg.channels == [1, 8]
+    assert msg.flag is True
+    assert msg.mode == 5
+    assert msg.value == 0x0102
+    assert msg.delay == 0x100
+    assert msg.data_to_binary() == bytes([0x10, 0x04, 0x81, 0x0B, 0xAA, 1, 2, 0, 1, 0])
+
+
+@pytest.mark.parametrize(
+    "priority, data",
+    [
+        (PRIORITY_LOW, bytes([1, 0, 0, 0xAA, 0, 0, 0, 0, 0])),
+        (PRIORITY_HIGH, bytes([3, 0, 0, 0xAA, 0, 0, 0, 0, 0])),
+        (PRIORITY_HIGH, bytes([1, 0, 0, 0xAB, 0, 0, 0, 0, 0])),
+        (PRIORITY_HIGH, bytes([1, 0, 0, 0xAA, 0, 0, 0, 0])),
+    ],
+)
+def test_decode_errors(priority, data):
+    with pytest.raises(ParserError):
+        SampleMessage().populate(priority, 5, False, data)
+
+
+def test_same_as_handwritten():
+    msg = RelayStatusMessage()
+    msg.populate(PRIORITY_LOW, 0x10, False, bytes([0x04, 0, 1, 0x80, 0, 0x01, 0x2C]))
+    assert msg.channel == 3
+    assert msg.is_on()
+    assert msg.led_status == 0x80
+    assert msg.delay_time == 300
+    msg = ModuleStatusPirMessage()
+    msg.populate(PRIORITY_LOW, 0x10, False, bytes([0x05, 0x01, 0x02, 0, 0, 0x06, 0]))
+    assert msg.dark and msg.motion1 and not msg.light
+    assert msg.light_value == 0x0102
+    assert msg.selected_program == 2
+    assert msg.selected_program_str == "winter"
+
+
+def test_round_trip():
+    for cls in _layout_messages():
+        _round_trip(cls)
+
+
+def _round_trip(cls: type) -> None:
+    spec = cls._layout
+    rnd = random.Random(cls.__name__)
+    decoded = 0
+    for _ in range(200):
+        data = bytes(rnd.getrandbits(8) for _ in range(spec.length))
+        msg = cls()
+        try:
+            msg.populate(spec.priority or PRIORITY_LOW, 1, spec.rtr, data)
+        except ParserError:
+            continue
+        decoded += 1
+        binary = msg.data_to_binary()
+        assert binary[0] == spec.command_code
+        again = cls()
+        again.populate(spec.priority or PRIORITY_LOW, 1, spec.rtr, binary[1:])
+        assert _attributes(again) == _attributes(msg)
+        assert again.data_to_binary() == binary, cls.__name__
+    assert decoded > 0, cls.__name__
@@ -0,0 +1,160 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from velbusaio.const import PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.handler import PacketHandler
+from velbusaio.message import Message
+from velbusaio.module import Module, VmbDali
+from velbusaio.raw_message import RawMessage
+
+VMB4RYLD = 0x10
+ADDRESS = 0x20
+
+# relay status, channel 2 on
+RELAY_STATUS = RawMessage(
+    PRIORITY_LOW, ADDRESS, False, bytes([0xFB, 0x02, 0, 1, 0, 0, 0, 0])
+)
+# switch relay on, nothing in Module looks at it
+SWITCH_RELAY_ON = RawMessage(PRIORITY_HIGH, ADDRESS, False, bytes([0x02, 0x01]))
+
+
+async def _handler(
+    lazy_decode: bool = True, module_class: type = Module, module_type=VMB4RYLD
+) -> tuple[PacketHandler, Module]:
+    velbus = MagicMock()
+    ph = PacketHandler(velbus, lazy_decode=lazy_decode)
+    await ph.read_protocol_data()
+    module = module_class(ADDRESS, module_type, ph.pdata.module_type(module_type))
+    module.initialize(AsyncMock())
+    await module._Module__load_default_channels()
+    module.on_message = AsyncMock(wraps=module.on_message)
+    velbus.get_module.side_effect = lambda addr: module if addr == ADDRESS else None
+    ph._scan_complete = True
+    return ph, module
+
+
+@pytest.mark.asyncio
+async def test_lazy_decode_skips_unhandled():
+    ph, module = await _handler()
+    await ph.handle(RELAY_STATUS)
+    await ph.handle(SWITCH_RELAY_ON)
+    assert module.on_message.await_count == 1
+    assert ph.decode_counters() == {"decoded": 1, "skipped": 1}
+
+
+@pytest.mark.asyncio
+async def test_eager_decode():
+    ph, module = await _handler(lazy_decode=False)
+    await ph.handle(RELAY_STATUS)
+    await ph.handle(SWITCH_RELAY_ON)
+    assert module.on_message.await_count == 2
+    assert ph.decode_counters() == {"decoded": 2, "skipped": 0}
+
+
+@pytest.mark.asyncio
+async def test_subscribe():
+    ph, module = await _handler()
+    received = []
+
+    async def callback(msg):
+        received.append(msg)
+
+    unsubscribe = ph.subscribe(ADDRESS, 0x02, callback)
+    await ph.handle(SWITCH_RELAY_ON)
+    assert len(received) == 1
+    assert received[0].relay_channels == [1]
+    # the module itself still has no use for it
+    assert module.on_message.await_count == 0
+
+    unsubscribe()
+    await ph.handle(SWITCH_RELAY_ON)
+    assert len(received) == 1
+    assert ph.decode_counters() == {"decoded": 1, "skipped": 1}
+
+
+@pytest.mark.asyncio
+async def test_subscribe_unknown_module():
+    ph, _ = await _handler()
+    received = []
+
+    async def callback(msg):
+        received.append(msg)
+
+    ph.subscribe(ADDRESS + 1, 0x02, callback)
+    await ph.handle(SWITCH_RELAY_ON._replace(address=ADDRESS + 1))
+    assert [msg.address for msg in received] == [ADDRESS + 1]
+    assert ph.decode_counters() == {"decoded": 1, "skipped": 0}
+
+
+@pytest.mark.asyncio
+async def test_unknown_module_is_skipped():
+    ph, _ = await _handler()
+    await ph.handle(SWITCH_RELAY_ON._replace(address=ADDRESS + 1))
+    await ph.handle(RELAY_STATUS._replace(address=ADDRESS + 1))
+    # a module type reply after the scan, nobody subscribed to it
+    await ph.handle(RawMessage(PRIORITY_LOW, ADDRESS + 1, False, bytes([0xFF, 0x10])))
+    assert ph.decode_counters() == {"decoded": 0, "skipped": 3}
+
+
+@pytest.mark.asyncio
+async def test_lazy_decode_skips_missing_channels():
+    ph, module = await _handler()
+    await ph.handle(RELAY_STATUS)
+    # a VMB4RYLD has no relay channel 8
+    await ph.handle(RELAY_STATUS._replace(data=bytes([0xFB, 0x80, 0, 1, 0, 0, 0, 0])))
+    assert module.on_message.await_count == 1
+    assert ph.decode_counters() == {"decoded": 1, "skipped": 1}
+
+
+@pytest.mark.asyncio
+async def test_lazy_decode_skips_dali_leds():
+    ph, module = await _handler(module_class=VmbDali, module_type=0x45)
+    for command in (0xF5, 0xF6, 0xF7, 0xF8):
+        await ph.handle(RawMessage(PRIORITY_LOW, ADDRESS, False, bytes([command, 1])))
+    assert module.on_message.await_count == 0
+    assert ph.decode_counters() == {"decoded": 0, "skipped": 4}
+
+
+class CustomModule(Module):
+    async def on_message(self, message: Message) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_overridden_on_message_gets_everything():
+    ph, module = await _handler(module_class=CustomModule)
+    await ph.handle(SWITCH_RELAY_ON)
+    assert module.on_message.await_count == 1
+    assert ph.decode_counters() == {"decoded": 1, "skipped": 0}
+
+
+@pytest.mark.asyncio
+async def test_subscribe_subtype_after_scan():
+    ph, _ = await _handler()
+    received = []
+
+    async def callback(msg):
+        received.append(msg)
+
+    ph.subscribe(ADDRESS, 0xA7, callback)
+    await ph.handle(
+        RawMessage(
+            PRIORITY_LOW,
+            ADDRESS,
+            False,
+            bytes([0xA7, 0x10, 0, 0, 0x21, 0x22, 0xFF, 0xFF]),
+        )
+    )
+    assert len(received) == 1
+    assert received[0].sub_address_offset == 4
+    assert received[0].sub_address_1 == 0x21
+
+
+@pytest.mark.asyncio
+async def test_mark_seen():
+    ph, module = await _handler()
+    assert module.get_last_seen() is None
+    # a module type reply is not handled after the scan
+    await ph.handle(RawMessage(PRIORITY_LOW, ADDRESS, False, bytes([0xFF, 0x10])))
+    assert module.get_last_seen() is not None
@@ -0,0 +1,104 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.protocol import VelbusProtocol
+from velbusaio.raw_message import RawMessage
+from velbusaio.simulator import BusSimulator
+from velbusaio.stats import StageMetrics
+from velbusaio.virtual_clock import connect, run
+
+VMB4RYLD = 0x10
+
+
+def test_stages(tmp_path, add_modules):
+    async def main():
+        simulator = BusSimulator({0x20: VMB4RYLD})
+        velbus = Velbus("", cache_dir=str(tmp_path), instrument=True)
+        await connect(velbus, simulator, scan=False)
+        await add_modules(velbus, {0x20: VMB4RYLD})
+        relay = velbus.get_channels(0x20)[1]
+        updates = []
+
+        async def on_update():
+            updates.append(relay.is_on())
+
+        relay.on_status_update(on_update)
+        await relay.turn_on()
+        await asyncio.sleep(1)
+        assert updates == [True]
+        stats = velbus.stats()
+        await velbus.stop()
+        await simulator.close()
+        return stats
+
+    stats = run(main())
+    stages = stats["stages"]
+    for stage in (
+        "enqueue",
+        "wait",
+        "write",
+        "read",
+        "frame",
+        "lookup",
+        "decode",
+        "dispatch",
+        "fanout",
+        "receive",
+    ):
+        assert stages[stage]["count"] >= 1, stage
+        assert stages[stage]["buckets"][-1][1] == stages[stage]["count"]
+    assert stages["fanout"]["count"] == 1
+    assert stats["counters"]["tx_bytes"] > 0
+    assert stats["counters"]["rx_bytes"] > 0
+    assert stats["counters"]["decoded"] >= 1
+
+
+def test_disabled(tmp_path, add_modules):
+    async def main():
+        simulator = BusSimulator({0x20: VMB4RYLD})
+        velbus = Velbus("", cache_dir=str(tmp_path))
+        await connect(velbus, simulator, scan=False)
+        await add_modules(velbus, {0x20: VMB4RYLD})
+        relay = velbus.get_channels(0x20)[1]
+        await relay.turn_on()
+        await asyncio.sleep(1)
+        assert relay.is_on()
+        assert velbus.stats() is None
+        await velbus.stop()
+        await simulator.close()
+
+    run(main())
+
+
+def test_wait_of_a_resent_message():
+    async def main():
+        protocol = VelbusProtocol(message_received_callback=None)
+        protocol.transport = MagicMock()
+        protocol.transport.is_closing.return_value = False
+        protocol._restart_writer = True
+        protocol._metrics = StageMetrics()
+        frame = RawMessage(PRIORITY_LOW, 0x20, False, bytes([0xFA, 0x01]))
+        # the same message object is queued twice
+        await protocol.send_message(frame)
+        await protocol.send_message(frame, background=True)
+        writer = asyncio.ensure_future(protocol._get_message_from_send_queue())
+        await asyncio.sleep(1)
+        await protocol.send_message(None)
+        await writer
+        return protocol._metrics.snapshot()
+
+    snapshot = run(main())
+    assert snapshot["stages"]["wait"]["count"] == 2
+
+
+def test_stage_metrics():
+    metrics = StageMetrics(bounds=(0.001, 0.01))
+    metrics.observe("decode", 0.0005)
+    metrics.observe("decode", 0.005)
+    metrics.count("frames")
+    metrics.count("frames", 2)
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["decode"]["count"] == 2
+    assert snapshot["counters"] == {"frames": 3}
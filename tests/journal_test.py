@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from velbusaio.cache import ModuleCache
+from velbusaio.catalog import get_catalog
+from velbusaio.journal import JOURNAL_FILE, StateJournal
+from velbusaio.module import Module
+
+VMB4RYLD = 0x10
+
+
+def test_replay(tmp_path):
+    journal = StateJournal(str(tmp_path))
+    journal.replay()
+    journal.record(1, 1, "on", True)
+    journal.record(1, 2, "on", False)
+    journal.write()
+    journal.record(1, 1, "on", False)
+    journal.record(2, 1, "counter", 42)
+    journal.write()
+
+    journal = StateJournal(str(tmp_path))
+    journal.replay()
+    assert journal.get(1) == {1: {"on": False}, 2: {"on": False}}
+    assert journal.get(2) == {1: {"counter": 42}}
+    assert journal.get(3) == {}
+    # the replay compacted the journal to one line per channel
+    assert len((tmp_path / JOURNAL_FILE).read_text().splitlines()) == 3
+
+
+def test_damaged_tail(tmp_path):
+    (tmp_path / JOURNAL_FILE).write_text(
+        '[1, 1, {"on": true}]\n[1, 2, {"on": true}]\n[1, 1, {"on": fa'
+    )
+    journal = StateJournal(str(tmp_path))
+    journal.replay()
+    assert journal.get(1) == {1: {"on": True}, 2: {"on": True}}
+    assert (tmp_path / JOURNAL_FILE).read_text().endswith("\n")
+
+
+def test_bounded_size(tmp_path):
+    journal = StateJournal(str(tmp_path), max_bytes=1000)
+    journal.replay()
+    for value in range(500):
+        journal.record(1, 1, "counter", value)
+        journal.write()
+        assert journal.stats()["size"] <= 1000
+    assert journal.stats()["compactions"] > 1
+
+    journal = StateJournal(str(tmp_path))
+    journal.replay()
+    assert journal.get(1) == {1: {"counter": 499}}
+
+
+def test_forget(tmp_path):
+    journal = StateJournal(str(tmp_path))
+    journal.replay()
+    journal.record(1, 1, "on", True)
+    journal.record(2, 1, "on", True)
+    journal.write()
+    journal.forget(1)
+    journal.write()
+
+    journal = StateJournal(str(tmp_path))
+    journal.replay()
+    assert journal.get(1) == {}
+    assert journal.get(2) == {1: {"on": True}}
+
+
+@pytest.mark.asyncio
+async def test_restore_stale(tmp_path):
+    cache = ModuleCache(str(tmp_path), delay=60, journal_delay=0.01)
+    await cache.load()
+    module = Module(3, VMB4RYLD, get_catalog().module_type(VMB4RYLD))
+    module.initialize(None, cache)
+    await module._Module__load_default_channels()
+    await module._channels[1].update({"on": True})
+    await asyncio.sleep(0.05)
+    assert cache.stats()["journal"]["appends"] == 1
+    await cache.close()
+
+    cache = ModuleCache(str(tmp_path))
+    await cache.load()
+    module = Module(3, VMB4RYLD, get_catalog().module_type(VMB4RYLD))
+    module.initialize(None, cache)
+
+    async def _noop():
+        pass
+
+    module._request_module_status = _noop
+    module._Module__load_memory = _noop
+    module._request_channel_name = _noop
+    await module.load()
+    channel = module._channels[1]
+    assert channel.is_on() is True
+    assert channel.is_stale()
+    assert not module._channels[2].is_stale()
+
+    # the bus confirms the state, listeners hear about it
+    updates = []
+
+    async def on_update():
+        updates.append(channel.is_stale())
+
+    channel.on_status_update(on_update)
+    await channel.update({"on": True})
+    assert not channel.is_stale()
+    assert updates == [False]
+    await cache.close()
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.raw_message import RawMessage
+from velbusaio.simulator import BusSimulator
+from velbusaio.virtual_clock import connect, run
+
+VMB4RYLD = 0x10
+
+
+def _samples(text: str) -> dict[str, str]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+
+def test_render(tmp_path, add_modules):
+    async def main():
+        simulator = BusSimulator({0x20: VMB4RYLD})
+        velbus = Velbus("", cache_dir=str(tmp_path))
+        await connect(velbus, simulator, scan=False)
+        await add_modules(velbus, {0x20: VMB4RYLD})
+        module = velbus.get_module(0x20)
+        await module.get_channels()[1].turn_on()
+        await asyncio.sleep(1)
+        first = velbus.render_metrics()
+        cached = velbus._exporter._module_lines[0x20]
+        velbus.render_metrics()
+        assert velbus._exporter._module_lines[0x20] is cached
+        # garbage in front of a frame
+        frame = RawMessage(PRIORITY_LOW, 0x20, False, bytes([0x00, 0, 0, 0]))
+        velbus._protocol.transport.feed(b"\x01\x02\x03" + frame.to_bytes())
+        await asyncio.sleep(1)
+        third = velbus.render_metrics()
+        await velbus.stop()
+        await simulator.close()
+        return first, third
+
+    first, third = run(main())
+    samples = _samples(first)
+    assert samples["velbus_up"] == "1"
+    assert int(samples['velbus_frames_total{direction="rx"}']) >= 1
+    assert int(samples['velbus_frames_total{direction="tx"}']) >= 1
+    assert samples['velbus_queue_depth{queue="send"}'] == "0"
+    assert samples["velbus_modules"] == "1"
+    assert samples['velbus_request_rtt_seconds_bucket{le="+Inf"}'] == (
+        samples["velbus_request_rtt_seconds_count"]
+    )
+    assert (
+        'velbus_module_last_seen_timestamp_seconds{address="32",type="VMB4RYLD"}'
+        in (samples)
+    )
+    assert samples["velbus_parse_errors_total"] == "0"
+    assert "# TYPE velbus_frames_total counter" in first
+    samples = _samples(third)
+    assert samples["velbus_parse_errors_total"] == "1"
+    assert samples["velbus_discarded_bytes_total"] == "3"
+
+
+async def _get(port: int, path: str) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+@pytest.mark.asyncio
+async def test_server(tmp_path):
+    velbus = Velbus("", cache_dir=str(tmp_path))
+    await velbus._handler.read_protocol_data()
+    await velbus.start_metrics_server(port=0)
+    port = velbus._exporter.sockets()[0].getsockname()[1]
+
+    response = await _get(port, "/metrics")
+    head, body = response.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.0 200 OK")
+    assert b"text/plain; version=0.0.4" in head
+    assert b"velbus_up 0\n" in body
+    assert (await _get(port, "/")).startswith(b"HTTP/1.0 404")
+
+    await velbus.stop()
+    assert velbus._exporter.sockets() == []
@@ -3,8 +3,6 @@ This test checks if with an incoming module_status message the selected program
 is correctly stored into the module.
 """
 
-import pathlib
-
 import pytest
 from unittest.mock import MagicMock
 
@@ -17,7 +15,6 @@ from velbusaio.const import (
 )
 from velbusaio.controller import Velbus
 from velbusaio.handler import PacketHandler
-from velbusaio.helpers import get_cache_dir
 from velbusaio.messages.module_status import (
     PROGRAM_SELECTION,
     ModuleStatusGP4PirMessage,
@@ -49,8 +46,6 @@ VMBGP4PIR_2 = 0x3E
 )
 async def test_module_status_selected_program(module_type):
     module_address = 1
-    cache_dir = get_cache_dir()
-    pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
 
     velbus = MagicMock()
     ph = PacketHandler(velbus)
@@ -59,7 +54,6 @@ async def test_module_status_selected_program(module_type):
         module_address,
         module_type,
         ph.pdata["ModuleTypes"][f"{module_type:02X}"],
-        cache_dir=get_cache_dir(),
     )
     velbus = Velbus("")  # Dummy connection
     m.initialize(velbus.send)
@@ -96,7 +90,7 @@ async def test_module_status_selected_program(module_type):
             await m._channels[CHANNEL_SELECTED_PROGRAM].set_selected_program(
                 PROGRAM_SELECTION[program]
             )
-            msg_info = await velbus._protocol._send_queue.get()
+            msg_info, _ = await velbus._protocol._send_queue.get()
             assert msg_info.data[1] == program
 
     # test GP4PIR lightvalue
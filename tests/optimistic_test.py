@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.raw_message import RawMessage
+
+VMB4RYLD = 0x10
+ADDRESS = 0x20
+
+
+def _relay_status(on: bool) -> RawMessage:
+    return RawMessage(
+        PRIORITY_LOW, ADDRESS, False, bytes([0xFB, 0x01, 0, int(on), 0, 0, 0, 0])
+    )
+
+
+async def _relay(tmp_path, add_modules, optimistic: bool = True):
+    velbus = Velbus("", cache_dir=str(tmp_path), optimistic=optimistic)
+    await add_modules(velbus, {ADDRESS: VMB4RYLD})
+    relay = velbus.get_channels(ADDRESS)[1]
+    events = []
+
+    async def on_update():
+        events.append((relay.is_on(), relay.is_pending()))
+
+    relay.on_status_update(on_update)
+    return velbus, relay, events
+
+
+@pytest.mark.asyncio
+async def test_confirmed_by_the_bus(tmp_path, add_modules):
+    velbus, relay, events = await _relay(tmp_path, add_modules)
+    await relay.turn_on()
+    assert events == [(True, True)]
+    assert relay.get_channel_info()["pending"] == ["on"]
+
+    await velbus._handler.handle(_relay_status(True))
+    assert events == [(True, True), (True, False)]
+    assert relay.get_channel_info()["pending"] == []
+    assert relay._pending_timer is None
+
+
+@pytest.mark.asyncio
+async def test_corrected_by_the_bus(tmp_path, add_modules):
+    velbus, relay, events = await _relay(tmp_path, add_modules)
+    await relay.turn_on()
+    await velbus._handler.handle(_relay_status(False))
+    assert events[-1] == (False, False)
+
+
+@pytest.mark.asyncio
+async def test_rollback(tmp_path, add_modules):
+    velbus, relay, events = await _relay(tmp_path, add_modules)
+    velbus.get_module(ADDRESS)._optimistic_timeout = 0.01
+    await relay.turn_on()
+    await asyncio.sleep(0.05)
+    assert events == [(True, True), (None, False)]
+
+
+@pytest.mark.asyncio
+async def test_not_optimistic(tmp_path, add_modules):
+    velbus, relay, events = await _relay(tmp_path, add_modules, optimistic=False)
+    await relay.turn_on()
+    assert events == []
+    assert relay.is_on() is None
+    assert velbus._protocol._send_queue.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_batch(tmp_path, add_modules):
+    velbus, relay, events = await _relay(tmp_path, add_modules)
+    second = velbus.get_channels(ADDRESS)[2]
+    assert await velbus.batch([(relay, "turn_on"), (second, "turn_on")]) == 1
+    assert events == [(True, True)]
+    assert second.is_pending()
+
+    await velbus._handler.handle(_relay_status(True))
+    assert events == [(True, True), (True, False)]
+    assert second.is_pending()
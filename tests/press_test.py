@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from velbusaio.controller import Velbus
+from velbusaio.press import PressScheduler
+
+VMB6IN = 0x05
+ADDRESS = 0x30
+
+
+async def _buttons(tmp_path, add_modules):
+    velbus = Velbus("", cache_dir=str(tmp_path))
+    velbus._presser = PressScheduler(
+        velbus.send, duration=0.05, long_delay=0.05, long_duration=0.1
+    )
+    await add_modules(velbus, {ADDRESS: VMB6IN})
+    return velbus, velbus.get_channels(ADDRESS)
+
+
+def _sent(velbus: Velbus) -> list:
+    queue = velbus._protocol._send_queue
+    return [queue.get_nowait()[0].data for _ in range(queue.qsize())]
+
+
+@pytest.mark.asyncio
+async def test_presses_share_frames(tmp_path, add_modules):
+    velbus, buttons = await _buttons(tmp_path, add_modules)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    futures = [await buttons[num].press() for num in (1, 2, 3)]
+    # nothing waits for the release
+    assert loop.time() - start < 0.05
+    assert not any(future.done() for future in futures)
+
+    await asyncio.wait_for(asyncio.gather(*futures), 1)
+    assert _sent(velbus) == [
+        bytes([0x00, 0b111, 0, 0]),
+        bytes([0x00, 0, 0b111, 0]),
+    ]
+    assert velbus._presser.stats() == {"pending": 0, "frames": 2}
+
+
+@pytest.mark.asyncio
+async def test_long_press(tmp_path, add_modules):
+    velbus, buttons = await _buttons(tmp_path, add_modules)
+    await asyncio.wait_for(await buttons[2].press(long=True), 1)
+    assert _sent(velbus) == [
+        bytes([0x00, 0b10, 0, 0]),
+        bytes([0x00, 0, 0, 0b10]),
+        bytes([0x00, 0, 0b10, 0]),
+    ]
@@ -0,0 +1,70 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.protocol import VelbusProtocol
+from velbusaio.raw_message import RawMessage
+from velbusaio.refresh import RefreshScheduler
+
+VMB4RYLD = 0x10
+VMBPIRO = 0x23
+
+
+MODULES = {0x20: VMB4RYLD, 0x21: VMBPIRO}
+
+
+@pytest.mark.asyncio
+async def test_staggered_schedule(tmp_path, add_modules):
+    velbus = await add_modules(Velbus("", cache_dir=str(tmp_path)), MODULES)
+    intervals = {"Relay": 0.2, "Temperature": 0.2, "LightSensor": 0.2}
+    refresh = RefreshScheduler(velbus, intervals, spacing=0.01)
+    refresh.start()
+    schedule = refresh.schedule()
+    assert [(job["address"], job["kind"]) for job in schedule] == [
+        (0x20, "status"),
+        (0x21, "light"),
+        (0x21, "temperature"),
+    ]
+    assert schedule[0]["channels"] == list(
+        velbus.get_module(0x20)._descriptor.status_channels
+    )
+    # the modules are spread over the interval
+    assert schedule[0]["due_in"] < schedule[1]["due_in"]
+
+    await asyncio.sleep(0.25)
+    await refresh.stop()
+    sent = [(msg.address, msg.command) for msg, _ in velbus._protocol._background_queue]
+    assert sent == [(0x20, 0xFA), (0x21, 0xAA), (0x21, 0xE5)]
+    # nothing went through the command queue
+    queue = velbus._protocol._send_queue
+    assert not any(
+        isinstance(queue.get_nowait()[0], RawMessage) for _ in range(queue.qsize())
+    )
+    stats = refresh.stats()
+    assert stats["sent"] == 3
+    assert stats["lag"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_background_lane():
+    protocol = VelbusProtocol(message_received_callback=None)
+    protocol.transport = MagicMock()
+    protocol.transport.is_closing.return_value = False
+    protocol._restart_writer = True
+
+    def frame(address):
+        return RawMessage(PRIORITY_LOW, address, False, bytes([0xFA, 0x01]))
+
+    await protocol.send_message(frame(1), background=True)
+    await protocol.send_message(frame(2))
+    await protocol.send_message(frame(3), background=True)
+    await protocol.send_message(frame(4))
+    writer = asyncio.ensure_future(protocol._get_message_from_send_queue())
+    await asyncio.sleep(0.5)
+    await protocol.send_message(None)
+    await writer
+    written = [call.args[0] for call in protocol.transport.write.call_args_list]
+    assert [data[2] for data in written] == [2, 4, 1, 3]
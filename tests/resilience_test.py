@@ -0,0 +1,70 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.protocol import VelbusProtocol
+from velbusaio.raw_message import RawMessage
+from velbusaio.resilience import run_profile
+from velbusaio.simulator import FAULT_PROFILES, FaultProfile
+
+
+def _frame(address: int) -> bytes:
+    return RawMessage(PRIORITY_LOW, address, False, bytes([0xFB, 1, 0, 1])).to_bytes()
+
+
+def _receive(protocol: VelbusProtocol, data: bytes) -> None:
+    # like the transport, fill the buffer as far as it goes
+    while data:
+        buffer = protocol.get_buffer(-1)
+        size = min(len(buffer), len(data))
+        buffer[:size] = data[:size]
+        protocol.buffer_updated(size)
+        data = data[size:]
+
+
+@pytest.mark.asyncio
+async def test_split_and_coalesced_frames():
+    received = []
+
+    async def on_message(msg):
+        received.append(msg.address)
+
+    protocol = VelbusProtocol(message_received_callback=on_message)
+    data = _frame(1) + _frame(2) + _frame(3)
+    # two frames and a half in one read, the rest in tiny reads
+    _receive(protocol, data[:24])
+    for pos in range(24, len(data), 3):
+        _receive(protocol, data[pos : pos + 3])
+    await asyncio.sleep(0)
+    assert received == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_writer_resumes_after_reconnect():
+    protocol = VelbusProtocol(message_received_callback=None)
+    transport = MagicMock()
+    transport.is_closing.return_value = False
+    protocol.connection_made(transport)
+    protocol.connection_lost(ConnectionResetError())
+    await asyncio.sleep(0.2)
+    protocol.connection_made(transport)
+    await protocol.send_message(RawMessage(PRIORITY_LOW, 1, False, bytes([0xFA, 1])))
+    await asyncio.sleep(0.1)
+    assert transport.write.called
+    protocol.close()
+
+
+@pytest.mark.asyncio
+async def test_profiles():
+    clean = await run_profile(FAULT_PROFILES["clean"], duration=0.5, speed=0)
+    assert clean["lost"] == 0
+    assert clean["divergence"] == 0
+    assert clean["recovery_time"] is not None
+
+    degraded = FaultProfile("test", drop=0.1, corrupt=0.1, split=0.3, seed=1)
+    report = await run_profile(degraded, duration=0.5, speed=0)
+    assert report["faults"]["split"] > 0
+    # lost frames leave channels wrong until the status is requested again
+    assert report["recovery_time"] is not None
@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import pytest
+
+from velbusaio.const import PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.controller import Velbus
+from velbusaio.raw_message import RawMessage
+from velbusaio.simulator import BusSimulator, SimModule
+
+VMB6IN = 0x05
+VMB4RYLD = 0x10
+VMB2BLE = 0x1D
+
+
+@pytest.mark.asyncio
+async def test_scan_and_control(tmp_path, monkeypatch):
+    # empty addresses wait for the scan timeout, make that short
+    monkeypatch.setattr("velbusaio.handler.SCAN_MODULETYPE_TIMEOUT", 5)
+    monkeypatch.setattr("velbusaio.protocol.SLEEP_TIME", 0.001)
+    simulator = BusSimulator(speed=0)
+    simulator.add_module(
+        0x20, VMB4RYLD, name="Kitchen", channel_names={1: "Ceiling lamp"}
+    )
+    simulator.add_module(0x21, VMB6IN)
+    port = await simulator.serve_tcp()
+
+    velbus = Velbus(f"127.0.0.1:{port}", cache_dir=str(tmp_path))
+    await velbus.connect()
+    try:
+        assert sorted(velbus.get_modules()) == [0x20, 0x21]
+        relays = velbus.get_module(0x20)
+        assert relays.is_loaded()
+        assert relays.get_name() == "Kitchen"
+        assert relays.get_channels()[1].get_name() == "Ceiling lamp"
+        assert velbus.get_module(0x21).get_type_name() == "VMB6IN"
+
+        relay = relays.get_channels()[1]
+        await relay.turn_on()
+        for _ in range(100):
+            if relay.is_on():
+                break
+            await asyncio.sleep(0.01)
+        assert relay.is_on()
+        assert simulator.modules[0x20].state[1] == {"on": True}
+    finally:
+        await velbus.stop()
+        await simulator.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pseudo terminal")
+async def test_serial(tmp_path):
+    simulator = BusSimulator({0x20: VMB4RYLD})
+    velbus = Velbus(simulator.open_pty(), cache_dir=str(tmp_path))
+    await velbus.connect(test_connect=True)
+    await velbus._handler.read_protocol_data()
+    try:
+        await velbus.sendTypeRequestMessage(0x20)
+        for _ in range(100):
+            if velbus.get_module(0x20) is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert velbus.get_module(0x20).get_type_name() == "VMB4RYLD"
+    finally:
+        await velbus.stop()
+        await simulator.close()
+
+
+def test_blind_commands():
+    blinds = SimModule(0x30, VMB2BLE)
+    [status] = blinds.handle(
+        RawMessage(PRIORITY_HIGH, 0x30, False, bytes([0x1C, 0x02, 40, 0, 0]))
+    )
+    assert status.data == bytes([0xEC, 0x02, 0, 2, 0, 40, 0, 0])
+    assert blinds.state[2] == {"status": 2, "position": 40}
+    # the status request answers with the current state
+    [status] = blinds.handle(RawMessage(PRIORITY_LOW, 0x30, False, bytes([0xFA, 0x02])))
+    assert status.data[5] == 40
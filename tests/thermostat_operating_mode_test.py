@@ -3,15 +3,12 @@ This test checks if with an incoming temp_sensor_status message the thermostat o
 sleep_timer values are correctly stored into the module's temperature channel.
 """
 
-import pathlib
-
 import pytest
 from unittest.mock import MagicMock
 
 from velbusaio.channels import Temperature
 from velbusaio.controller import Velbus
 from velbusaio.handler import PacketHandler
-from velbusaio.helpers import get_cache_dir
 from velbusaio.messages.temp_sensor_status import TempSensorStatusMessage
 from velbusaio.messages.temp_sensor_status import DSTATUS
 from velbusaio.module import Module
@@ -30,8 +27,6 @@ from velbusaio.module import Module
 async def test_thermostat_operating_mode(mode, sleep_timer):
     module_address = 1
     module_type = 0x28  # VMBGPOD
-    cache_dir = get_cache_dir()
-    pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
 
     velbus = MagicMock()
     ph = PacketHandler(velbus)
@@ -41,7 +36,6 @@ async def test_thermostat_operating_mode(mode, sleep_timer):
         module_address,
         module_type,
         ph.pdata["ModuleTypes"][f"{module_type:02X}"],
-        cache_dir=get_cache_dir(),
     )
     velbus = Velbus("")  # Dummy connection
     m.initialize(velbus.send)
@@ -58,7 +52,7 @@ async def test_thermostat_operating_mode(mode, sleep_timer):
     assert m._channels[chan]._sleep_timer == sleep_timer
 
     await m._channels[chan].set_climate_mode(DSTATUS[mode])
-    msg_info = await velbus._protocol._send_queue.get()
+    msg_info, _ = await velbus._protocol._send_queue.get()
     check_sleep_timer = (msg_info.data[1] << 8) + msg_info.data[2]
     if DSTATUS[mode] == "run":
         sleep = 0x0
@@ -0,0 +1,57 @@
+import json
+import logging
+
+from velbusaio.capture import RX, TX
+from velbusaio.handler import PacketHandler
+from velbusaio.raw_message import RawMessage
+from velbusaio.trace import FrameTracer
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _frame(address: int) -> RawMessage:
+    return RawMessage(0xFB, address, False, bytes([0xFB, 0x01, 0x00, 0x00]))
+
+
+def test_sample(caplog):
+    tracer = FrameTracer(sample=3, limit=0)
+    with caplog.at_level(logging.DEBUG, logger="velbus-trace"):
+        for address in range(1, 11):
+            tracer.frame(TX if address == 6 else RX, _frame(address))
+    records = [record.velbus for record in caplog.records]
+    assert [record["address"] for record in records] == [3, 6, 9]
+    assert records[1]["dir"] == "tx"
+    assert json.loads(caplog.records[0].getMessage()) == records[0]
+    assert records[0]["data"] == "fb010000"
+    assert tracer.stats() == {"sample": 3, "frames": 10, "logged": 3, "dropped": 0}
+
+
+def test_rate_limit(caplog):
+    clock = Clock()
+    tracer = FrameTracer(sample=1, limit=2, clock=clock)
+    with caplog.at_level(logging.DEBUG, logger="velbus-trace"):
+        for _ in range(5):
+            tracer.frame(RX, _frame(1))
+        clock.now += 1
+        tracer.frame(RX, _frame(2))
+    assert len(caplog.records) == 3
+    assert tracer.stats()["dropped"] == 3
+
+
+def test_disabled_level_logs_nothing(caplog):
+    tracer = FrameTracer(sample=1)
+    with caplog.at_level(logging.INFO, logger="velbus-trace"):
+        tracer.frame(RX, _frame(1))
+    assert caplog.records == []
+    assert tracer.stats()["logged"] == 0
+
+
+def test_handler_does_not_force_debug():
+    PacketHandler(None)
+    assert logging.getLogger("velbus-handler").level == logging.NOTSET
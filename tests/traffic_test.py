@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from velbusaio.capture import RX, TX
+from velbusaio.controller import Velbus
+from velbusaio.raw_message import RawMessage
+from velbusaio.simulator import BusSimulator
+from velbusaio.traffic import TrafficMonitor
+from velbusaio.virtual_clock import connect, run
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _status(address: int) -> RawMessage:
+    # 4 data bytes, a 10 byte frame
+    return RawMessage(0xFB, address, False, bytes([0xFB, 0x01, 0x00, 0x00]))
+
+
+def test_rates():
+    clock = Clock()
+    monitor = TrafficMonitor(slots=10, clock=clock)
+    clock.now += 10
+    for second in range(10):
+        for _ in range(second % 2 + 1):
+            monitor.record(RX, _status(0x20))
+        monitor.record(TX, RawMessage(0xF8, 0x20, False, bytes([0x02, 0x01])))
+        clock.now += 1
+    clock.now -= 0.5
+
+    rates = monitor.rates(window=4)
+    assert rates["window"] == pytest.approx(3.5)
+    # the slots of seconds 6 to 9
+    assert rates["frames_per_sec"]["rx"] == pytest.approx(6 / 3.5)
+    assert rates["frames_per_sec"]["tx"] == pytest.approx(4 / 3.5)
+    assert rates["bytes_per_sec"]["rx"] == pytest.approx(60 / 3.5)
+    assert rates["priorities"][0xF8]["frames_per_sec"] == pytest.approx(4 / 3.5)
+    assert rates["addresses"][0x20]["rx_bytes_per_sec"] == pytest.approx(60 / 3.5)
+    assert rates["addresses"][0x20]["tx_frames_per_sec"] == pytest.approx(4 / 3.5)
+    assert rates["commands"][0x02]["bytes_per_sec"] == pytest.approx(32 / 3.5)
+    assert rates["occupancy"] == pytest.approx(92 * 10 / 38400 / 3.5)
+    assert monitor.occupancy(window=4) == rates["occupancy"]
+
+
+def test_old_slots_are_reused():
+    clock = Clock()
+    monitor = TrafficMonitor(slots=5, clock=clock)
+    clock.now += 5
+    monitor.record(RX, _status(0x20))
+    clock.now += 5
+    monitor.record(RX, _status(0x21))
+    clock.now += 0.5
+    rates = monitor.rates(window=60)
+    # the window is at most the ring
+    assert rates["window"] == pytest.approx(4.5)
+    assert set(rates["addresses"]) == {0x21}
+    # the slot of the first frame was cleared for the second
+    assert sum(sum(slot.frames) for slot in monitor._slots) == 1
+
+
+def test_top_talkers():
+    clock = Clock()
+    monitor = TrafficMonitor(clock=clock)
+    clock.now += 1
+    for address, frames in ((0x20, 3), (0x21, 10), (0x22, 1)):
+        for _ in range(frames):
+            monitor.record(RX, _status(address))
+    monitor.record(TX, RawMessage(0xF8, 0x22, False, bytes([0x02, 0x01])))
+    top = monitor.top_talkers(2)
+    assert [talker["address"] for talker in top] == [0x21, 0x20]
+    assert top[0]["share"] == pytest.approx(100 / 148)
+
+
+def test_controller(tmp_path, add_modules):
+    async def main():
+        simulator = BusSimulator({0x20: 0x10})
+        velbus = Velbus("", cache_dir=str(tmp_path))
+        await connect(velbus, simulator, scan=False)
+        await add_modules(velbus, {0x20: 0x10})
+        module = velbus.get_module(0x20)
+        await module.get_channels()[1].turn_on()
+        await asyncio.sleep(1)
+        traffic = velbus.traffic()
+        await velbus.stop()
+        await simulator.close()
+        return traffic
+
+    traffic = run(main())
+    assert traffic["frames_per_sec"]["tx"] > 0
+    assert traffic["frames_per_sec"]["rx"] > 0
+    assert traffic["top"][0]["address"] == 0x20
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from velbusaio.controller import Velbus
+from velbusaio.simulator import BusSimulator
+from velbusaio.virtual_clock import VirtualClockLoop, connect, measure_scan, run
+
+VMB6IN = 0x05
+VMB4RYLD = 0x10
+
+
+def test_sleep_takes_no_time():
+    async def main():
+        loop = asyncio.get_running_loop()
+        assert isinstance(loop, VirtualClockLoop)
+        await asyncio.sleep(3600)
+        return loop.time()
+
+    start = time.monotonic()
+    assert run(main()) == 3600
+    assert time.monotonic() - start < 1
+
+
+def test_executor_stops_the_clock():
+    async def main():
+        loop = asyncio.get_running_loop()
+        timer = loop.create_future()
+        loop.call_later(10, timer.set_result, None)
+        await loop.run_in_executor(None, time.sleep, 0.05)
+        assert not timer.done()
+        return loop.time()
+
+    assert run(main()) == 0
+
+
+def test_scan_with_real_timeouts():
+    # two seconds for every empty address, the pacing of the writer
+    result = run(measure_scan({0x20: VMB4RYLD, 0x21: VMB6IN}))
+    assert result["found"] == [0x20, 0x21]
+    assert result["loaded"] == [0x20, 0x21]
+    assert result["duration"] > 252 * 2
+
+
+def test_control(tmp_path, add_modules):
+    async def main():
+        simulator = BusSimulator({0x20: VMB4RYLD})
+        velbus = Velbus("", cache_dir=str(tmp_path))
+        await connect(velbus, simulator, scan=False)
+        await add_modules(velbus, {0x20: VMB4RYLD})
+        module = velbus.get_module(0x20)
+
+        relay = module.get_channels()[1]
+        await relay.turn_on()
+        await asyncio.sleep(1)
+        assert relay.is_on()
+        assert simulator.modules[0x20].state[1] == {"on": True}
+        await velbus.stop()
+        await simulator.close()
+
+    run(main())
@@ -0,0 +1,356 @@
+"""
+Offline analysis of bus captures
+
+Reading a capture frame by frame in Python is far too slow for weeks of
+traffic. The analyser memory-maps the files and checks all frames of a
+chunk at once with NumPy: start and end byte, priority, length and
+checksum. It counts the frames per address, per command and per address and
+command, the errors, and the time between frames. The chunks are analysed
+in a process pool and the partial results are added up.
+
+Capture files, see velbusaio.capture, have fixed records, so the frame
+boundaries are known. Raw byte dumps of a serial port (raw=True) do not:
+every start byte is a candidate, a candidate with a valid header, end byte
+and checksum is a frame, unless it overlaps an earlier frame. Raw dumps have
+no time stamps, so no timing.
+
+The discarded records of a capture hold the bytes the live parser dropped,
+they are checked like frames and counted as garbage.
+
+NumPy is an optional dependency:
+
+    pip install velbus-aio[analysis]
+    python -m velbusaio.analysis capture.bin --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from velbusaio.capture import DISCARDED, HEADER, RECORD, TX, capture_files
+from velbusaio.const import (
+    END_BYTE,
+    HEADER_LENGTH,
+    MAX_BODY_SIZE,
+    MAXIMUM_MESSAGE_SIZE,
+    MINIMUM_MESSAGE_SIZE,
+    PRIORITIES,
+    START_BYTE,
+    TAIL_LENGTH,
+)
+from velbusaio.stats import Histogram
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# records or bytes per chunk
+CHUNK_SIZE = 4 * 1024 * 1024
+# upper bounds in seconds of the time between two frames, a frame of 14
+# bytes takes 3.6 ms on the bus
+INTERVAL_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    5.0,
+    60.0,
+)
+ERRORS = ("start", "priority", "length", "end", "checksum")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "The capture analysis needs NumPy, install velbus-aio[analysis]"
+        )
+
+
+def _empty() -> dict:
+    return {
+        "rx": 0,
+        "tx": 0,
+        # [rx, tx] per address
+        "addresses": np.zeros((2, 256), dtype=np.int64),
+        # address x command, frames without data are not counted
+        "commands": np.zeros((256, 256), dtype=np.int64),
+        "errors": dict.fromkeys(ERRORS, 0),
+        "garbage": 0,
+        "intervals": np.zeros(len(INTERVAL_BUCKETS) + 1, dtype=np.int64),
+        "interval_sum": 0.0,
+        "interval_max": 0.0,
+        "first": None,
+        "last": None,
+    }
+
+
+def _checksums(frames: np.ndarray, size: np.ndarray) -> np.ndarray:
+    """
+    The checksum of every frame, frames is one frame per row
+    """
+    columns = np.arange(frames.shape[1])
+    covered = columns < (HEADER_LENGTH + size)[:, None]
+    total = (frames * covered).sum(axis=1, dtype=np.int64)
+    return (-total) & 0xFF
+
+
+def _count(result: dict, frames: np.ndarray, size: np.ndarray, tx: np.ndarray):
+    address = frames[:, 2]
+    np.add.at(result["addresses"], (tx.astype(np.intp), address), 1)
+    result["tx"] += int(tx.sum())
+    result["rx"] += int(len(tx) - tx.sum())
+    data = size > 0
+    np.add.at(result["commands"], (address[data], frames[data, HEADER_LENGTH]), 1)
+
+
+def _analyse_records(path: str, start: int, stop: int) -> dict:
+    """
+    Analyse records start to stop of a capture file
+    """
+    dtype = np.dtype(
+        [
+            ("time", "<f8"),
+            ("direction", "u1"),
+            ("length", "u1"),
+            ("frame", "u1", (MAXIMUM_MESSAGE_SIZE,)),
+        ]
+    )
+    records = np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=HEADER.size + start * RECORD.size,
+        shape=(stop - start,),
+    )
+    result = _empty()
+    frames = np.asarray(records["frame"])
+    rows = np.arange(len(frames))
+    size = frames[:, 3] & 0x0F
+
+    bad_start = frames[:, 0] != START_BYTE
+    bad_priority = ~np.isin(frames[:, 1], PRIORITIES)
+    bad_length = (size > MAX_BODY_SIZE) | (
+        records["length"] != size + HEADER_LENGTH + TAIL_LENGTH
+    )
+    # the tail of a frame with a bad length is somewhere else
+    tail = np.minimum(HEADER_LENGTH + size, MAXIMUM_MESSAGE_SIZE - 2)
+    bad_end = ~bad_length & (frames[rows, tail + 1] != END_BYTE)
+    bad_checksum = ~bad_length & (frames[rows, tail] != _checksums(frames, size))
+    errors = dict(zip(ERRORS, (bad_start, bad_priority, bad_length, bad_end)))
+    errors["checksum"] = bad_checksum
+    direction = np.asarray(records["direction"])
+    discarded = direction == DISCARDED
+    valid = ~discarded
+    for name, bad in errors.items():
+        result["errors"][name] = int(bad.sum())
+        valid &= ~bad
+    result["garbage"] = int(records["length"][discarded].sum())
+
+    _count(result, frames[valid], size[valid], direction[valid] == TX)
+
+    times = np.asarray(records["time"])[~discarded]
+    if len(times):
+        result["first"] = float(times[0])
+        result["last"] = float(times[-1])
+        _add_intervals(result, np.diff(times))
+    return result
+
+
+def _add_intervals(result: dict, intervals: np.ndarray) -> None:
+    if not len(intervals):
+        return
+    buckets = np.searchsorted(INTERVAL_BUCKETS, intervals, side="left")
+    result["intervals"] += np.bincount(buckets, minlength=len(INTERVAL_BUCKETS) + 1)
+    result["interval_sum"] += float(intervals.sum())
+    result["interval_max"] = max(result["interval_max"], float(intervals.max()))
+
+
+def _analyse_raw(path: str, start: int, stop: int) -> dict:
+    """
+    Analyse the frames that start in bytes start to stop of a raw dump
+    """
+    size_on_disk = os.path.getsize(path)
+    # a frame that starts in the chunk can end after it
+    end = min(stop + MAXIMUM_MESSAGE_SIZE - 1, size_on_disk)
+    data = np.asarray(np.memmap(path, dtype=np.uint8, mode="r")[start:end])
+    result = _empty()
+
+    limit = min(stop - start, len(data) - MINIMUM_MESSAGE_SIZE + 1)
+    starts = np.flatnonzero(data[: max(limit, 0)] == START_BYTE)
+    size = data[starts + 3] & 0x0F
+    candidate = np.isin(data[starts + 1], PRIORITIES) & (size <= MAX_BODY_SIZE)
+    tail = starts + HEADER_LENGTH + size
+    candidate &= tail + 1 < len(data)
+    starts, size, tail = starts[candidate], size[candidate], tail[candidate]
+    candidate = data[tail + 1] == END_BYTE
+    starts, size, tail = starts[candidate], size[candidate], tail[candidate]
+
+    # the byte sums modulo 256 of every range, from a wrapping running sum
+    running = np.concatenate((np.zeros(1, np.uint8), np.cumsum(data, dtype=np.uint8)))
+    total = running[tail] - running[starts]
+    good = data[tail] == ((-total.astype(np.int64)) & 0xFF)
+    result["errors"]["checksum"] = int((~good).sum())
+    starts, size, tail = starts[good], size[good], tail[good]
+
+    # drop the frames that start inside an earlier one
+    ends = tail + TAIL_LENGTH
+    if len(starts):
+        before = np.maximum.accumulate(np.concatenate(([0], ends[:-1])))
+        keep = starts >= before
+        starts, size, ends = starts[keep], size[keep], ends[keep]
+    length = stop - start
+    result["garbage"] = int(length - (np.minimum(ends, length) - starts).sum())
+    # the bytes of the last frame that are in the next chunk
+    result["overhang"] = (
+        int(ends[-1] - length) if len(ends) and ends[-1] > length else 0
+    )
+    result["path"] = path
+
+    offsets = starts[:, None] + np.arange(MAXIMUM_MESSAGE_SIZE)
+    frames = data[np.minimum(offsets, len(data) - 1)]
+    _count(result, frames, size, np.zeros(len(starts), dtype=bool))
+    return result
+
+
+def _merge(total: dict, part: dict) -> None:
+    if part.get("path") is not None and part["path"] == total.get("path"):
+        # the next chunk saw the end of our last frame as garbage
+        part["garbage"] -= total["overhang"]
+    total["path"] = part.get("path")
+    total["overhang"] = part.get("overhang", 0)
+    for key in ("rx", "tx", "garbage", "interval_sum"):
+        total[key] += part[key]
+    for key in ("addresses", "commands", "intervals"):
+        total[key] += part[key]
+    for name, count in part["errors"].items():
+        total["errors"][name] += count
+    total["interval_max"] = max(total["interval_max"], part["interval_max"])
+    if part["first"] is None:
+        return
+    if total["last"] is not None:
+        # the gap between the chunks
+        _add_intervals(total, np.array([part["first"] - total["last"]]))
+    if total["first"] is None:
+        total["first"] = part["first"]
+    total["last"] = part["last"]
+
+
+def _chunks(paths: Iterable[str], raw: bool, chunk_size: int):
+    for path in paths:
+        if raw:
+            count = os.path.getsize(path)
+        else:
+            count = max(os.path.getsize(path) - HEADER.size, 0) // RECORD.size
+        for start in range(0, count, chunk_size):
+            yield path, start, min(start + chunk_size, count)
+
+
+def _report(result: dict, top: int) -> dict:
+    addresses = result["addresses"].sum(axis=0)
+    commands = result["commands"]
+    intervals = Histogram(INTERVAL_BUCKETS)
+    intervals.add_counts(
+        (int(count) for count in result["intervals"]),
+        result["interval_sum"],
+        result["interval_max"],
+    )
+    busiest = np.argsort(addresses)[::-1][:top]
+    return {
+        "frames": result["rx"] + result["tx"],
+        "rx": result["rx"],
+        "tx": result["tx"],
+        "errors": result["errors"],
+        "garbage_bytes": result["garbage"],
+        "duration": (
+            result["last"] - result["first"] if result["first"] is not None else None
+        ),
+        "addresses": {
+            int(address): {
+                "rx": int(result["addresses"][0, address]),
+                "tx": int(result["addresses"][1, address]),
+                "commands": {
+                    int(command): int(commands[address, command])
+                    for command in np.flatnonzero(commands[address])
+                },
+            }
+            for address in np.flatnonzero(addresses)
+        },
+        "commands": {
+            int(command): int(count)
+            for command, count in enumerate(commands.sum(axis=0))
+            if count
+        },
+        "busiest": [int(address) for address in busiest if addresses[address]],
+        "intervals": {**intervals.snapshot(), "buckets": intervals.buckets()},
+    }
+
+
+def analyse(
+    paths: Iterable[str],
+    raw: bool = False,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    top: int = 10,
+) -> dict:
+    """
+    Analyse capture files, or raw dumps with raw, in the given order
+
+    workers is the size of the process pool, by default one per CPU, 1
+    analyses in this process. chunk_size is the number of records, or bytes
+    of a raw dump, per job.
+    """
+    _require_numpy()
+    func = _analyse_raw if raw else _analyse_records
+    chunks = list(_chunks(paths, raw, chunk_size))
+    total = _empty()
+    if workers == 1 or len(chunks) <= 1:
+        parts = (func(*chunk) for chunk in chunks)
+        for part in parts:
+            _merge(total, part)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            # map keeps the order, the intervals between chunks need it
+            for part in pool.map(func, *zip(*chunks)):
+                _merge(total, part)
+    return _report(total, top)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("file", nargs="+", help="Capture files, or raw dumps")
+    parser.add_argument(
+        "--raw", action="store_true", help="The files are raw byte dumps"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Processes, one per CPU if not given"
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--top", type=int, default=10, help="Busiest addresses")
+    args = parser.parse_args()
+    paths = []
+    for name in args.file:
+        paths.extend((capture_files(name) or [name]) if not args.raw else [name])
+    print(
+        json.dumps(
+            analyse(paths, args.raw, args.workers, args.chunk_size, args.top),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
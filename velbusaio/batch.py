@@ -0,0 +1,91 @@
+"""
+Batched channel commands
+
+Most relay, led and dimmer commands take a channel bitmask. A batch builds
+the message of every (channel, action) pair, merges the messages that only
+differ in their channels into one, and orders the frames by priority, so a
+scene that switches every relay of a module is a single frame.
+
+An action is the name of a channel command method, followed by its
+arguments: (relay, "turn_on"), (button, "set_led_state", "slow") or
+(dimmer, "set_dimmer_state", 50).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
+
+if TYPE_CHECKING:
+    from velbusaio.channels import Channel
+    from velbusaio.message import Message
+
+
+def _group_key(msg: Message, attr: str) -> tuple:
+    return (
+        msg.address,
+        type(msg),
+        tuple(
+            sorted((key, repr(val)) for key, val in vars(msg).items() if key != attr)
+        ),
+    )
+
+
+def _build(channel: Channel, action: str, args: tuple) -> Message | None:
+    builder = getattr(channel, f"_{action}_message", None)
+    if builder is None:
+        raise ValueError(f"{type(channel).__name__} can not batch {action}")
+    return builder(*args)
+
+
+def build_frames(actions: Iterable[tuple]) -> list[Message]:
+    """
+    The messages for a batch, one per module and command, by priority
+
+    Messages without a channel mask, see Message.channel_mask, are kept as
+    they are.
+    """
+    frames: list[Message] = []
+    groups: dict[tuple, Message] = {}
+    for channel, action, *args in actions:
+        msg = _build(channel, action, tuple(args))
+        if msg is None:
+            continue
+        attr = msg.channel_mask
+        if attr is None:
+            frames.append(msg)
+            continue
+        key = _group_key(msg, attr)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = msg
+            frames.append(msg)
+            continue
+        channels = getattr(group, attr)
+        channels.extend(num for num in getattr(msg, attr) if num not in channels)
+    # high priority has the lowest value, the sort keeps the order otherwise
+    frames.sort(key=lambda msg: msg.priority)
+    return frames
+
+
+async def set_pending(actions: Iterable[tuple]) -> None:
+    """
+    Show the state the commands lead to, in optimistic mode
+    """
+    for channel, action, *args in actions:
+        pending: Callable[..., dict] | None = getattr(
+            channel, f"_{action}_pending", None
+        )
+        if pending is not None:
+            await channel._set_pending(pending(*args))
+
+
+async def run_sent_hooks(actions: Iterable[tuple]) -> None:
+    """
+    Update the channels whose command method changes the local state
+    """
+    for channel, action, *args in actions:
+        hook: Callable[..., Awaitable[Any]] | None = getattr(
+            channel, f"_{action}_sent", None
+        )
+        if hook is not None:
+            await hook(*args)
@@ -0,0 +1,243 @@
+"""
+Write-behind module cache
+
+The cache store is read once, when connecting. After that modules only mark
+themselves dirty when their cached data changes. The dirty modules are
+written together, at most CACHE_FLUSH_DELAY seconds after the first change,
+and when the controller stops. The data is collected on the event loop so it
+is consistent, the store is written in an executor.
+
+Channel state changes go to the state journal, which is written after
+JOURNAL_FLUSH_DELAY seconds, so the last known state survives a restart
+without rewriting the module records.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from velbusaio.const import CACHE_FLUSH_DELAY, JOURNAL_FLUSH_DELAY
+from velbusaio.journal import StateJournal
+from velbusaio.store import CacheStore
+
+if TYPE_CHECKING:
+    from velbusaio.module import Module
+
+# the module type message values that identify a module
+IDENTITY_KEYS = ("type", "serial", "memorymap", "build_year", "build_week")
+
+
+class ModuleCache:
+    """
+    Cached module data with a debounced writer
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        delay: float = CACHE_FLUSH_DELAY,
+        journal_delay: float = JOURNAL_FLUSH_DELAY,
+    ) -> None:
+        self._log = logging.getLogger("velbus-cache")
+        self._store = CacheStore(cache_dir)
+        self._journal = StateJournal(cache_dir)
+        self._delay = delay
+        self._journal_delay = journal_delay
+        self._records: dict[int, dict] = {}
+        self._loaded = False
+        self._dirty: dict[int, Module] = {}
+        self._deleted: set[int] = set()
+        # address => why the cached data was dropped
+        self._invalidations: dict[int, list[str]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._journal_timer: asyncio.TimerHandle | None = None
+        self._journal_task: asyncio.Task | None = None
+        self._writes = 0
+        self._flushes = 0
+        self._last_flush = 0.0
+        self._max_flush = 0.0
+
+    async def load(self) -> None:
+        """
+        Open the store, read all cached modules and replay the journal
+        """
+        if self._loaded:
+            return
+        self._records = await asyncio.get_running_loop().run_in_executor(
+            None, self._load
+        )
+        self._loaded = True
+
+    def _load(self) -> dict[int, dict]:
+        self._store.open()
+        self._journal.replay()
+        return self._store.load_all()
+
+    def is_empty(self) -> bool:
+        return not self._records
+
+    def get(self, address: int) -> dict | None:
+        """
+        Get the cached data of a module
+        """
+        return self._records.get(address)
+
+    def journal_state(self, address: int) -> dict[int, dict]:
+        """
+        The last known channel state of a module, from the journal
+        """
+        return self._journal.get(address)
+
+    def record_state(self, address: int, channel: int, key: str, value) -> None:
+        """
+        Journal a channel state change
+        """
+        self._journal.record(address, channel, key, value)
+        self._schedule_journal()
+
+    def validate(self, module: Module) -> list[str]:
+        """
+        Drop the cached data if the module is not the one that was cached
+
+        The identity reported by the module type message is compared with
+        the cached identity, unknown values on either side are ignored.
+        Returns the reasons the cache was dropped, empty if it is still valid.
+        """
+        address = module.get_addresses()[0]
+        record = self._records.get(address)
+        if record is None:
+            return []
+        identity = module.get_identity()
+        reasons = [
+            f"{key} changed from {record[key]} to {identity[key]}"
+            for key in IDENTITY_KEYS
+            if record.get(key) is not None
+            and identity[key] is not None
+            and record[key] != identity[key]
+        ]
+        if reasons:
+            self._log.info(f"Cache of module {address} is outdated: {reasons}")
+            self._invalidations[address] = reasons
+            self.forget(address)
+        return reasons
+
+    def invalidations(self) -> dict[int, list[str]]:
+        """
+        The modules that were reloaded because their identity changed
+        """
+        return dict(self._invalidations)
+
+    def forget(self, address: int) -> None:
+        """
+        Remove a module from the cache
+        """
+        self._records.pop(address, None)
+        self._dirty.pop(address, None)
+        self._deleted.add(address)
+        self._journal.forget(address)
+        self._schedule()
+        self._schedule_journal()
+
+    def mark_dirty(self, module: Module) -> None:
+        """
+        Schedule the module to be written
+        """
+        self._dirty[module.get_addresses()[0]] = module
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self._delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self.flush())
+        else:
+            # still writing, try again later
+            self._schedule()
+
+    def _schedule_journal(self) -> None:
+        if self._journal_timer is None:
+            loop = asyncio.get_running_loop()
+            self._journal_timer = loop.call_later(
+                self._journal_delay, self._start_journal_write
+            )
+
+    def _start_journal_write(self) -> None:
+        self._journal_timer = None
+        if self._journal_task is None or self._journal_task.done():
+            self._journal_task = asyncio.ensure_future(
+                asyncio.get_running_loop().run_in_executor(None, self._journal.write)
+            )
+        else:
+            self._schedule_journal()
+
+    async def flush(self) -> None:
+        """
+        Write all dirty modules now
+        """
+        if not self._dirty and not self._deleted:
+            return
+        dirty, self._dirty = self._dirty, {}
+        deleted, self._deleted = self._deleted, set()
+        records = {address: module.to_cache() for address, module in dirty.items()}
+        self._records.update(records)
+        start = time.monotonic()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write, records, deleted
+            )
+        finally:
+            self._last_flush = time.monotonic() - start
+            self._max_flush = max(self._max_flush, self._last_flush)
+            self._flushes += 1
+
+    def _write(self, records: dict[int, dict], deleted: set[int]) -> None:
+        try:
+            self._store.open()
+            self._store.save(records, deleted)
+            self._writes += len(records)
+        except Exception as err:
+            # keep the library running, the cache is rebuilt from the bus
+            self._log.error(f"Could not write the module cache: {err}")
+
+    async def close(self) -> None:
+        """
+        Stop the timers, write everything that is still dirty and compact
+        the journal
+        """
+        for timer in (self._timer, self._journal_timer):
+            if timer is not None:
+                timer.cancel()
+        self._timer = self._journal_timer = None
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._journal_task is not None:
+            await self._journal_task
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        # without a replay the journal only knows about the latest changes
+        journal = self._journal.compact if self._loaded else self._journal.write
+        await loop.run_in_executor(None, journal)
+        await loop.run_in_executor(None, self._store.close)
+        self._loaded = False
+
+    def stats(self) -> dict:
+        """
+        Cache write metrics, the latencies are in seconds
+        """
+        return {
+            "modules": len(self._records),
+            "pending": len(self._dirty) + len(self._deleted),
+            "writes": self._writes,
+            "flushes": self._flushes,
+            "last_flush_latency": self._last_flush,
+            "max_flush_latency": self._max_flush,
+            "journal": self._journal.stats(),
+        }
@@ -0,0 +1,342 @@
+"""
+Bus traffic capture and replay
+
+The protocol can write every received and sent frame to a capture file, see
+VelbusProtocol.start_capture. The file starts with a header: MAGIC, and the
+wall clock and monotonic time of the start. Every frame is a fixed size
+record after that: the monotonic time, the direction (RX or TX), the frame
+length and the frame, zero padded to MAXIMUM_MESSAGE_SIZE. Fixed records
+keep the writer cheap and make a capture easy to index, a cut off record at
+the end of the file is ignored. The received bytes the parser could not use
+are kept too, as DISCARDED records of at most MAXIMUM_MESSAGE_SIZE bytes.
+
+A file that grows past max_bytes is rotated like a log file: capture.bin
+becomes capture.bin.1, the oldest of the backups is deleted. A capture that
+already exists when the writer starts is rotated the same way.
+
+replay feeds the received frames of a capture to the packet handler of a
+controller, at the recorded speed or as fast as possible:
+
+    python -m velbusaio.capture replay capture.bin --cache-dir ~/.velbuscache
+    python -m velbusaio.capture info capture.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import struct
+import tempfile
+import time
+from typing import Iterable, Iterator, NamedTuple
+
+from velbusaio.const import CAPTURE_BACKUPS, CAPTURE_MAX_BYTES, MAXIMUM_MESSAGE_SIZE
+from velbusaio.raw_message import create as create_message_info
+
+MAGIC = b"VBCAP\x00\x00\x01"
+# magic, wall clock time, monotonic time
+HEADER = struct.Struct("<8sdd")
+# monotonic time, direction, frame length, frame
+RECORD = struct.Struct(f"<dBB{MAXIMUM_MESSAGE_SIZE}s")
+
+RX = 0
+TX = 1
+# received bytes that are not part of a frame
+DISCARDED = 2
+
+
+class CaptureError(Exception):
+    pass
+
+
+class CaptureRecord(NamedTuple):
+    time: float
+    direction: int
+    frame: bytes
+
+
+class CaptureWriter:
+    """
+    Append frames to a capture file, with rotation
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        self._log = logging.getLogger("velbus-capture")
+        self.path = path
+        self._max_bytes = max(max_bytes, HEADER.size + RECORD.size)
+        self._backups = backups
+        self._file = None
+        self._size = 0
+        self._records = 0
+        self._rotations = 0
+        if os.path.exists(path):
+            # an earlier capture becomes the newest backup
+            self._shift()
+        self._open()
+
+    def _open(self) -> None:
+        # the records are buffered, the file is written in large blocks
+        self._file = open(self.path, "wb", buffering=64 * 1024)
+        self._file.write(HEADER.pack(MAGIC, time.time(), time.monotonic()))
+        self._size = HEADER.size
+
+    def write(self, direction: int, frame: bytes) -> None:
+        if self._file is None:
+            return
+        if self._size + RECORD.size > self._max_bytes:
+            self._rotate()
+        self._file.write(RECORD.pack(time.monotonic(), direction, len(frame), frame))
+        self._size += RECORD.size
+        self._records += 1
+
+    def write_discarded(self, data: bytes) -> None:
+        for start in range(0, len(data), MAXIMUM_MESSAGE_SIZE):
+            self.write(DISCARDED, data[start : start + MAXIMUM_MESSAGE_SIZE])
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._shift()
+        self._rotations += 1
+        self._open()
+
+    def _shift(self) -> None:
+        try:
+            if self._backups > 0:
+                for num in range(self._backups - 1, 0, -1):
+                    src = f"{self.path}.{num}"
+                    if os.path.exists(src):
+                        os.replace(src, f"{self.path}.{num + 1}")
+                os.replace(self.path, f"{self.path}.1")
+        except OSError as err:
+            self._log.error(f"Could not rotate the capture file: {err}")
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self._records,
+            "bytes": self._size,
+            "rotations": self._rotations,
+        }
+
+
+def capture_files(path: str) -> list[str]:
+    """
+    The files of a rotated capture, the oldest first
+    """
+    files = []
+    num = 1
+    while os.path.exists(f"{path}.{num}"):
+        files.insert(0, f"{path}.{num}")
+        num += 1
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """
+    The records of one capture file
+    """
+    with open(path, "rb") as fl:
+        header = fl.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+            raise CaptureError(f"{path} is not a bus capture")
+        while True:
+            data = fl.read(RECORD.size)
+            if len(data) < RECORD.size:
+                return
+            timestamp, direction, length, frame = RECORD.unpack(data)
+            yield CaptureRecord(timestamp, direction, frame[:length])
+
+
+def capture_start(path: str) -> tuple[float, float]:
+    """
+    The wall clock and the monotonic time a capture file was started
+    """
+    with open(path, "rb") as fl:
+        magic, wall, mono = HEADER.unpack(fl.read(HEADER.size))
+    if magic != MAGIC:
+        raise CaptureError(f"{path} is not a bus capture")
+    return wall, mono
+
+
+async def _load_cached_modules(velbus) -> None:
+    """
+    Create the modules of the cache, a capture that does not start with the
+    scan has no module type messages
+    """
+    cache = velbus.get_cache()
+    await cache.load()
+    for address in range(1, 255):
+        record = cache.get(address)
+        if not record or record.get("type") is None:
+            continue
+        module_type = record["type"]
+        velbus.add_module(
+            address, module_type, velbus._handler.pdata.module_type(module_type)
+        )
+        await velbus.get_module(address).load(from_cache=True)
+
+
+async def replay(
+    velbus,
+    paths: Iterable[str],
+    speed: float = 1.0,
+    directions: Iterable[int] = (RX,),
+) -> dict:
+    """
+    Feed the frames of the capture files to the packet handler of velbus
+
+    With speed 1 the frames are handled at the recorded times, 2 is twice
+    as fast, 0 as fast as possible. Only the received frames are replayed,
+    unless directions says otherwise. The modules are created from the
+    cache, and from the module type messages in the capture. The discarded
+    bytes of the capture count as errors, with the received frames.
+    """
+    loop = asyncio.get_running_loop()
+    handler = velbus._handler
+    await handler.read_protocol_data()
+    await _load_cached_modules(velbus)
+    handler._scan_complete = velbus.get_modules() != {}
+    directions = set(directions)
+    known = set(velbus.get_modules())
+
+    frames = 0
+    errors = 0
+    discarded = 0
+    first = None
+    start = loop.time()
+    cpu = 0.0
+    for path in paths:
+        for record in read_capture(path):
+            if record.direction == DISCARDED:
+                if RX in directions:
+                    errors += 1
+                    discarded += len(record.frame)
+                continue
+            if record.direction not in directions:
+                continue
+            if speed and first is not None:
+                delay = (record.time - first) / speed - (loop.time() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if first is None:
+                first = record.time
+            msg, _ = create_message_info(bytearray(record.frame))
+            if msg is None:
+                errors += 1
+                continue
+            before = time.perf_counter()
+            await handler.handle(msg)
+            if len(velbus.get_modules()) != len(known):
+                # found by a module type message, load it like the scan does
+                for address in set(velbus.get_modules()) - known:
+                    known.add(address)
+                    await velbus.get_module(address).load(from_cache=True)
+            cpu += time.perf_counter() - before
+            frames += 1
+    elapsed = loop.time() - start
+    return {
+        "frames": frames,
+        "errors": errors,
+        "discarded_bytes": discarded,
+        "elapsed": elapsed,
+        "handle_time": cpu,
+        "frames_per_sec": frames / cpu if cpu else None,
+        "modules": len(velbus.get_modules()),
+        **handler.decode_counters(),
+    }
+
+
+def _info(path: str) -> dict:
+    files = capture_files(path) or [path]
+    counts = {"rx": 0, "tx": 0, "discarded_bytes": 0}
+    first = last = None
+    for name in files:
+        for record in read_capture(name):
+            if record.direction == DISCARDED:
+                counts["discarded_bytes"] += len(record.frame)
+            else:
+                counts["tx" if record.direction == TX else "rx"] += 1
+            if first is None:
+                first = record.time
+            last = record.time
+    wall, mono = capture_start(files[0])
+    return {
+        "files": files,
+        "started": time.strftime(
+            "%Y-%m-%dT%H:%M:%S", time.localtime(wall + (first or mono) - mono)
+        ),
+        "duration": (last - first) if first is not None else 0.0,
+        **counts,
+    }
+
+
+async def _replay(args: argparse.Namespace) -> dict:
+    from velbusaio.controller import Velbus
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "cache")
+        if args.cache_dir:
+            # the replay updates the module cache, leave the original alone
+            shutil.copytree(args.cache_dir, cache_dir)
+        velbus = Velbus("", cache_dir=cache_dir)
+        directions = (RX, TX) if args.tx else (RX,)
+        result = await replay(
+            velbus, capture_files(args.file) or [args.file], args.speed, directions
+        )
+        await velbus.stop()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="Summary of a capture")
+    info.add_argument("file")
+    replay_parser = commands.add_parser(
+        "replay", help="Feed a capture to the packet handler"
+    )
+    replay_parser.add_argument("file")
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="1 is the recorded speed, 0 as fast as possible",
+    )
+    replay_parser.add_argument(
+        "--cache-dir",
+        help="Module cache with the modules of the capture, replayed on a copy",
+    )
+    replay_parser.add_argument(
+        "--tx", action="store_true", help="Replay the sent frames too"
+    )
+    args = parser.parse_args()
+    if args.command == "info":
+        print(json.dumps(_info(args.file)))
+    else:
+        print(json.dumps(asyncio.run(_replay(args))))
+
+
+if __name__ == "__main__":
+    main()
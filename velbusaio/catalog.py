@@ -0,0 +1,193 @@
+"""
+Compiled protocol catalog
+
+protocol.json describes every known module type, but a typical installation
+only uses a handful of them. The first time the catalog is needed, the json
+file is compiled into a compact catalog file in the cache directory: a
+one-line json index followed by one compact json document per module type.
+Afterwards only the index is parsed at startup, module type data is decoded
+when a module of that type is found on the bus. The catalog is shared by all
+Velbus instances in the process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import threading
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from velbusaio.helpers import h2
+
+CATALOG_VERSION = 1
+PROTOCOL_FILE = os.path.join(os.path.dirname(__file__), "protocol.json")
+
+_catalog: ProtocolCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog_file(cache_dir: str) -> str:
+    """Location of the compiled catalog in a cache directory."""
+    return os.path.join(cache_dir, "catalog", "protocol.catalog")
+
+
+def _source_stamp(source: str) -> list[int]:
+    stat = os.stat(source)
+    return [CATALOG_VERSION, stat.st_size, stat.st_mtime_ns]
+
+
+def compile_catalog(source: str = PROTOCOL_FILE) -> bytes:
+    """
+    Compile protocol.json into the catalog format
+    """
+    with open(source, "rb") as fl:
+        pdata = json.load(fl)
+    body = bytearray()
+    types = {}
+    for typ, data in pdata["ModuleTypes"].items():
+        blob = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        types[typ] = [len(body), len(blob)]
+        body += blob
+    index = {
+        "stamp": _source_stamp(source),
+        "broadcast": pdata["MessagesBroadCast"],
+        "types": types,
+    }
+    return json.dumps(index, separators=(",", ":")).encode("utf-8") + b"\n" + body
+
+
+class ModuleTypes(Mapping):
+    """
+    Read-only ModuleTypes view, keyed by the hex string of the type
+    """
+
+    def __init__(self, catalog: ProtocolCatalog) -> None:
+        self._catalog = catalog
+
+    def __getitem__(self, key: str) -> dict:
+        data = self._catalog.module_type(int(key, 16))
+        if data is None:
+            raise KeyError(key)
+        return data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalog._index)
+
+    def __len__(self) -> int:
+        return len(self._catalog._index)
+
+
+class ProtocolCatalog:
+    """
+    The compiled protocol data
+    """
+
+    def __init__(self, catalog: bytes) -> None:
+        header, _, self._body = catalog.partition(b"\n")
+        index = json.loads(header)
+        self.stamp: list[int] = index["stamp"]
+        self._broadcast: dict[str, dict] = index["broadcast"]
+        self._index: dict[str, list[int]] = index["types"]
+        self._types: dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def module_type(self, module_type: int) -> dict | None:
+        """
+        Get the protocol data for a module type, None if the type is unknown
+        """
+        try:
+            return self._types[module_type]
+        except KeyError:
+            pass
+        key = h2(module_type)
+        if key not in self._index:
+            return None
+        with self._lock:
+            if module_type not in self._types:
+                offset, length = self._index[key]
+                self._types[module_type] = json.loads(
+                    self._body[offset : offset + length]
+                )
+        return self._types[module_type]
+
+    def module_types(self) -> list[int]:
+        """
+        List all known module types
+        """
+        return [int(key, 16) for key in self._index]
+
+    def loaded_module_types(self) -> list[int]:
+        """
+        List the module types that are decoded so far
+        """
+        return list(self._types)
+
+    def __getitem__(self, key: str) -> Any:
+        """
+        Compatibility with the raw protocol.json structure
+        """
+        if key == "ModuleTypes":
+            return ModuleTypes(self)
+        if key == "MessagesBroadCast":
+            return self._broadcast
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in ("ModuleTypes", "MessagesBroadCast")
+
+
+def _load_catalog(source: str, cfile: str | None) -> ProtocolCatalog:
+    if cfile is None:
+        return ProtocolCatalog(compile_catalog(source))
+    log = logging.getLogger("velbus-catalog")
+    stamp = _source_stamp(source)
+    try:
+        with open(cfile, "rb") as fl:
+            catalog = ProtocolCatalog(fl.read())
+        if catalog.stamp == stamp:
+            return catalog
+        log.info("Protocol catalog is outdated, recompiling")
+    except (OSError, ValueError):
+        log.info("No usable protocol catalog, compiling")
+    data = compile_catalog(source)
+    try:
+        pathlib.Path(cfile).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{cfile}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fl:
+            fl.write(data)
+        os.replace(tmp, cfile)
+    except OSError as err:
+        # not fatal, we just compile again next time
+        log.warning(f"Could not store the protocol catalog: {err}")
+    return ProtocolCatalog(data)
+
+
+def get_catalog(cache_dir: str | None = None) -> ProtocolCatalog:
+    """
+    Get the process wide protocol catalog, loading it if needed
+
+    The compiled catalog is kept in cache_dir, without a cache directory it
+    is compiled in memory.
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                cfile = get_catalog_file(cache_dir) if cache_dir else None
+                _catalog = _load_catalog(PROTOCOL_FILE, cfile)
+    return _catalog
+
+
+async def load_catalog(cache_dir: str | None = None) -> ProtocolCatalog:
+    """
+    Get the protocol catalog without blocking the event loop
+    """
+    if _catalog is not None:
+        return _catalog
+    return await asyncio.get_running_loop().run_in_executor(
+        None, get_catalog, cache_dir
+    )
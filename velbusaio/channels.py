@@ -7,6 +7,7 @@ from __future__ import annotations
 import asyncio
 import math
 import string
+from time import perf_counter
 from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from velbusaio.command_registry import commandRegistry
@@ -18,13 +19,21 @@ from velbusaio.const import (
     VOLUME_CUBIC_METER_HOUR,
     VOLUME_LITERS_HOUR,
 )
+from velbusaio.exceptions import VelbusException
 from velbusaio.message import Message
-from velbusaio.messages.edge_set_color import SetEdgeColorMessage, CustomColorPriority
+from velbusaio.messages.edge_set_color import CustomColorPriority, SetEdgeColorMessage
 from velbusaio.messages.module_status import PROGRAM_SELECTION
 
 if TYPE_CHECKING:
     from velbusaio.module import Module
 
+# the status messages that confirm a command
+RELAY_STATUS = (0xFB,)
+BLIND_STATUS = (0xEC,)
+DIMMER_STATUS = (0xB8,)
+# a single channel dimmer reports without a channel byte
+SINGLE_DIMMER_STATUS = (0xB8, 0xEE)
+
 
 class Channel:
     """
@@ -133,7 +142,8 @@ class Channel:
         return {
             k: d[k]
             for k in d
-            if k != "_writer" and k != "_on_status_update" and k != "_name_parts"
+            if k
+            not in ("_writer", "_on_status_update", "_name_parts", "_pending_timer")
         }
 
     def to_cache(self) -> dict:
@@ -142,6 +152,51 @@ class Channel:
             dst["Unit"] = self._Unit
         return dst
 
+    # instance attributes that are not received from the bus
+    _NOT_STATE = (
+        "_num",
+        "_module",
+        "_name",
+        "_is_loaded",
+        "_writer",
+        "_address",
+        "_on_status_update",
+        "_name_parts",
+        "_Unit",
+        "_stale",
+        "_pending",
+        "_pending_timer",
+    )
+
+    # the state was restored from the cache and not yet confirmed by the bus
+    _stale = False
+    # key => confirmed value, while an optimistic value is shown
+    _pending: dict[str, Any] | None = None
+    _pending_timer: asyncio.TimerHandle | None = None
+
+    def restore_state(self, state: dict) -> None:
+        """
+        Restore the state from the cache, without notifying anyone
+
+        The channel is stale until the next update from the bus.
+        """
+        for key, val in state.items():
+            setattr(self, f"_{key}", val)
+        if state:
+            self._stale = True
+
+    def is_stale(self) -> bool:
+        """
+        Is the state restored from the cache and not yet confirmed by the bus
+        """
+        return self._stale
+
+    def is_pending(self) -> bool:
+        """
+        Is an optimistic state shown that the bus did not confirm yet
+        """
+        return bool(self._pending)
+
     def __setstate__(self, state):
         self.__dict__.update(state)
         self._on_status_update = []
@@ -161,20 +216,98 @@ class Channel:
         data = {}
         for key, value in self.__dict__.items():
             data["type"] = self.__class__.__name__
-            if key not in ["_module", "_writer", "_name_parts", "_on_status_update"]:
+            if key not in [
+                "_module",
+                "_writer",
+                "_name_parts",
+                "_on_status_update",
+                "_pending",
+                "_pending_timer",
+            ]:
                 data[key.replace("_", "", 1)] = value
+        data["pending"] = sorted(self._pending or ())
         return data
 
     async def update(self, data: dict) -> None:
         """
         Set the attributes of this channel
         """
+        settled = self._settle_pending(data)
+        refresh = self._stale or settled
+        self._stale = False
+        notified = False
         for key, new_val in data.items():
             cur_val = getattr(self, f"_{key}", None)
             if cur_val is None or cur_val != new_val:
                 setattr(self, f"_{key}", new_val)
-                for m in self._on_status_update:
-                    await m()
+                self._journal(key, new_val)
+                notified = True
+                await self._notify()
+            elif key in settled:
+                self._journal(key, new_val)
+        if refresh and not notified:
+            # the shown state is confirmed, but no longer stale or pending
+            await self._notify()
+
+    async def _notify(self) -> None:
+        metrics = self._module._metrics if self._module is not None else None
+        start = perf_counter() if metrics is not None else 0.0
+        for m in self._on_status_update:
+            await m()
+        if metrics is not None:
+            metrics.observe("fanout", perf_counter() - start)
+
+    async def _set_pending(self, data: dict) -> None:
+        """
+        Show the expected state of a command until the bus confirms it
+
+        Only in optimistic mode. Without a confirmation in time the
+        confirmed state comes back.
+        """
+        if self._module is None or self._module._optimistic_timeout is None:
+            return
+        if self._pending is None:
+            self._pending = {}
+        for key, val in data.items():
+            self._pending.setdefault(key, getattr(self, f"_{key}", None))
+            setattr(self, f"_{key}", val)
+        if self._pending_timer is not None:
+            self._pending_timer.cancel()
+        self._pending_timer = asyncio.get_running_loop().call_later(
+            self._module._optimistic_timeout, self._rollback
+        )
+        await self._notify()
+
+    def _settle_pending(self, data: dict) -> set[str]:
+        """
+        The bus reported these keys, they are no longer pending
+        """
+        if not self._pending:
+            return set()
+        settled = {key for key in data if key in self._pending}
+        for key in settled:
+            del self._pending[key]
+        if not self._pending and self._pending_timer is not None:
+            self._pending_timer.cancel()
+            self._pending_timer = None
+        return settled
+
+    def _rollback(self) -> None:
+        self._pending_timer = None
+        if not self._pending:
+            return
+        for key, val in self._pending.items():
+            setattr(self, f"_{key}", val)
+        self._pending = {}
+        asyncio.ensure_future(self._notify())
+
+    def _journal(self, key: str, val: Any) -> None:
+        if (
+            self._module is not None
+            and f"_{key}" not in self._NOT_STATE
+            and isinstance(val, (bool, int, float, str, list))
+        ):
+            self._module._record_state(self._num, key, val)
 
     def get_categories(self) -> list[str]:
         """
@@ -201,9 +334,46 @@ class Channel:
     def is_water(self) -> bool:
         return False
 
-    async def press(self) -> None:
+    async def press(self, long: bool = False) -> asyncio.Future:
+        """
+        Press the channel, a long press with long
+
+        Returns right away with a future that is done when the release is
+        sent. Awaiting press used to wait for the 0.3 s hold and the
+        release, callers that relied on that must await the future as well.
+        """
         raise NotImplementedError()
 
+    async def _send(
+        self,
+        msg: Message,
+        confirm: bool,
+        expect: tuple[int, ...],
+        pending: dict | None = None,
+    ) -> None:
+        """
+        Send a command, with confirm wait for the status of this channel
+
+        pending is the state the command should lead to, it is shown right
+        away in optimistic mode.
+        """
+        if pending:
+            await self._set_pending(pending)
+        if not confirm:
+            await self._writer(msg)
+            return
+        try:
+            await self._module.send_confirmed(
+                msg,
+                expect,
+                lambda reply: self._module.reply_channel(reply) == self._num,
+            )
+        except VelbusException:
+            if self._pending_timer is not None:
+                self._pending_timer.cancel()
+            self._rollback()
+            raise
+
 
 class Blind(Channel):
     """
@@ -251,35 +421,65 @@ class Blind(Channel):
         # For VMBxBL modules, position will remain None and not be overwritten
         return self._position is not None
 
-    async def open(self) -> None:
-        cls = commandRegistry.get_command(0x05, self._module.get_type())
+    def _blind_message(self, code: int) -> Message:
+        cls = commandRegistry.get_command(code, self._module.get_type())
         msg = cls(self._address)
         msg.channel = self._num
-        await self._writer(msg)
+        return msg
 
-    async def close(self) -> None:
-        cls = commandRegistry.get_command(0x06, self._module.get_type())
-        msg = cls(self._address)
-        msg.channel = self._num
-        await self._writer(msg)
+    def _open_message(self) -> Message:
+        return self._blind_message(0x05)
 
-    async def stop(self) -> None:
-        cls = commandRegistry.get_command(0x04, self._module.get_type())
-        msg = cls(self._address)
-        msg.channel = self._num
-        await self._writer(msg)
+    def _close_message(self) -> Message:
+        return self._blind_message(0x06)
+
+    def _stop_message(self) -> Message:
+        return self._blind_message(0x04)
 
-    async def set_position(self, position: int) -> None:
+    def _set_position_message(self, position: int) -> Message:
         # may not be supported by the module
         if position == 100:
             # at least VMB1BLS ignores command 0x1C with position 0x64
-            await self.close()
-            return
-        cls = commandRegistry.get_command(0x1C, self._module.get_type())
-        msg = cls(self._address)
-        msg.channel = self._num
+            return self._close_message()
+        msg = self._blind_message(0x1C)
         msg.position = position
-        await self._writer(msg)
+        return msg
+
+    # the state the commands lead to
+    def _open_pending(self) -> dict:
+        return {"state": 0x01}
+
+    def _close_pending(self) -> dict:
+        return {"state": 0x02}
+
+    def _stop_pending(self) -> dict:
+        return {"state": 0x00}
+
+    def _set_position_pending(self, position: int) -> dict:
+        return {"position": position}
+
+    async def open(self, confirm: bool = False) -> None:
+        await self._send(
+            self._open_message(), confirm, BLIND_STATUS, self._open_pending()
+        )
+
+    async def close(self, confirm: bool = False) -> None:
+        await self._send(
+            self._close_message(), confirm, BLIND_STATUS, self._close_pending()
+        )
+
+    async def stop(self, confirm: bool = False) -> None:
+        await self._send(
+            self._stop_message(), confirm, BLIND_STATUS, self._stop_pending()
+        )
+
+    async def set_position(self, position: int, confirm: bool = False) -> None:
+        await self._send(
+            self._set_position_message(position),
+            confirm,
+            BLIND_STATUS,
+            self._set_position_pending(position),
+        )
 
 
 class Button(Channel):
@@ -311,10 +511,7 @@ class Button(Channel):
             return True
         return False
 
-    async def set_led_state(self, state: str) -> None:
-        """
-        Set led
-        """
+    def _set_led_state_message(self, state: str) -> Message | None:
         if state == "on":
             code = 0xF6
         elif state == "slow":
@@ -324,33 +521,38 @@ class Button(Channel):
         elif state == "off":
             code = 0xF5
         else:
-            return
+            return None
 
         _mod_add = self.get_module_address("Button")
         _chn_num = self._num - self._module.calc_channel_offset(_mod_add)
         cls = commandRegistry.get_command(code, self._module.get_type())
         msg = cls(_mod_add)
         msg.leds = [_chn_num]
-        await self._writer(msg)
+        return msg
+
+    async def _set_led_state_sent(self, state: str) -> None:
         await self.update({"led_state": state})
 
-    async def press(self) -> None:
+    async def set_led_state(self, state: str) -> None:
+        """
+        Set led
+        """
+        msg = self._set_led_state_message(state)
+        if msg is None:
+            return
+        await self._writer(msg)
+        await self._set_led_state_sent(state)
+
+    async def press(self, long: bool = False) -> asyncio.Future:
         """
         Press the button
+
+        Returns right away, the release is sent later. Await the returned
+        future to know when the button is released, see Channel.press.
         """
         _mod_add = self.get_module_address("Button")
         _chn_num = self._num - self._module.calc_channel_offset(_mod_add)
-        # send the just pressed
-        cls = commandRegistry.get_command(0x00, self._module.get_type())
-        msg = cls(_mod_add)
-        msg.closed = [_chn_num]
-        await self._writer(msg)
-        # wait
-        await asyncio.sleep(0.3)
-        # send the just released
-        msg = cls(_mod_add)
-        msg.opened = [_chn_num]
-        await self._writer(msg)
+        return self._module.get_presser().press(_mod_add, _chn_num, long)
 
 
 class ButtonCounter(Button):
@@ -475,26 +677,60 @@ class Dimmer(Channel):
         """
         return int(self._state * 100 / self.slider_scale)
 
-    async def set_dimmer_state(self, slider: int, transitiontime: int = 0) -> None:
-        """
-        Set dimmer to slider
-        """
+    def _set_dimmer_state_message(
+        self, slider: int, transitiontime: int = 0
+    ) -> Message:
         cls = commandRegistry.get_command(0x07, self._module.get_type())
         msg = cls(self._address)
         msg.dimmer_state = int(slider * self.slider_scale / 100)
         msg.dimmer_transitiontime = int(transitiontime)
         msg.dimmer_channels = [self._num]
-        await self._writer(msg)
+        return msg
 
-    async def restore_dimmer_state(self, transitiontime: int = 0) -> None:
-        """
-        restore dimmer to last known state
-        """
+    def _restore_dimmer_state_message(self, transitiontime: int = 0) -> Message:
         cls = commandRegistry.get_command(0x11, self._module.get_type())
         msg = cls(self._address)
         msg.dimmer_transitiontime = int(transitiontime)
         msg.dimmer_channels = [self._num]
-        await self._writer(msg)
+        return msg
+
+    def _dimmer_status(self) -> tuple[int, ...]:
+        """
+        The status messages that report this channel
+        """
+        dimmers = [
+            chan
+            for chan in self._module.get_channels().values()
+            if isinstance(chan, Dimmer)
+        ]
+        if len(dimmers) == 1 and dimmers[0] is self:
+            return SINGLE_DIMMER_STATUS
+        return DIMMER_STATUS
+
+    def _set_dimmer_state_pending(self, slider: int, transitiontime: int = 0) -> dict:
+        return {"state": int(slider * self.slider_scale / 100)}
+
+    async def set_dimmer_state(
+        self, slider: int, transitiontime: int = 0, confirm: bool = False
+    ) -> None:
+        """
+        Set dimmer to slider
+        """
+        await self._send(
+            self._set_dimmer_state_message(slider, transitiontime),
+            confirm,
+            self._dimmer_status(),
+            self._set_dimmer_state_pending(slider),
+        )
+
+    async def restore_dimmer_state(
+        self, transitiontime: int = 0, confirm: bool = False
+    ) -> None:
+        """
+        restore dimmer to last known state
+        """
+        msg = self._restore_dimmer_state_message(transitiontime)
+        await self._send(msg, confirm, self._dimmer_status())
 
 
 class Temperature(Channel):
@@ -706,23 +942,40 @@ class Relay(Channel):
     def is_disabled(self) -> bool:
         return self._disabled
 
-    async def turn_on(self) -> None:
+    def _relay_message(self, code: int) -> Message:
+        cls = commandRegistry.get_command(code, self._module.get_type())
+        msg = cls(self._address)
+        msg.relay_channels = [self._num]
+        return msg
+
+    def _turn_on_message(self) -> Message:
+        return self._relay_message(0x02)
+
+    def _turn_off_message(self) -> Message:
+        return self._relay_message(0x01)
+
+    # the state the commands lead to
+    def _turn_on_pending(self) -> dict:
+        return {"on": True}
+
+    def _turn_off_pending(self) -> dict:
+        return {"on": False}
+
+    async def turn_on(self, confirm: bool = False) -> None:
         """
         Send the turn on message
         """
-        cls = commandRegistry.get_command(0x02, self._module.get_type())
-        msg = cls(self._address)
-        msg.relay_channels = [self._num]
-        await self._writer(msg)
+        await self._send(
+            self._turn_on_message(), confirm, RELAY_STATUS, self._turn_on_pending()
+        )
 
-    async def turn_off(self) -> None:
+    async def turn_off(self, confirm: bool = False) -> None:
         """
         Send the turn off message
         """
-        cls = commandRegistry.get_command(0x01, self._module.get_type())
-        msg = cls(self._address)
-        msg.relay_channels = [self._num]
-        await self._writer(msg)
+        await self._send(
+            self._turn_off_message(), confirm, RELAY_STATUS, self._turn_off_pending()
+        )
 
 
 class EdgeLit(Channel):
@@ -0,0 +1,521 @@
+"""Command registry index.
+
+Generated by `python -m velbusaio.command_registry`, do not edit.
+Maps the command codes to the message classes, so the message modules
+are only imported when a frame of that type is decoded or sent.
+"""
+
+from __future__ import annotations
+
+DEFAULT_COMMANDS: dict[int, str] = {
+    0x00: "velbusaio.messages.push_button_status:PushButtonStatusMessage",
+    0x01: "velbusaio.messages.switch_relay_off:SwitchRelayOffMessage",
+    0x02: "velbusaio.messages.switch_relay_on:SwitchRelayOnMessage",
+    0x03: "velbusaio.messages.start_relay_timer:StartRelayTimerMessage",
+    0x09: "velbusaio.messages.bus_off:BusOffMessage",
+    0x0A: "velbusaio.messages.bus_active:BusActiveMessage",
+    0x0B: "velbusaio.messages.receive_buffer_full:ReceiveBufferFullMessage",
+    0x0C: "velbusaio.messages.receive_ready:ReceiveReadyMessage",
+    0x0D: "velbusaio.messages.start_relay_blinking_timer:StartRelayBlinkingTimerMessage",
+    0x0E: "velbusaio.messages.interface_status_request:InterfaceStatusRequestMessage",
+    0x12: "velbusaio.messages.forced_off:ForcedOff",
+    0x14: "velbusaio.messages.forced_on:ForcedOn",
+    0x6A: "velbusaio.messages.write_module_address_and_serial_number:WriteModuleAddressAndSerialNumberMessage",
+    0xA6: "velbusaio.messages.module_subtype:ModuleSubTypeMessage",
+    0xA7: "velbusaio.messages.module_subtype:ModuleSubTypeMessage",
+    0xAA: "velbusaio.messages.light_value_request:LightValueRequest",
+    0xAC: "velbusaio.messages.memo_text:MemoTextMessage",
+    0xAF: "velbusaio.messages.set_daylight_saving:SetDaylightSaving",
+    0xB0: "velbusaio.messages.module_subtype:ModuleSubTypeMessage",
+    0xB3: "velbusaio.messages.select_program:SelectProgramMessage",
+    0xB7: "velbusaio.messages.set_date:SetDate",
+    0xB9: "velbusaio.messages.temp_sensor_settings_part4:TempSensorSettingsPart4",
+    0xBE: "velbusaio.messages.kwh_status:KwhStatusMessage",
+    0xC6: "velbusaio.messages.temp_sensor_settings_part3:TempSensorSettingsPart3",
+    0xC9: "velbusaio.messages.read_data_block_from_memory:ReadDataBlockFromMemoryMessage",
+    0xCA: "velbusaio.messages.write_memory_block:WriteMemoryBlockMessage",
+    0xCB: "velbusaio.messages.memory_dump_request:MemoryDumpRequestMessage",
+    0xCC: "velbusaio.messages.memory_data_block:MemoryDataBlockMessage",
+    0xD7: "velbusaio.messages.realtime_clock_status_request:RealtimeClockStatusRequest",
+    0xD8: "velbusaio.messages.set_realtime_clock:SetRealtimeClock",
+    0xD9: "velbusaio.messages.bus_error_counter_status_request:BusErrorStatusRequestMessage",
+    0xDA: "velbusaio.messages.bus_error_counter_status:BusErrorCounterStatusMessage",
+    0xDB: "velbusaio.messages.switch_to_comfort:SwitchToComfortMessage",
+    0xDC: "velbusaio.messages.switch_to_day:SwitchToDayMessage",
+    0xDD: "velbusaio.messages.switch_to_night:SwitchToNightMessage",
+    0xDE: "velbusaio.messages.switch_to_safe:SwitchToSafeMessage",
+    0xDF: "velbusaio.messages.temp_set_cooling:TempSetCoolingMessage",
+    0xE0: "velbusaio.messages.temp_set_heating:TempSetHeatingMessage",
+    0xE4: "velbusaio.messages.set_temperature:SetTemperatureMessage",
+    0xE5: "velbusaio.messages.sensor_temp_request:SensorTempRequest",
+    0xE6: "velbusaio.messages.sensor_temperature:SensorTemperatureMessage",
+    0xE7: "velbusaio.messages.temp_sensor_settings_request:TempSensorSettingsRequest",
+    0xE8: "velbusaio.messages.temp_sensor_settings_part1:TempSensorSettingsPart1",
+    0xE9: "velbusaio.messages.temp_sensor_settings_part2:TempSensorSettingsPart2",
+    0xEA: "velbusaio.messages.temp_sensor_status:TempSensorStatusMessage",
+    0xED: "velbusaio.messages.module_status:ModuleStatusMessage",
+    0xEF: "velbusaio.messages.channel_name_request:ChannelNameRequestMessage",
+    0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message",
+    0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message",
+    0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message",
+    0xF4: "velbusaio.messages.update_led_status:UpdateLedStatusMessage",
+    0xF5: "velbusaio.messages.clear_led:ClearLedMessage",
+    0xF6: "velbusaio.messages.set_led:SetLedMessage",
+    0xF7: "velbusaio.messages.slow_blinking_led:SlowBlinkingLedMessage",
+    0xF8: "velbusaio.messages.fast_blinking_led:FastBlinkingLedMessage",
+    0xF9: "velbusaio.messages.very_fast_blinking_led:VeryFastBlinkingLedMessage",
+    0xFA: "velbusaio.messages.module_status_request:ModuleStatusRequestMessage",
+    0xFB: "velbusaio.messages.relay_status:RelayStatusMessage",
+    0xFC: "velbusaio.messages.write_data_to_memory:WriteDataToMemoryMessage",
+    0xFD: "velbusaio.messages.read_data_from_memory:ReadDataFromMemoryMessage",
+    0xFE: "velbusaio.messages.memory_data:MemoryDataMessage",
+}
+
+MODULE_COMMANDS: dict[int, dict[int, str]] = {
+    0x03: {
+        0x04: "velbusaio.messages.cover_off:CoverOffMessage2",
+        0x05: "velbusaio.messages.cover_up:CoverUpMessage2",
+        0x06: "velbusaio.messages.cover_down:CoverDownMessage2",
+        0xEC: "velbusaio.messages.blind_status:BlindStatusMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message3",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message3",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message3",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x04: {
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+    },
+    0x05: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x07: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xEE: "velbusaio.messages.dimmer_status:DimmerStatusMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x08: {
+        0xFB: "velbusaio.messages.relay_status:RelayStatusMessage2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x09: {
+        0x04: "velbusaio.messages.cover_off:CoverOffMessage2",
+        0x05: "velbusaio.messages.cover_up:CoverUpMessage2",
+        0x06: "velbusaio.messages.cover_down:CoverDownMessage2",
+        0xEC: "velbusaio.messages.blind_status:BlindStatusMessage",
+        0xEF: "velbusaio.messages.channel_name_request:ChannelNameRequestMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message3",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message3",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message3",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x0A: {
+        0xEB: "velbusaio.messages.ir_receiver_status:IRReceiverStatusMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x0B: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x0C: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x0D: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x0E: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x0F: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xEE: "velbusaio.messages.dimmer_status:DimmerStatusMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x10: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x11: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x12: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xB8: "velbusaio.messages.dimmer_channel_status:DimmerChannelStatusMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x13: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x14: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xEE: "velbusaio.messages.dimmer_status:DimmerStatusMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x15: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage2",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xB8: "velbusaio.messages.dimmer_channel_status:DimmerChannelStatusMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x16: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x17: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x18: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x19: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x1A: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x1B: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x1C: {
+        0x04: "velbusaio.messages.cover_off:CoverOffMessage",
+        0x05: "velbusaio.messages.cover_up:CoverUpMessage",
+        0x06: "velbusaio.messages.cover_down:CoverDownMessage",
+        0x1C: "velbusaio.messages.cover_position:CoverPosMessage",
+        0xEC: "velbusaio.messages.blind_status:BlindStatusNgMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x1D: {
+        0x04: "velbusaio.messages.cover_off:CoverOffMessage",
+        0x05: "velbusaio.messages.cover_up:CoverUpMessage",
+        0x06: "velbusaio.messages.cover_down:CoverDownMessage",
+        0x1C: "velbusaio.messages.cover_position:CoverPosMessage",
+        0xEC: "velbusaio.messages.blind_status:BlindStatusNgMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x1E: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x1F: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x20: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x21: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x22: {
+        0xBD: "velbusaio.messages.counter_status_request:CounterStatusRequestMessage",
+        0xBE: "velbusaio.messages.counter_status:CounterStatusMessage",
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x28: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x29: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x2A: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusPirMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x2B: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusPirMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x2C: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusPirMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x2D: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusGP4PirMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x2E: {
+        0x04: "velbusaio.messages.cover_off:CoverOffMessage",
+        0x05: "velbusaio.messages.cover_up:CoverUpMessage",
+        0x06: "velbusaio.messages.cover_down:CoverDownMessage",
+        0x1C: "velbusaio.messages.cover_position:CoverPosMessage",
+        0xEC: "velbusaio.messages.blind_status:BlindStatusNgMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x2F: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage2",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xB8: "velbusaio.messages.dimmer_channel_status:DimmerChannelStatusMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x31: {
+        0xA9: "velbusaio.messages.raw:MeteoRawMessage",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x32: {
+        0xA9: "velbusaio.messages.raw:SensorRawMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x33: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x34: {
+        0xD4: "velbusaio.messages.edge_set_color:SetEdgeColorMessage",
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x35: {
+        0xD4: "velbusaio.messages.edge_set_color:SetEdgeColorMessage",
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x36: {
+        0xD4: "velbusaio.messages.edge_set_color:SetEdgeColorMessage",
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x37: {
+        0xD4: "velbusaio.messages.edge_set_color:SetEdgeColorMessage",
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x38: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusPirMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x39: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x3A: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x3B: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x3C: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x3D: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x3E: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusGP4PirMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x3F: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x40: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x41: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x42: {
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x43: {
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x44: {
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x45: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage2",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage2",
+        0xA5: "velbusaio.messages.dali_dim_value_status:DimValueStatus",
+        0xE7: "velbusaio.messages.dali_device_settings_request:DaliDeviceSettingsRequest",
+        0xE8: "velbusaio.messages.dali_device_settings:DaliDeviceSettingMsg",
+        0xEF: "velbusaio.messages.channel_name_request:ChannelNameRequestMessage3",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleTypeMessage",
+    },
+    0x48: {
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x49: {
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x4A: {
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x4B: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage2",
+        0x0F: "velbusaio.messages.slider_status:SliderStatusMessage",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage",
+        0xB8: "velbusaio.messages.dimmer_channel_status:DimmerChannelStatusMessage",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+    },
+    0x4C: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x4F: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x50: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x51: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x52: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x53: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x54: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x55: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x56: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x5A: {
+        0x07: "velbusaio.messages.set_dimmer:SetDimmerMessage2",
+        0x11: "velbusaio.messages.restore_dimmer:RestoreDimmerMessage2",
+        0xA5: "velbusaio.messages.dali_dim_value_status:DimValueStatus",
+        0xE7: "velbusaio.messages.dali_device_settings_request:DaliDeviceSettingsRequest",
+        0xE8: "velbusaio.messages.dali_device_settings:DaliDeviceSettingMsg",
+        0xEF: "velbusaio.messages.channel_name_request:ChannelNameRequestMessage3",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+    },
+    0x5C: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+    0x5F: {
+        0xED: "velbusaio.messages.module_status:ModuleStatusMessage2",
+        0xF0: "velbusaio.messages.channel_name_part1:ChannelNamePart1Message2",
+        0xF1: "velbusaio.messages.channel_name_part2:ChannelNamePart2Message2",
+        0xF2: "velbusaio.messages.channel_name_part3:ChannelNamePart3Message2",
+        0xFF: "velbusaio.messages.module_type:ModuleType2Message",
+    },
+}
@@ -5,6 +5,11 @@
 
 from __future__ import annotations
 
+import importlib
+from types import ModuleType
+
+from velbusaio import command_index
+
 MODULE_DIRECTORY = {
     0x01: "VMB8PB",
     0x02: "VMB1RY",
@@ -88,13 +93,22 @@ MODULE_DIRECTORY = {
 
 
 class CommandRegistry:
-    """Command registry class."""
+    """Command registry class.
 
-    def __init__(self, module_directory: dict) -> None:
+    With an index, message classes that are not registered yet are looked
+    up in the index and their module is imported on first use.
+    """
+
+    def __init__(self, module_directory: dict, index: ModuleType | None = None) -> None:
         """Init method."""
         self._module_directory = module_directory
         self._default_commands = {}
         self._overrides = {}
+        self._index_defaults: dict[int, str] = {}
+        self._index_overrides: dict[int, dict[int, str]] = {}
+        if index is not None:
+            self._index_defaults = index.DEFAULT_COMMANDS
+            self._index_overrides = index.MODULE_COMMANDS
 
     def register_command(
         self, command_value: int, command_class: type, module_name: str | None = None
@@ -144,6 +158,11 @@ class CommandRegistry:
                 return True
         if command_value in self._default_commands:
             return True
+        if module_type in self._index_overrides:
+            if command_value in self._index_overrides[module_type]:
+                return True
+        if command_value in self._index_defaults:
+            return True
         return False
 
     def get_command(self, command_value: int, module_type: int = 0) -> None | type:
@@ -151,12 +170,39 @@ class CommandRegistry:
         if module_type in self._overrides:
             if command_value in self._overrides[module_type]:
                 return self._overrides[module_type][command_value]
+        if module_type in self._index_overrides:
+            if command_value in self._index_overrides[module_type]:
+                return self._import(self._index_overrides[module_type][command_value])
         if command_value in self._default_commands:
             return self._default_commands[command_value]
+        if command_value in self._index_defaults:
+            return self._import(self._index_defaults[command_value])
         return None
 
+    def _import(self, path: str) -> type:
+        """Import a message class, importing registers it."""
+        module, name = path.split(":")
+        return getattr(importlib.import_module(module), name)
+
+    def load_all(self) -> None:
+        """Import all message modules, the eager way."""
+        from velbusaio.messages import MESSAGE_MODULES
+
+        for module in MESSAGE_MODULES:
+            importlib.import_module(f"velbusaio.messages.{module}")
+
+    def registered_commands(self) -> list[tuple[int, type]]:
+        """List every (command value, message class) pair, loads all messages."""
+        self.load_all()
+        result = list(self._default_commands.items())
+        for overrides in self._overrides.values():
+            for item in overrides.items():
+                if item not in result:
+                    result.append(item)
+        return sorted(result, key=lambda item: (item[0], item[1].__name__))
 
-commandRegistry = CommandRegistry(MODULE_DIRECTORY)
+
+commandRegistry = CommandRegistry(MODULE_DIRECTORY, command_index)
 
 
 def register(command_value: int, module_types: list[str] | None = None):
@@ -173,3 +219,45 @@ def register(command_value: int, module_types: list[str] | None = None):
         return command_class
 
     return inner_register
+
+
+def generate_index() -> str:
+    """Generate the velbusaio.command_index module."""
+    commandRegistry.load_all()
+
+    def path(command_class: type) -> str:
+        return f"{command_class.__module__}:{command_class.__qualname__}"
+
+    lines = [
+        '"""Command registry index.',
+        "",
+        "Generated by `python -m velbusaio.command_registry`, do not edit.",
+        "Maps the command codes to the message classes, so the message modules",
+        "are only imported when a frame of that type is decoded or sent.",
+        '"""',
+        "",
+        "from __future__ import annotations",
+        "",
+        "DEFAULT_COMMANDS: dict[int, str] = {",
+    ]
+    for command_value, command_class in sorted(
+        commandRegistry._default_commands.items()
+    ):
+        lines.append(f'    0x{command_value:02X}: "{path(command_class)}",')
+    lines.append("}")
+    lines.append("")
+    lines.append("MODULE_COMMANDS: dict[int, dict[int, str]] = {")
+    for module_type, commands in sorted(commandRegistry._overrides.items()):
+        lines.append(f"    0x{module_type:02X}: {{")
+        for command_value, command_class in sorted(commands.items()):
+            lines.append(f'        0x{command_value:02X}: "{path(command_class)}",')
+        lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    # python -m velbusaio.command_registry > velbusaio/command_index.py
+    from velbusaio.command_registry import generate_index as _generate_index
+
+    print(_generate_index(), end="")
@@ -0,0 +1,96 @@
+"""
+Confirmed commands
+
+A confirmed command is sent as a request that waits for the status message
+of the channel. Without a status in time the command is sent again, with a
+doubled timeout, until CONFIRM_RETRIES retries are used up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from velbusaio.const import CONFIRM_RETRIES, CONFIRM_TIMEOUT
+from velbusaio.exceptions import VelbusCommandNotConfirmed
+from velbusaio.stats import Histogram
+
+if TYPE_CHECKING:
+    from velbusaio.message import Message
+
+
+class AckStats:
+    """
+    Confirmation counters of one module
+    """
+
+    def __init__(self) -> None:
+        self.confirmed = 0
+        self.failed = 0
+        self.retries = 0
+        # from the first attempt to the status message
+        self.latency = Histogram()
+
+    def snapshot(self) -> dict:
+        done = self.confirmed + self.failed
+        return {
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "success_rate": self.confirmed / done if done else None,
+            "ack_latency": self.latency.snapshot(),
+        }
+
+
+class CommandConfirmer:
+    """
+    Send commands and wait until the module confirms them
+    """
+
+    def __init__(
+        self,
+        request: Callable[..., asyncio.Future],
+        timeout: float = CONFIRM_TIMEOUT,
+        retries: int = CONFIRM_RETRIES,
+    ) -> None:
+        self._request = request
+        self._timeout = timeout
+        self._retries = retries
+        # module address => counters
+        self._stats: dict[int, AckStats] = {}
+
+    async def send(
+        self,
+        msg: Message,
+        expect: Iterable[int],
+        match: Callable[[Message], bool] | None = None,
+    ) -> Message:
+        """
+        Send msg until a status message is received
+
+        Returns the status message, raises VelbusCommandNotConfirmed when
+        every attempt timed out.
+        """
+        stats = self._stats.setdefault(msg.address, AckStats())
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        timeout = self._timeout
+        for attempt in range(self._retries + 1):
+            if attempt:
+                stats.retries += 1
+            try:
+                reply = await self._request(msg, expect, timeout=timeout, match=match)
+            except asyncio.TimeoutError:
+                timeout *= 2
+                continue
+            stats.confirmed += 1
+            stats.latency.observe(loop.time() - start)
+            return reply
+        stats.failed += 1
+        raise VelbusCommandNotConfirmed(msg.address, self._retries + 1)
+
+    def stats(self) -> dict[int, dict]:
+        """
+        Confirmation counters and ack latencies per module address
+        """
+        return {address: stats.snapshot() for address, stats in self._stats.items()}
@@ -38,6 +38,52 @@ RTR: Final = 0x40
 NO_RTR: Final = 0x00
 
 CACHEDIR: Final = ".velbuscache"
+# seconds between a module change and writing its cache file
+CACHE_FLUSH_DELAY: Final = 5
+# seconds between a channel state change and writing it to the state journal
+JOURNAL_FLUSH_DELAY: Final = 1
+# size of the state journal that triggers a compaction
+JOURNAL_MAX_BYTES: Final = 1024 * 1024
+# size of a bus capture file that triggers a rotation, and the number of
+# rotated files to keep
+CAPTURE_MAX_BYTES: Final = 16 * 1024 * 1024
+CAPTURE_BACKUPS: Final = 4
+# the bus traffic counters: one slot per second, the longest window
+TRAFFIC_SLOTS: Final = 60
+# serial line speed, every byte is a start bit, 8 data bits and a stop bit
+BUS_BAUD_RATE: Final = 38400
+BUS_BITS_PER_BYTE: Final = 10
+# frame trace: one in TRACE_SAMPLE frames is logged, at most TRACE_RATE_LIMIT
+# records per second
+TRACE_SAMPLE: Final = 100
+TRACE_RATE_LIMIT: Final = 20
+# port of the prometheus metrics endpoint
+METRICS_PORT: Final = 9420
+
+# seconds to wait for the reply to a request
+REQUEST_TIMEOUT: Final = 2
+# confirmed commands: seconds to wait for the status of the first attempt,
+# doubled for every retry
+CONFIRM_TIMEOUT: Final = 0.5
+CONFIRM_RETRIES: Final = 2
+# seconds an optimistic channel state waits for the status from the bus
+OPTIMISTIC_TIMEOUT: Final = 5
+# seconds between status refreshes, per channel type
+REFRESH_INTERVALS: Final = {
+    "ButtonCounter": 300,
+    "Temperature": 600,
+    "LightSensor": 600,
+    "Blind": 1800,
+    "Dimmer": 1800,
+    "Relay": 1800,
+}
+# minimal seconds between refreshing two modules
+REFRESH_SPACING: Final = 1
+# seconds between pressing and releasing a virtual button
+PRESS_DURATION: Final = 0.3
+# a long press reports the button as held after LONG_PRESS_DELAY seconds
+LONG_PRESS_DELAY: Final = 0.85
+LONG_PRESS_DURATION: Final = 1.2
 
 # Module scan timeout values (in mSec)
 SCAN_MODULETYPE_TIMEOUT: Final = 2000  # time to wait for ModuleTypeRequest
@@ -8,12 +8,26 @@ import pathlib
 import re
 import ssl
 import time
+from typing import Callable, Iterable
 from urllib.parse import urlparse
 
 import serial
 import serial_asyncio_fast
 
+from velbusaio.batch import build_frames, run_sent_hooks, set_pending
+from velbusaio.cache import ModuleCache
 from velbusaio.channels import Channel
+from velbusaio.confirm import CommandConfirmer
+from velbusaio.const import (
+    CAPTURE_BACKUPS,
+    CAPTURE_MAX_BYTES,
+    METRICS_PORT,
+    OPTIMISTIC_TIMEOUT,
+    REQUEST_TIMEOUT,
+    TRACE_RATE_LIMIT,
+    TRACE_SAMPLE,
+)
+from velbusaio.correlation import RequestTracker
 from velbusaio.exceptions import VelbusConnectionFailed
 from velbusaio.handler import PacketHandler
 from velbusaio.helpers import get_cache_dir
@@ -22,9 +36,13 @@ from velbusaio.messages.module_type_request import ModuleTypeRequestMessage
 from velbusaio.messages.set_date import SetDate
 from velbusaio.messages.set_daylight_saving import SetDaylightSaving
 from velbusaio.messages.set_realtime_clock import SetRealtimeClock
+from velbusaio.metrics import MetricsExporter
 from velbusaio.module import Module
+from velbusaio.press import PressScheduler
 from velbusaio.protocol import VelbusProtocol
 from velbusaio.raw_message import RawMessage
+from velbusaio.refresh import RefreshScheduler
+from velbusaio.stats import StageMetrics
 
 
 class Velbus:
@@ -34,37 +52,96 @@ class Velbus:
         self,
         dsn: str,
         cache_dir: str = get_cache_dir(),
+        lazy_decode: bool = True,
+        optimistic: bool = False,
+        refresh: bool = False,
+        instrument: bool = False,
     ) -> None:
-        """Init the Velbus controller."""
+        """Init the Velbus controller.
+
+        With optimistic the channel commands show the state they lead to
+        right away, until the module reports it or OPTIMISTIC_TIMEOUT passes.
+        With refresh the module status is polled again after the scan, at
+        the REFRESH_INTERVALS. With instrument the latency of every stage
+        of the receive and send paths is measured, see stats.
+        """
         self._log = logging.getLogger("velbus")
 
         self._protocol = VelbusProtocol(
             message_received_callback=self._on_message_received,
             connection_lost_callback=self._on_connection_lost,
+            message_sent_callback=self._on_message_sent,
         )
         self._closing = False
         self._auto_reconnect = True
+        self._reconnects = 0
+        self._exporter = MetricsExporter(self)
 
         self._dsn = dsn
-        self._handler = PacketHandler(self)
+        self._handler = PacketHandler(
+            self, lazy_decode=lazy_decode, cache_dir=cache_dir
+        )
+        self._metrics = StageMetrics() if instrument else None
+        self._protocol._metrics = self._metrics
+        self._handler._metrics = self._metrics
+        self._requests = RequestTracker(self._handler)
+        self._confirmer = CommandConfirmer(self.request)
+        self._optimistic_timeout = OPTIMISTIC_TIMEOUT if optimistic else None
+        self._refresh_enabled = refresh
+        self._refresh = RefreshScheduler(self)
+        self._presser = PressScheduler(self.send)
         self._modules: dict[int, Module] = {}
         self._submodules: list[int] = []
         self._send_queue: asyncio.Queue = asyncio.Queue()
         self._cache_dir: str = cache_dir
+        self._cache = ModuleCache(cache_dir)
         # make sure the cachedir exists
         pathlib.Path(self._cache_dir).mkdir(parents=True, exist_ok=True)
 
     def get_cache_dir(self) -> str:
         return self._cache_dir
 
+    def get_cache(self) -> ModuleCache:
+        return self._cache
+
+    def cache_stats(self) -> dict:
+        """Get the module cache write metrics."""
+        return self._cache.stats()
+
+    def stats(self) -> dict | None:
+        """Get the stage latency histograms and the frame counters.
+
+        None when the controller was not created with instrument.
+        """
+        if self._metrics is None:
+            return None
+        snapshot = self._metrics.snapshot()
+        snapshot["counters"].update(self._handler.decode_counters())
+        return snapshot
+
+    def traffic(self, window: float = 10, top: int = 5) -> dict:
+        """Get the bus traffic rates and occupancy of the last window seconds.
+
+        top is the number of busiest addresses to list, over the same window.
+        """
+        monitor = self._protocol.traffic
+        return {
+            **monitor.rates(window),
+            "top": monitor.top_talkers(top, window),
+        }
+
     async def _on_message_received(self, msg: RawMessage) -> None:
         """On message received function."""
         await self._handler.handle(msg)
 
+    def _on_message_sent(self, msg: RawMessage) -> None:
+        self._requests.frame_sent(msg)
+
     def _on_connection_lost(self, exc: Exception) -> None:
         """Respond to Protocol connection lost."""
         if self._auto_reconnect and not self._closing:
             self._log.debug("Reconnecting to transport")
+            self._reconnects += 1
             asyncio.ensure_future(self.connect())
 
     def add_module(
@@ -86,9 +163,15 @@ class Velbus:
             build_year=build_year,
             build_week=build_week,
             memorymap=memorymap,
-            cache_dir=self._cache_dir,
         )
-        module.initialize(self.send)
+        module.initialize(
+            self.send,
+            self._cache,
+            self._confirmer,
+            self._optimistic_timeout,
+            self._presser,
+            self._metrics,
+        )
         self._modules[addr] = module
         self._log.info(f"Found module {addr}: {module}")
 
@@ -123,10 +206,14 @@ class Velbus:
         self._closing = True
         self._auto_reconnect = False
         self._protocol.close()
+        await self._exporter.stop()
+        await self._refresh.stop()
+        await self._cache.close()
 
     async def connect(self, test_connect: bool = False) -> None:
         """Connect to the bus and load all the data."""
         await self._handler.read_protocol_data()
+        await self._cache.load()
         auth = None
         # connect to the bus
         if ":" in self._dsn:
@@ -180,25 +267,150 @@ class Velbus:
 
         # scan the bus
         await self._handler.scan()
+        if self._refresh_enabled:
+            self._refresh.start()
 
     async def scan(self) -> None:
         """Service endpoint to restart the scan"""
         await self._handler.scan(True)
+        if self._refresh_enabled:
+            self._refresh.start()
+
+    def refresh_schedule(self) -> list[dict]:
+        """Get the planned status refreshes, the next one first."""
+        return self._refresh.schedule()
+
+    def start_capture(
+        self,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        """Write the bus traffic to a capture file, see velbusaio.capture."""
+        self._protocol.start_capture(path, max_bytes, backups)
+
+    def stop_capture(self) -> None:
+        """Stop writing the bus traffic."""
+        self._protocol.stop_capture()
+
+    def capture_stats(self) -> dict | None:
+        """Get the capture file counters, None when not capturing."""
+        return self._protocol.capture_stats()
+
+    def start_trace(
+        self,
+        sample: int = TRACE_SAMPLE,
+        limit: int = TRACE_RATE_LIMIT,
+        level: int = logging.DEBUG,
+    ) -> None:
+        """Log a sample of the frames, see velbusaio.trace."""
+        self._protocol.start_trace(sample, limit, level)
+
+    def stop_trace(self) -> None:
+        """Stop logging the frame sample."""
+        self._protocol.stop_trace()
+
+    def trace_stats(self) -> dict | None:
+        """Get the frame trace counters, None when not tracing."""
+        return self._protocol.trace_stats()
+
+    async def start_metrics_server(
+        self, host: str = "127.0.0.1", port: int = METRICS_PORT
+    ) -> None:
+        """Serve the counters on http://host:port/metrics for Prometheus."""
+        await self._exporter.start(host, port)
+
+    async def stop_metrics_server(self) -> None:
+        """Stop serving the counters."""
+        await self._exporter.stop()
+
+    def render_metrics(self) -> str:
+        """Get the counters in the Prometheus text format."""
+        return self._exporter.render()
+
+    def refresh_stats(self) -> dict:
+        """Get the status refresh counters and lag."""
+        return self._refresh.stats()
 
     async def sendTypeRequestMessage(self, address: int) -> None:
         msg = ModuleTypeRequestMessage(address)
         await self.send(msg)
 
-    async def send(self, msg: Message) -> None:
-        """Send a packet."""
+    async def send(self, msg: Message, background: bool = False) -> None:
+        """Send a packet.
+
+        Background packets are only sent when no other packets are waiting.
+        """
+        metrics = self._metrics
+        start = time.perf_counter() if metrics is not None else 0.0
         await self._protocol.send_message(
             RawMessage(
                 priority=msg.priority,
                 address=msg.address,
                 rtr=msg.rtr,
                 data=msg.data_to_binary(),
+            ),
+            background,
+        )
+        if metrics is not None:
+            metrics.observe("enqueue", time.perf_counter() - start)
+
+    async def batch(self, actions: Iterable[tuple]) -> int:
+        """Send the commands of many channels at once.
+
+        actions are (channel, method name, *arguments) tuples, for example
+        (relay, "turn_on"). Commands for the same module that only differ
+        in their channels are sent as one frame, high priority frames go
+        first. In optimistic mode the channels show the state the commands
+        lead to right away. Returns the number of frames sent.
+        """
+        actions = list(actions)
+        frames = build_frames(actions)
+        await set_pending(actions)
+        for msg in frames:
+            await self.send(msg)
+        await run_sent_hooks(actions)
+        return len(frames)
+
+    def request(
+        self,
+        msg: Message,
+        expect: int | Iterable[int],
+        timeout: float = REQUEST_TIMEOUT,
+        match: Callable[[Message], bool] | None = None,
+    ) -> asyncio.Future:
+        """Send a packet and wait for the reply.
+
+        The returned future is resolved with the first message received from
+        msg.address with one of the expected command codes, and accepted by
+        match if given, or fails with asyncio.TimeoutError.
+        """
+        frame = RawMessage(
+            priority=msg.priority,
+            address=msg.address,
+            rtr=msg.rtr,
+            data=msg.data_to_binary(),
+        )
+        if isinstance(expect, int):
+            expect = (expect,)
+        future = self._requests.add(frame, expect, timeout, match)
+        task = asyncio.ensure_future(self._protocol.send_message(frame))
+        task.add_done_callback(
+            lambda task: (
+                self._requests.fail(frame, task.exception())
+                if not task.cancelled() and task.exception()
+                else None
             )
         )
+        return future
+
+    def request_stats(self) -> dict:
+        """Get the request counters and round trip times."""
+        return self._requests.stats()
+
+    def confirm_stats(self) -> dict[int, dict]:
+        """Get the success rate and ack latency of confirmed commands per module."""
+        return self._confirmer.stats()
 
     def get_all(self, class_name: str) -> list[Channel]:
         """Get all channels."""
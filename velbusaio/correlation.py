@@ -0,0 +1,166 @@
+"""
+Request/response correlation
+
+A request registers the replies it expects, (address, command) pairs, before
+the frame is queued. Received messages are routed to the handler by the same
+pair, so finding the waiting request is a dict lookup. Requests waiting for
+the same reply are answered in the order they were made.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from velbusaio.stats import Histogram
+
+if TYPE_CHECKING:
+    from velbusaio.handler import PacketHandler
+    from velbusaio.message import Message
+    from velbusaio.raw_message import RawMessage
+
+
+class PendingRequest:
+    """
+    A request waiting for its reply
+    """
+
+    __slots__ = ("future", "keys", "match", "queued", "sent", "timer")
+
+    def __init__(
+        self,
+        future: asyncio.Future,
+        keys: list[tuple[int, int]],
+        match: Callable[[Message], bool] | None = None,
+    ) -> None:
+        self.future = future
+        self.keys = keys
+        self.match = match
+        self.queued = future.get_loop().time()
+        self.sent: float | None = None
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class RequestTracker:
+    """
+    The requests that are waiting for a reply
+    """
+
+    def __init__(self, handler: PacketHandler) -> None:
+        self._handler = handler
+        # (address, command) => requests, oldest first
+        self._pending: dict[tuple[int, int], deque[PendingRequest]] = {}
+        self._unsubscribe: dict[tuple[int, int], Callable[[], None]] = {}
+        # id of the queued frame => request, until the frame is written
+        self._unsent: dict[int, PendingRequest] = {}
+        self._rtt = Histogram()
+        self._answered = 0
+        self._timeouts = 0
+
+    def add(
+        self,
+        frame: RawMessage,
+        expect: Iterable[int],
+        timeout: float,
+        match: Callable[[Message], bool] | None = None,
+    ) -> asyncio.Future:
+        """
+        Wait for one of the expected commands from the address of frame
+
+        Only replies accepted by match, if given, answer the request. The
+        future is resolved with the reply message, or fails with
+        asyncio.TimeoutError.
+        """
+        loop = asyncio.get_running_loop()
+        keys = [(frame.address, command) for command in expect]
+        request = PendingRequest(loop.create_future(), keys, match)
+        for key in keys:
+            queue = self._pending.get(key)
+            if queue is None:
+                queue = self._pending[key] = deque()
+                self._unsubscribe[key] = self._handler.subscribe(
+                    *key, partial(self._on_reply, key)
+                )
+            queue.append(request)
+        self._unsent[id(frame)] = request
+        request.future.add_done_callback(
+            lambda future: self._remove(request) if future.cancelled() else None
+        )
+        request.timer = loop.call_later(timeout, self._on_timeout, request, frame)
+        return request.future
+
+    def frame_sent(self, frame: RawMessage) -> None:
+        """
+        The frame was written to the bus, the round trip starts now
+        """
+        request = self._unsent.pop(id(frame), None)
+        if request is not None:
+            request.sent = request.future.get_loop().time()
+
+    def fail(self, frame: RawMessage, exc: BaseException) -> None:
+        """
+        The frame could not be queued
+        """
+        request = self._unsent.pop(id(frame), None)
+        if request is not None:
+            self._remove(request)
+            if not request.future.done():
+                request.future.set_exception(exc)
+
+    async def _on_reply(self, key: tuple[int, int], msg: Message) -> None:
+        for request in list(self._pending.get(key, ())):
+            if request.future.done():
+                # cancelled by the caller
+                self._remove(request)
+                continue
+            if request.match is not None and not request.match(msg):
+                continue
+            self._remove(request)
+            now = request.future.get_loop().time()
+            self._rtt.observe(now - (request.sent or request.queued))
+            self._answered += 1
+            request.future.set_result(msg)
+            return
+
+    def _on_timeout(self, request: PendingRequest, frame: RawMessage) -> None:
+        self._unsent.pop(id(frame), None)
+        self._remove(request)
+        if not request.future.done():
+            self._timeouts += 1
+            request.future.set_exception(asyncio.TimeoutError())
+
+    def _remove(self, request: PendingRequest) -> None:
+        if request.timer is not None:
+            request.timer.cancel()
+            request.timer = None
+        for key in request.keys:
+            queue = self._pending.get(key)
+            if queue is None:
+                continue
+            try:
+                queue.remove(request)
+            except ValueError:
+                pass
+            if not queue:
+                del self._pending[key]
+                self._unsubscribe.pop(key)()
+
+    @property
+    def rtt(self) -> Histogram:
+        """
+        The round trip times of the answered requests, in seconds
+        """
+        return self._rtt
+
+    def stats(self) -> dict:
+        """
+        Request metrics, the round trip times are in seconds
+        """
+        return {
+            "pending": len({id(r) for q in self._pending.values() for r in q}),
+            "answered": self._answered,
+            "timeouts": self._timeouts,
+            "rtt": self._rtt.snapshot(),
+        }
@@ -0,0 +1,166 @@
+"""
+Module type descriptors
+
+The protocol data of a module type is turned into an immutable descriptor
+once, all modules of that type share it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+
+from velbusaio import channels
+
+# thermostat channel name => attribute of the TempSensorStatusMessage
+THERMOSTAT_CHANNEL_PROPS: Mapping[str, str] = MappingProxyType(
+    {
+        "Heater": "heater",
+        "Boost": "boost",
+        "Pump": "pump",
+        "Cooler": "cooler",
+        "Alarm 1": "alarm1",
+        "Alarm 2": "alarm2",
+        "Alarm 3": "alarm3",
+        "Alarm 4": "alarm4",
+    }
+)
+
+# channel types that are part of the module status request
+STATUS_CHANNEL_TYPES = ("Blind", "Dimmer", "Relay")
+BUTTON_CHANNEL_TYPES = ("Button", "Sensor", "ButtonCounter")
+
+
+@dataclass(frozen=True)
+class ChannelSpec:
+    """
+    A channel as defined in the protocol data
+    """
+
+    num: int
+    name: str
+    type: str
+    cls: type[channels.Channel]
+    editable: bool
+
+
+@dataclass(frozen=True)
+class ModuleTypeDescriptor:
+    """
+    Everything the Module needs to know about its type
+    """
+
+    module_type: int
+    type_name: str
+    channels: tuple[ChannelSpec, ...]
+    # channels for the ModuleStatusRequestMessage
+    status_channels: tuple[int, ...]
+    counter_channels: tuple[int, ...]
+    has_buttons: bool
+    temperature_channel: int | None
+    thermostat: bool
+    # (translated channel number, TempSensorStatusMessage attribute)
+    thermostat_channels: tuple[tuple[int, str], ...]
+    all_channel_status: bool
+    # memory addresses to read at load time, None if the name is not in memory
+    memory_plan: tuple[int, ...] | None
+    memory_map: Mapping[int, dict]
+    name_map: Mapping[int, int]
+    data: dict = field(repr=False, compare=False)
+
+    @property
+    def status_channel_mask(self) -> int:
+        mask = 0
+        for chan in self.status_channels:
+            mask |= 1 << (chan - 1)
+        return mask
+
+    def translate_channel(self, channel: int | str) -> int:
+        """
+        Translate a channel number from a message to the channel number
+        """
+        return self.name_map.get(int(channel), int(channel))
+
+    @classmethod
+    def from_data(cls, module_type: int, data: dict) -> ModuleTypeDescriptor:
+        name_map = {}
+        if "Map" in data.get("ChannelNumbers", {}).get("Name", {}):
+            for src, dst in data["ChannelNumbers"]["Name"]["Map"].items():
+                name_map[int(src, 16)] = int(dst)
+
+        def translate(channel: int | str) -> int:
+            return name_map.get(int(channel), int(channel))
+
+        specs = []
+        status_channels = []
+        counter_channels = []
+        thermostat_channels = []
+        for chan, chan_data in data.get("Channels", {}).items():
+            num = int(chan)
+            specs.append(
+                ChannelSpec(
+                    num=num,
+                    name=chan_data["Name"],
+                    type=chan_data["Type"],
+                    cls=getattr(channels, chan_data["Type"]),
+                    editable=chan_data.get("Editable") == "yes",
+                )
+            )
+            if num < 9 and chan_data["Type"] in STATUS_CHANNEL_TYPES:
+                status_channels.append(num)
+            if chan_data["Type"] == "ButtonCounter":
+                counter_channels.append(num)
+            if (
+                chan_data["Type"] == "ThermostatChannel"
+                and chan_data["Name"] in THERMOSTAT_CHANNEL_PROPS
+            ):
+                thermostat_channels.append(
+                    (translate(chan), THERMOSTAT_CHANNEL_PROPS[chan_data["Name"]])
+                )
+
+        memory_plan = None
+        memory_map = {}
+        if "Memory" in data:
+            memory_map = {
+                int(addr, 16): mdata
+                for addr, mdata in data["Memory"].get("Address", {}).items()
+            }
+            if module_type != 0x0C:
+                memory_plan = tuple(memory_map)
+
+        return cls(
+            module_type=module_type,
+            type_name=data.get("Type", "UNKNOWN"),
+            channels=tuple(specs),
+            status_channels=tuple(status_channels),
+            counter_channels=tuple(counter_channels),
+            has_buttons=any(spec.type in BUTTON_CHANNEL_TYPES for spec in specs),
+            temperature_channel=(
+                translate(data["TemperatureChannel"])
+                if "TemperatureChannel" in data
+                else None
+            ),
+            thermostat="Thermostat" in data
+            or ("ThermostatAddr" in data and data["ThermostatAddr"] != 0),
+            thermostat_channels=tuple(thermostat_channels),
+            all_channel_status="AllChannelStatus" in data,
+            memory_plan=memory_plan,
+            memory_map=MappingProxyType(memory_map),
+            name_map=MappingProxyType(name_map),
+            data=data,
+        )
+
+
+_descriptors: dict[int, ModuleTypeDescriptor] = {}
+
+
+def get_descriptor(module_type: int, data: dict) -> ModuleTypeDescriptor:
+    """
+    Get the shared descriptor for a module type
+    """
+    desc = _descriptors.get(module_type)
+    if desc is None or desc.data is not data:
+        desc = ModuleTypeDescriptor.from_data(module_type, data)
+        _descriptors[module_type] = desc
+    return desc
@@ -20,3 +20,10 @@ class VelbusConnectionFailed(VelbusException):
 class VelbusConnectionTerminated(VelbusException):
     def __init__(self) -> None:
         super().__init__("Connection terminated")
+
+
+class VelbusCommandNotConfirmed(VelbusException):
+    def __init__(self, address: int, attempts: int) -> None:
+        super().__init__(
+            f"Module {address} did not confirm the command after {attempts} attempts"
+        )
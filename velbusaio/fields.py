@@ -0,0 +1,325 @@
+"""
+Declarative message layouts
+
+Most messages are a fixed sequence of bytes: channel masks, single channel
+bytes, plain or big-endian integers and bit flags. Instead of writing the
+populate and data_to_binary methods by hand, a message class can describe
+its data bytes with the layout decorator:
+
+    @register(COMMAND_CODE)
+    @layout(
+        COMMAND_CODE,
+        ChannelByte("channel"),
+        UInt("status"),
+        UInt("delay_time", 3),
+        priority=PRIORITY_LOW,
+    )
+    class SomeStatusMessage(Message):
+        ...
+
+The fields are compiled once into a struct.Struct, the generated methods
+only unpack and convert.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Callable
+
+from velbusaio.const import PRIORITY_FIRMWARE, PRIORITY_HIGH, PRIORITY_LOW
+from velbusaio.message import Message
+
+# channel byte => channel numbers
+_CHANNELS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(bit + 1 for bit in range(8) if byte & (1 << bit)) for byte in range(256)
+)
+# channel byte => channel number, 0 if not exactly one bit is set
+_CHANNEL: tuple[int, ...] = tuple(
+    chans[0] if len(chans) == 1 else 0 for chans in _CHANNELS
+)
+
+
+def _mask(channels: list[int]) -> int:
+    result = 0
+    for chan in channels:
+        if 0 < chan <= 8:
+            result |= 1 << (chan - 1)
+    return result
+
+
+class Field:
+    """
+    A part of the message data, decoded from one struct item
+    """
+
+    fmt = "B"
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def decode(self, msg: Message, value: Any) -> None:
+        setattr(msg, self.name, value)
+
+    def encode(self, msg: Message) -> Any:
+        return getattr(msg, self.name)
+
+
+class UInt(Field):
+    """
+    Unsigned big-endian integer of 1 to 4 bytes
+    """
+
+    _FORMATS = {1: "B", 2: "H", 3: "3s", 4: "L"}
+
+    def __init__(self, name: str, size: int = 1) -> None:
+        super().__init__(name)
+        if size not in self._FORMATS:
+            raise ValueError(f"unsupported integer size {size}")
+        self.size = size
+        self.fmt = self._FORMATS[size]
+        if size == 3:
+            self.decode = self._decode24  # type: ignore[method-assign]
+            self.encode = self._encode24  # type: ignore[method-assign]
+
+    def _decode24(self, msg: Message, value: bytes) -> None:
+        setattr(msg, self.name, int.from_bytes(value, "big"))
+
+    def _encode24(self, msg: Message) -> bytes:
+        return (getattr(msg, self.name) & 0xFFFFFF).to_bytes(3, "big")
+
+
+class ChannelMask(UInt):
+    """
+    A byte with one bit per channel, decoded into a list of channel numbers
+    """
+
+    def decode(self, msg: Message, value: int) -> None:
+        setattr(msg, self.name, list(_CHANNELS[value]))
+
+    def encode(self, msg: Message) -> int:
+        return _mask(getattr(msg, self.name))
+
+
+class ChannelByte(UInt):
+    """
+    A channel mask with exactly one bit set, decoded into the channel number
+    """
+
+    def decode(self, msg: Message, value: int) -> None:
+        chan = _CHANNEL[value]
+        if not chan:
+            msg.parser_error("needs exactly one bit set in channel byte")
+        setattr(msg, self.name, chan)
+
+    def encode(self, msg: Message) -> int:
+        chan = getattr(msg, self.name)
+        return 1 << (chan - 1) if 0 < chan <= 8 else 0
+
+
+class Bytes(Field):
+    """
+    A fixed number of raw bytes
+    """
+
+    def __init__(self, name: str, size: int) -> None:
+        super().__init__(name)
+        self.size = size
+        self.fmt = f"{size}s"
+
+    def encode(self, msg: Message) -> bytes:
+        return bytes(getattr(msg, self.name))[: self.size].ljust(self.size, b"\0")
+
+
+class Const(Field):
+    """
+    A byte with a fixed value, it is checked but not stored
+    """
+
+    def __init__(self, value: int) -> None:
+        super().__init__("")
+        self.value = value
+
+    def decode(self, msg: Message, value: int) -> None:
+        msg.needs_fixed_byte(value, self.value)
+
+    def encode(self, msg: Message) -> int:
+        return self.value
+
+
+class Padding(Field):
+    """
+    Unused bytes, ignored when decoding and sent as 0
+    """
+
+    def __init__(self, size: int = 1) -> None:
+        super().__init__("")
+        self.size = size
+        self.fmt = f"{size}x"
+
+
+class Bit:
+    """
+    Part of a Bits byte: width bits starting at shift
+
+    A single bit is a bool unless as_int is set.
+    """
+
+    def __init__(
+        self, name: str, shift: int, width: int = 1, as_int: bool = False
+    ) -> None:
+        self.name = name
+        self.shift = shift
+        self.mask = (1 << width) - 1
+        self.as_bool = width == 1 and not as_int
+
+
+class Bits(Field):
+    """
+    A byte split into bit fields
+    """
+
+    def __init__(self, *bits: Bit) -> None:
+        super().__init__("")
+        self.bits = bits
+
+    def decode(self, msg: Message, value: int) -> None:
+        for bit in self.bits:
+            val = (value >> bit.shift) & bit.mask
+            setattr(msg, bit.name, bool(val) if bit.as_bool else val)
+
+    def encode(self, msg: Message) -> int:
+        result = 0
+        for bit in self.bits:
+            result |= (int(getattr(msg, bit.name)) & bit.mask) << bit.shift
+        return result
+
+
+_PRIORITY_CHECKS: dict[int, Callable[[Message, int], None]] = {
+    PRIORITY_HIGH: Message.needs_high_priority,
+    PRIORITY_LOW: Message.needs_low_priority,
+    PRIORITY_FIRMWARE: Message.needs_firmware_priority,
+}
+
+
+class MessageLayout:
+    """
+    The compiled layout of a message
+    """
+
+    def __init__(
+        self,
+        command_code: int,
+        fields: tuple[Field, ...],
+        priority: int | None = PRIORITY_LOW,
+        rtr: bool = False,
+        length: int | None = None,
+    ) -> None:
+        self.command_code = command_code
+        self.fields = fields
+        self.struct = struct.Struct(">" + "".join(fld.fmt for fld in fields))
+        # padding has no item in the struct
+        self.items = tuple(fld for fld in fields if not isinstance(fld, Padding))
+        self.length = self.struct.size if length is None else length
+        self.priority = priority
+        self.rtr = rtr
+        self._prefix = bytes([command_code])
+        # bytes required by length but not covered by the fields
+        self._tail = bytes(max(0, self.length - self.struct.size))
+        self._decoders = tuple(fld.decode for fld in self.items)
+        self._encoders = tuple(fld.encode for fld in self.items)
+        self._check_priority = (
+            _PRIORITY_CHECKS[priority] if priority is not None else None
+        )
+        # data offset of the channel byte, or the name of the channel mask,
+        # when it is the only channel field
+        channel_fields = [
+            num
+            for num, fld in enumerate(fields)
+            if isinstance(fld, (ChannelByte, ChannelMask))
+        ]
+        self._channel_offset: int | None = None
+        self.channel_mask: str | None = None
+        if len(channel_fields) == 1:
+            channel_field = fields[channel_fields[0]]
+            if isinstance(channel_field, ChannelByte):
+                self._channel_offset = struct.calcsize(
+                    ">" + "".join(fld.fmt for fld in fields[: channel_fields[0]])
+                )
+            else:
+                self.channel_mask = channel_field.name
+
+    def channel(self, data: bytes) -> int | None:
+        """
+        The channel number in data without decoding the message, None if
+        the layout has no single channel byte or data is not a valid one
+        """
+        offset = self._channel_offset
+        if offset is None or not data or len(data) <= offset:
+            return None
+        return _CHANNEL[data[offset]] or None
+
+    def populate(
+        self, msg: Message, priority: int, address: int, rtr: bool, data: bytes
+    ) -> None:
+        if self._check_priority is not None:
+            self._check_priority(msg, priority)
+        if self.rtr:
+            msg.needs_rtr(rtr)
+        else:
+            msg.needs_no_rtr(rtr)
+        if self.length:
+            msg.needs_data(data, self.length)
+        else:
+            msg.needs_no_data(data)
+        msg.set_attributes(priority, address, rtr)
+        for decode, value in zip(self._decoders, self.struct.unpack_from(data)):
+            decode(msg, value)
+
+    def data_to_binary(self, msg: Message) -> bytes:
+        values = self.struct.pack(*[encode(msg) for encode in self._encoders])
+        return self._prefix + values + self._tail
+
+
+def layout(
+    command_code: int,
+    *fields: Field,
+    priority: int | None = PRIORITY_LOW,
+    rtr: bool = False,
+    length: int | None = None,
+):
+    """
+    Class decorator, generate populate and data_to_binary from the fields
+
+    priority is the priority the message needs, None for any priority.
+    length is the minimal data length, by default the size of the fields.
+    Methods defined on the class itself are kept, they can use
+    self._layout to decode the fields before doing their own work.
+    """
+    spec = MessageLayout(command_code, fields, priority, rtr, length)
+
+    def populate(self, priority, address, rtr, data):
+        """
+        :return: None
+        """
+        spec.populate(self, priority, address, rtr, data)
+
+    pack, encoders = spec.struct.pack, spec._encoders
+    prefix, tail = spec._prefix, spec._tail
+
+    def data_to_binary(self):
+        """
+        :return: bytes
+        """
+        return prefix + pack(*[encode(self) for encode in encoders]) + tail
+
+    def inner(cls: type[Message]) -> type[Message]:
+        cls._layout = spec
+        if "channel_mask" not in cls.__dict__:
+            cls.channel_mask = spec.channel_mask
+        if "populate" not in cls.__dict__:
+            cls.populate = populate
+        if "data_to_binary" not in cls.__dict__:
+            cls.data_to_binary = data_to_binary
+        return cls
+
+    return inner
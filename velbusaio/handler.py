@@ -5,33 +5,31 @@ Velbus packet handler
 
 from __future__ import annotations
 
-from velbusaio.const import SCAN_MODULETYPE_TIMEOUT
-from velbusaio.const import SCAN_MODULEINFO_TIMEOUT_INITIAL
-from velbusaio.const import SCAN_MODULEINFO_TIMEOUT_INTERVAL
-
 import asyncio
-import json
 import logging
 import threading
-import os
-import pathlib
-
-from aiofile import async_open
-
+from time import perf_counter
 from typing import TYPE_CHECKING, Awaitable, Callable
-import pkg_resources
 
+from velbusaio.catalog import load_catalog
 from velbusaio.command_registry import commandRegistry
-from velbusaio.helpers import h2, keys_exists
+from velbusaio.const import (
+    SCAN_MODULEINFO_TIMEOUT_INITIAL,
+    SCAN_MODULEINFO_TIMEOUT_INTERVAL,
+    SCAN_MODULETYPE_TIMEOUT,
+)
 from velbusaio.message import Message
 from velbusaio.messages.module_subtype import ModuleSubTypeMessage
-from velbusaio.messages.module_type import ModuleTypeMessage, ModuleType2Message
+from velbusaio.messages.module_type import ModuleType2Message, ModuleTypeMessage
+from velbusaio.messages.module_type_request import ModuleTypeRequestMessage
 from velbusaio.raw_message import RawMessage
-
+from velbusaio.stats import StageMetrics
 
 if TYPE_CHECKING:
     from velbusaio.controller import Velbus
 
+MessageCallback = Callable[[Message], Awaitable[None]]
+
 
 class PacketHandler:
     """
@@ -41,43 +39,77 @@ class PacketHandler:
     def __init__(
         self,
         velbus: Velbus,
+        lazy_decode: bool = True,
+        cache_dir: str | None = None,
     ) -> None:
         self._log = logging.getLogger("velbus-handler")
-        self._log.setLevel(logging.DEBUG)
         self._velbus = velbus
-        self._typeResponseReceived = asyncio.Event()
+        # where the compiled protocol catalog is kept
+        self._cache_dir = cache_dir
         self._scanLock = threading.Lock()
         self._modulescan_address = 0
         self._scan_complete = False
         self._scan_delay_msec = 0
+        # only decode frames that a module handler or a subscriber will use
+        self._lazy_decode = lazy_decode
+        # (address, command) => subscribers
+        self._routes: dict[tuple[int, int], list[MessageCallback]] = {}
+        self._decoded = 0
+        self._skipped = 0
+        # stage latencies, None when the instrumentation is off
+        self._metrics: StageMetrics | None = None
+
+    def subscribe(
+        self, address: int, command: int, callback: MessageCallback
+    ) -> Callable[[], None]:
+        """
+        Call callback with every message received for (address, command)
+
+        Returns a function that removes the subscription again.
+        """
+        route = (address, command)
+        self._routes.setdefault(route, []).append(callback)
+
+        def unsubscribe() -> None:
+            callbacks = self._routes.get(route, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._routes.pop(route, None)
+
+        return unsubscribe
+
+    async def _notify(self, msg: Message, command: int) -> None:
+        for callback in list(self._routes.get((msg.address, command), ())):
+            await callback(msg)
+
+    def decode_counters(self) -> dict[str, int]:
+        """
+        Number of received frames that were decoded or skipped
+
+        Every frame handed to the handler counts as one or the other.
+        """
+        return {"decoded": self._decoded, "skipped": self._skipped}
+
+    def scan_progress(self) -> dict:
+        """
+        The last address the scan asked for, and whether it is done
+        """
+        return {"address": self._modulescan_address, "complete": self._scan_complete}
 
     async def read_protocol_data(self):
-        async with async_open(
-            pkg_resources.resource_filename(__name__, "protocol.json")
-        ) as protocol_file:
-            self.pdata = json.loads(await protocol_file.read())
+        self.pdata = await load_catalog(self._cache_dir)
 
     def empty_cache(self) -> bool:
-        if (
-            len(
-                [
-                    name
-                    for name in os.listdir(f"{self._velbus.get_cache_dir()}")
-                    if os.path.isfile(f"{self._velbus.get_cache_dir()}/{name}")
-                ]
-            )
-            == 0
-        ):
-            return True
-        return False
+        return self._velbus.get_cache().is_empty()
 
     async def scan(self, reload_cache: bool = False) -> None:
         if reload_cache:
             self._modulescan_address = 0
             self._scan_complete = False
-        # non-blocking check to see if the cache_dir is empty
-        loop = asyncio.get_running_loop()
-        if not reload_cache and await loop.run_in_executor(None, self.empty_cache):
+        cache = self._velbus.get_cache()
+        await cache.load()
+        if not reload_cache and self.empty_cache():
             self._log.info("No cache yet, so forcing a bus scan")
             reload_cache = True
         self._log.info("Start module scan")
@@ -91,21 +123,19 @@ class PacketHandler:
 
             self._log.info(f"Starting handling scan {address}")
 
-            cfile = pathlib.Path(f"{self._velbus.get_cache_dir()}/{address}.json")
             # cleanup the old module cache if needed
             scanModule = reload_cache
-            if scanModule and os.path.isfile(cfile):
-                os.remove(cfile)
-            elif os.path.isfile(cfile):
-                scanModule = os.path.isfile(cfile)
+            if scanModule:
+                cache.forget(address)
+            elif cache.get(address) is not None:
+                scanModule = True
             if scanModule:
                 try:
                     self._log.info(f"Starting scan {address}")
-                    self._typeResponseReceived.clear()
-                    await self._velbus.sendTypeRequestMessage(address)
-                    await asyncio.wait_for(
-                        self._typeResponseReceived.wait(),
-                        SCAN_MODULETYPE_TIMEOUT / 1000.0,
+                    await self._velbus.request(
+                        ModuleTypeRequestMessage(address),
+                        expect=0xFF,
+                        timeout=SCAN_MODULETYPE_TIMEOUT / 1000.0,
                     )
                     with self._scanLock:
                         module = self._velbus.get_module(address)
@@ -141,9 +171,10 @@ class PacketHandler:
         """
         Handle a received packet
         """
-        if rawmsg.address < 1 or rawmsg.address > 254:
-            return
-        if rawmsg.command is None:
+        metrics = self._metrics
+        start = perf_counter() if metrics is not None else 0.0
+        if rawmsg.address < 1 or rawmsg.address > 254 or rawmsg.command is None:
+            self._skipped += 1
             return
 
         priority = rawmsg.priority
@@ -152,74 +183,112 @@ class PacketHandler:
         command_value = rawmsg.command
         data = rawmsg.data_only
 
+        with self._scanLock:
+            module = self._velbus.get_module(address)
+        if module is not None:
+            module.mark_seen()
+
         # handle module type response message
         if command_value == 0xFF:
-            if not self._scan_complete:
+            if not self._scan_complete or (address, command_value) in self._routes:
                 tmsg: ModuleTypeMessage = ModuleTypeMessage()
                 tmsg.populate(priority, address, rtr, data)
+                self._decoded += 1
+            else:
+                self._skipped += 1
+            if not self._scan_complete:
                 with self._scanLock:
                     self._handle_module_type(tmsg)
-                    if address == self._modulescan_address:
-                        self._typeResponseReceived.set()
-                    else:
+                    if address != self._modulescan_address:
                         self._log.debug(
                             f"Unexpected module type message module address {address}, Velbuslink scan?"
                         )
                         self._modulescan_address = address - 1
-
-                self._typeResponseReceived.set()
+            # the module exists before the scan gets the reply
+            if (address, command_value) in self._routes:
+                await self._notify(tmsg, command_value)
 
         # handle module subtype response message
         elif command_value in (0xB0, 0xA7, 0xA6):
-            if not self._scan_complete:
+            scanning = not self._scan_complete
+            routed = (address, command_value) in self._routes
+            if scanning or routed:
                 msg: ModuleSubTypeMessage = ModuleSubTypeMessage()
                 msg.populate(priority, address, rtr, data)
+                self._decoded += 1
                 if command_value == 0xB0:
                     msg.sub_address_offset = 0
                 elif command_value == 0xA7:
                     msg.sub_address_offset = 4
                 elif command_value == 0xA6:
                     msg.sub_address_offset = 8
+            else:
+                self._skipped += 1
+            if scanning:
                 with self._scanLock:
                     self._scan_delay_msec = SCAN_MODULEINFO_TIMEOUT_INITIAL
                     self._handle_module_subtype(msg)
+            if routed:
+                await self._notify(msg, command_value)
 
         # ignore broadcast
         elif command_value in self.pdata["MessagesBroadCast"]:
             self._log.debug(
-                "Received broadcast message {} from {}, ignoring".format(
-                    self.pdata["MessageBroadCast"][str(command_value).upper()], address
-                )
+                "Received broadcast message %02X from %s, ignoring",
+                command_value,
+                address,
             )
+            self._skipped += 1
 
         # handle other messages for modules that are already scanned
         else:
-            module = None
-            with self._scanLock:
-                module = self._velbus.get_module(address)
-            if module is not None:
-                module_type = module.get_type()
-                if commandRegistry.has_command(int(command_value), module_type):
-                    command = commandRegistry.get_command(command_value, module_type)
-                    if not command:
+            if module is None:
+                if (address, command_value) in self._routes:
+                    command = commandRegistry.get_command(command_value)
+                    if command:
+                        msg = command()
+                        msg.populate(priority, address, rtr, data)
+                        self._decoded += 1
+                        await self._notify(msg, command_value)
                         return
-                    msg = command()
-                    msg.populate(priority, address, rtr, data)
-                    # restart the info completion time when info message received
-                    if command_value in (
-                        0xF0,
-                        0xF1,
-                        0xF2,
-                        0xFB,
-                        0xFE,
-                        0xCC,
-                    ):  # names, memory data, memory block
-                        self._scan_delay_msec = SCAN_MODULEINFO_TIMEOUT_INTERVAL
-                        # self._log.debug(f"Restart timeout {msg}")
-                    # send the message to the modules
-                    await module.on_message(msg)
-                else:
-                    self._log.warning(f"NOT FOUND IN command_registry: {rawmsg}")
+                # a module the scan did not find, nobody listens to it
+                self._skipped += 1
+                return
+            module_type = module.get_type()
+            command = commandRegistry.get_command(command_value, module_type)
+            if not command:
+                self._log.warning(f"NOT FOUND IN command_registry: {rawmsg}")
+                self._skipped += 1
+                return
+            # restart the info completion time when info message received
+            if command_value in (
+                0xF0,
+                0xF1,
+                0xF2,
+                0xFB,
+                0xFE,
+                0xCC,
+            ):  # names, memory data, memory block
+                self._scan_delay_msec = SCAN_MODULEINFO_TIMEOUT_INTERVAL
+            handled = module.handles(command, data)
+            routed = (address, command_value) in self._routes
+            if metrics is not None:
+                decode_start = perf_counter()
+                metrics.observe("lookup", decode_start - start)
+            if self._lazy_decode and not handled and not routed:
+                # nobody would look at the message, don't decode it
+                self._skipped += 1
+                return
+            msg = command()
+            msg.populate(priority, address, rtr, data)
+            self._decoded += 1
+            if metrics is not None:
+                metrics.observe("decode", perf_counter() - decode_start)
+            # send the message to the modules
+            if handled or not self._lazy_decode:
+                await module.on_message(msg)
+            if routed:
+                await self._notify(msg, command_value)
 
     def _handle_module_type(self, msg: ModuleTypeMessage | ModuleType2Message) -> None:
         """
@@ -228,7 +297,7 @@ class PacketHandler:
         if msg is not None:
             module = self._velbus.get_module(msg.address)
             if module is None:
-                data = keys_exists(self.pdata, "ModuleTypes", h2(msg.module_type))
+                data = self.pdata.module_type(msg.module_type)
                 if not data:
                     self._log.warning(f"Module not recognized: {msg.module_type}")
                     return
@@ -241,6 +310,10 @@ class PacketHandler:
                     build_week=msg.build_week,
                     serial=msg.serial,
                 )
+                module = self._velbus.get_module(msg.address)
+                module.mark_seen()
+                # reload the module if it changed since it was cached
+                self._velbus.get_cache().validate(module)
             else:
                 self._log.debug(
                     f"***Module already exists scanAddr={self._modulescan_address} addr={msg.address} {msg}"
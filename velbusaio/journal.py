@@ -0,0 +1,169 @@
+"""
+Channel state journal
+
+Every channel state change is appended to a journal file in the cache
+directory, one json line per change: [address, channel, {key: value}].
+Replaying the journal is a single sequential read that keeps the last value
+of every key, so after a restart the channels come up with their last known
+state long before the modules answer the status requests.
+
+The journal is compacted, rewritten with one line per channel, after the
+replay and whenever it grows past JOURNAL_MAX_BYTES. A line that was cut off
+by a crash ends the replay, everything before it is kept.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any
+
+from velbusaio.const import JOURNAL_MAX_BYTES
+
+JOURNAL_FILE = "state.journal"
+
+
+class StateJournal:
+    """
+    Append-only log of channel state changes
+
+    The methods that touch the file block, call them from an executor.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = JOURNAL_MAX_BYTES) -> None:
+        self._log = logging.getLogger("velbus-journal")
+        self._path = os.path.join(cache_dir, JOURNAL_FILE)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (address, channel) => last known state
+        self._state: dict[tuple[int, int], dict[str, Any]] = {}
+        # changes that are not written yet
+        self._pending: dict[tuple[int, int], dict[str, Any]] = {}
+        self._forgotten = False
+        # compacting before the replay would lose the older state
+        self._replayed = False
+        self._size = 0
+        self._compacted_size = 0
+        self._appends = 0
+        self._compactions = 0
+
+    def replay(self) -> None:
+        """
+        Read the journal and compact it
+        """
+        state: dict[tuple[int, int], dict[str, Any]] = {}
+        lines = 0
+        try:
+            with open(self._path, "rb") as fl:
+                for line in fl:
+                    try:
+                        address, channel, changes = json.loads(line)
+                        state.setdefault((address, channel), {}).update(changes)
+                    except (ValueError, TypeError):
+                        self._log.warning(
+                            f"Journal is damaged after {lines} entries, "
+                            "ignoring the rest"
+                        )
+                        break
+                    lines += 1
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            self._log.error(f"Could not read the state journal: {err}")
+        with self._lock:
+            for key, changes in self._state.items():
+                state.setdefault(key, {}).update(changes)
+            self._state = state
+            self._replayed = True
+        self.compact()
+
+    def get(self, address: int) -> dict[int, dict[str, Any]]:
+        """
+        The last known state of the channels of a module
+        """
+        with self._lock:
+            return {
+                channel: dict(state)
+                for (addr, channel), state in self._state.items()
+                if addr == address
+            }
+
+    def record(self, address: int, channel: int, key: str, value: Any) -> None:
+        """
+        Remember a state change, it is written by the next write()
+        """
+        with self._lock:
+            self._state.setdefault((address, channel), {})[key] = value
+            self._pending.setdefault((address, channel), {})[key] = value
+
+    def forget(self, address: int) -> None:
+        """
+        Drop the state of a module, the next write() compacts the journal
+        """
+        with self._lock:
+            for key in [key for key in self._state if key[0] == address]:
+                del self._state[key]
+                self._pending.pop(key, None)
+            self._forgotten = True
+
+    def write(self) -> None:
+        """
+        Append the pending changes, compact when the journal is too big
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            compact = self._forgotten and self._replayed
+        if compact:
+            self.compact()
+            return
+        if not pending:
+            return
+        data = b"".join(self._encode(key, state) for key, state in pending.items())
+        try:
+            with open(self._path, "ab") as fl:
+                fl.write(data)
+        except OSError as err:
+            self._log.error(f"Could not write the state journal: {err}")
+            return
+        self._size += len(data)
+        self._appends += len(pending)
+        # a compacted journal can be bigger than the limit on big installations
+        if self._replayed and self._size > max(
+            self._max_bytes, 2 * self._compacted_size
+        ):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rewrite the journal with one line per channel
+        """
+        with self._lock:
+            self._pending = {}
+            self._forgotten = False
+            data = b"".join(
+                self._encode(key, state) for key, state in self._state.items()
+            )
+        tmp = f"{self._path}.tmp"
+        try:
+            with open(tmp, "wb") as fl:
+                fl.write(data)
+            os.replace(tmp, self._path)
+        except OSError as err:
+            self._log.error(f"Could not compact the state journal: {err}")
+            return
+        self._size = self._compacted_size = len(data)
+        self._compactions += 1
+
+    @staticmethod
+    def _encode(key: tuple[int, int], state: dict[str, Any]) -> bytes:
+        return (json.dumps([key[0], key[1], state]) + "\n").encode()
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._state),
+            "size": self._size,
+            "appends": self._appends,
+            "compactions": self._compactions,
+        }
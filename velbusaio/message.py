@@ -5,9 +5,13 @@ The velbus abstract message class
 from __future__ import annotations
 
 import json
+from typing import TYPE_CHECKING
 
 from velbusaio.const import PRIORITY_FIRMWARE, PRIORITY_HIGH, PRIORITY_LOW
 
+if TYPE_CHECKING:
+    from velbusaio.fields import MessageLayout
+
 
 class ParserError(Exception):
     """
@@ -20,6 +24,12 @@ class Message:
     Base Velbus message
     """
 
+    # set by the velbusaio.fields.layout decorator
+    _layout: MessageLayout | None = None
+    # the attribute holding the channel list, when the message has a channel
+    # bitmask that can hold several channels at once
+    channel_mask: str | None = None
+
     def __init__(self, address: int = 0) -> None:
         self.priority = PRIORITY_LOW
         self.address: int = 0
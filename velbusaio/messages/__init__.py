@@ -1,105 +1,204 @@
 """
 :author: Thomas Delaet <thomas@delaet.org>
+
+The message modules are only imported when one of their classes is used,
+the command registry finds them through velbusaio.command_index.
 """
 
 from __future__ import annotations
 
-from velbusaio.messages.blind_status import BlindStatusMessage, BlindStatusNgMessage
-from velbusaio.messages.bus_active import BusActiveMessage
-from velbusaio.messages.bus_error_counter_status import BusErrorCounterStatusMessage
-from velbusaio.messages.bus_error_counter_status_request import (
-    BusErrorStatusRequestMessage,
-)
-from velbusaio.messages.bus_off import BusOffMessage
-from velbusaio.messages.channel_name_part1 import (
-    ChannelNamePart1Message,
-    ChannelNamePart1Message2,
-    ChannelNamePart1Message3,
-)
-from velbusaio.messages.channel_name_part2 import (
-    ChannelNamePart2Message,
-    ChannelNamePart2Message2,
-    ChannelNamePart2Message3,
-)
-from velbusaio.messages.channel_name_part3 import (
-    ChannelNamePart3Message,
-    ChannelNamePart3Message2,
-    ChannelNamePart3Message3,
-)
-from velbusaio.messages.channel_name_request import (
-    ChannelNameRequestMessage,
-    ChannelNameRequestMessage2,
-)
-from velbusaio.messages.clear_led import ClearLedMessage
-from velbusaio.messages.counter_status import CounterStatusMessage
-from velbusaio.messages.counter_status_request import CounterStatusRequestMessage
-from velbusaio.messages.cover_down import CoverDownMessage, CoverDownMessage2
-from velbusaio.messages.cover_off import CoverOffMessage, CoverOffMessage2
-from velbusaio.messages.cover_position import CoverPosMessage
-from velbusaio.messages.cover_up import CoverUpMessage, CoverUpMessage2
-from velbusaio.messages.dali_device_settings import DaliDeviceSettingMsg
-from velbusaio.messages.dimmer_channel_status import DimmerChannelStatusMessage
-from velbusaio.messages.dimmer_status import DimmerStatusMessage
-from velbusaio.messages.fast_blinking_led import FastBlinkingLedMessage
-from velbusaio.messages.forced_off import ForcedOff
-from velbusaio.messages.forced_on import ForcedOn
-from velbusaio.messages.interface_status_request import InterfaceStatusRequestMessage
-from velbusaio.messages.ir_receiver_status import IRReceiverStatusMessage
-from velbusaio.messages.kwh_status import KwhStatusMessage
-from velbusaio.messages.light_value_request import LightValueRequest
-from velbusaio.messages.memo_text import MemoTextMessage
-from velbusaio.messages.memory_data import MemoryDataMessage
-from velbusaio.messages.memory_data_block import MemoryDataBlockMessage
-from velbusaio.messages.memory_dump_request import MemoryDumpRequestMessage
-from velbusaio.messages.raw import MeteoRawMessage, SensorRawMessage
-from velbusaio.messages.module_status import ModuleStatusMessage, ModuleStatusMessage2
-from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
-from velbusaio.messages.module_subtype import ModuleSubTypeMessage
-from velbusaio.messages.module_type import ModuleTypeMessage, ModuleType2Message
-from velbusaio.messages.module_type_request import ModuleTypeRequestMessage
-from velbusaio.messages.push_button_status import PushButtonStatusMessage
-from velbusaio.messages.read_data_block_from_memory import (
-    ReadDataBlockFromMemoryMessage,
-)
-from velbusaio.messages.read_data_from_memory import ReadDataFromMemoryMessage
-from velbusaio.messages.realtime_clock_status_request import RealtimeClockStatusRequest
-from velbusaio.messages.receive_buffer_full import ReceiveBufferFullMessage
-from velbusaio.messages.receive_ready import ReceiveReadyMessage
-from velbusaio.messages.relay_status import RelayStatusMessage
-from velbusaio.messages.restore_dimmer import RestoreDimmerMessage
-from velbusaio.messages.select_program import SelectProgramMessage
-from velbusaio.messages.sensor_temp_request import SensorTempRequest
-from velbusaio.messages.sensor_temperature import SensorTemperatureMessage
-from velbusaio.messages.set_date import SetDate
-from velbusaio.messages.set_daylight_saving import SetDaylightSaving
-from velbusaio.messages.set_dimmer import SetDimmerMessage
-from velbusaio.messages.set_led import SetLedMessage
-from velbusaio.messages.set_realtime_clock import SetRealtimeClock
-from velbusaio.messages.set_temperature import SetTemperatureMessage
-from velbusaio.messages.slider_status import SliderStatusMessage
-from velbusaio.messages.slow_blinking_led import SlowBlinkingLedMessage
-from velbusaio.messages.start_relay_blinking_timer import StartRelayBlinkingTimerMessage
-from velbusaio.messages.start_relay_timer import StartRelayTimerMessage
-from velbusaio.messages.switch_relay_off import SwitchRelayOffMessage
-from velbusaio.messages.switch_relay_on import SwitchRelayOnMessage
-from velbusaio.messages.switch_to_comfort import SwitchToComfortMessage
-from velbusaio.messages.switch_to_day import SwitchToDayMessage
-from velbusaio.messages.switch_to_night import SwitchToNightMessage
-from velbusaio.messages.switch_to_safe import SwitchToSafeMessage
-from velbusaio.messages.temp_sensor_settings_part1 import TempSensorSettingsPart1
-from velbusaio.messages.temp_sensor_settings_part2 import TempSensorSettingsPart2
-from velbusaio.messages.temp_sensor_settings_part3 import TempSensorSettingsPart3
-from velbusaio.messages.temp_sensor_settings_part4 import TempSensorSettingsPart4
-from velbusaio.messages.temp_sensor_settings_request import TempSensorSettingsRequest
-from velbusaio.messages.temp_sensor_status import TempSensorStatusMessage
-from velbusaio.messages.temp_set_cooling import TempSetCoolingMessage
-from velbusaio.messages.temp_set_heating import TempSetHeatingMessage
-from velbusaio.messages.update_led_status import UpdateLedStatusMessage
-from velbusaio.messages.very_fast_blinking_led import VeryFastBlinkingLedMessage
-from velbusaio.messages.write_data_to_memory import WriteDataToMemoryMessage
-from velbusaio.messages.write_memory_block import WriteMemoryBlockMessage
-from velbusaio.messages.write_module_address_and_serial_number import (
-    WriteModuleAddressAndSerialNumberMessage,
+import importlib
+from typing import Any
+
+# the modules that register message classes in the command registry
+MESSAGE_MODULES = (
+    "blind_status",
+    "bus_active",
+    "bus_error_counter_status",
+    "bus_error_counter_status_request",
+    "bus_off",
+    "channel_name_part1",
+    "channel_name_part2",
+    "channel_name_part3",
+    "channel_name_request",
+    "clear_led",
+    "counter_status",
+    "counter_status_request",
+    "cover_down",
+    "cover_off",
+    "cover_position",
+    "cover_up",
+    "dali_device_settings",
+    "dali_device_settings_request",
+    "dali_dim_value_status",
+    "dimmer_channel_status",
+    "dimmer_status",
+    "edge_set_color",
+    "fast_blinking_led",
+    "forced_off",
+    "forced_on",
+    "interface_status_request",
+    "ir_receiver_status",
+    "kwh_status",
+    "light_value_request",
+    "memo_text",
+    "memory_data",
+    "memory_data_block",
+    "memory_dump_request",
+    "module_status",
+    "module_status_request",
+    "module_subtype",
+    "module_type",
+    "module_type_request",
+    "push_button_status",
+    "raw",
+    "read_data_block_from_memory",
+    "read_data_from_memory",
+    "realtime_clock_status_request",
+    "receive_buffer_full",
+    "receive_ready",
+    "relay_status",
+    "restore_dimmer",
+    "select_program",
+    "sensor_temp_request",
+    "sensor_temperature",
+    "set_date",
+    "set_daylight_saving",
+    "set_dimmer",
+    "set_led",
+    "set_realtime_clock",
+    "set_temperature",
+    "slider_status",
+    "slow_blinking_led",
+    "start_relay_blinking_timer",
+    "start_relay_timer",
+    "switch_relay_off",
+    "switch_relay_on",
+    "switch_to_comfort",
+    "switch_to_day",
+    "switch_to_night",
+    "switch_to_safe",
+    "temp_sensor_settings_part1",
+    "temp_sensor_settings_part2",
+    "temp_sensor_settings_part3",
+    "temp_sensor_settings_part4",
+    "temp_sensor_settings_request",
+    "temp_sensor_status",
+    "temp_set_cooling",
+    "temp_set_heating",
+    "update_led_status",
+    "very_fast_blinking_led",
+    "write_data_to_memory",
+    "write_memory_block",
+    "write_module_address_and_serial_number",
 )
 
-# pylint: disable-msg=C0301
+# class name => module, for the names that can be imported from this package
+_EXPORTS = {
+    "BlindStatusMessage": "blind_status",
+    "BlindStatusNgMessage": "blind_status",
+    "BusActiveMessage": "bus_active",
+    "BusErrorCounterStatusMessage": "bus_error_counter_status",
+    "BusErrorStatusRequestMessage": "bus_error_counter_status_request",
+    "BusOffMessage": "bus_off",
+    "ChannelNamePart1Message": "channel_name_part1",
+    "ChannelNamePart1Message2": "channel_name_part1",
+    "ChannelNamePart1Message3": "channel_name_part1",
+    "ChannelNamePart2Message": "channel_name_part2",
+    "ChannelNamePart2Message2": "channel_name_part2",
+    "ChannelNamePart2Message3": "channel_name_part2",
+    "ChannelNamePart3Message": "channel_name_part3",
+    "ChannelNamePart3Message2": "channel_name_part3",
+    "ChannelNamePart3Message3": "channel_name_part3",
+    "ChannelNameRequestMessage": "channel_name_request",
+    "ChannelNameRequestMessage2": "channel_name_request",
+    "ClearLedMessage": "clear_led",
+    "CounterStatusMessage": "counter_status",
+    "CounterStatusRequestMessage": "counter_status_request",
+    "CoverDownMessage": "cover_down",
+    "CoverDownMessage2": "cover_down",
+    "CoverOffMessage": "cover_off",
+    "CoverOffMessage2": "cover_off",
+    "CoverPosMessage": "cover_position",
+    "CoverUpMessage": "cover_up",
+    "CoverUpMessage2": "cover_up",
+    "DaliDeviceSettingMsg": "dali_device_settings",
+    "DimmerChannelStatusMessage": "dimmer_channel_status",
+    "DimmerStatusMessage": "dimmer_status",
+    "FastBlinkingLedMessage": "fast_blinking_led",
+    "ForcedOff": "forced_off",
+    "ForcedOn": "forced_on",
+    "InterfaceStatusRequestMessage": "interface_status_request",
+    "IRReceiverStatusMessage": "ir_receiver_status",
+    "KwhStatusMessage": "kwh_status",
+    "LightValueRequest": "light_value_request",
+    "MemoTextMessage": "memo_text",
+    "MemoryDataMessage": "memory_data",
+    "MemoryDataBlockMessage": "memory_data_block",
+    "MemoryDumpRequestMessage": "memory_dump_request",
+    "MeteoRawMessage": "raw",
+    "SensorRawMessage": "raw",
+    "ModuleStatusMessage": "module_status",
+    "ModuleStatusMessage2": "module_status",
+    "ModuleStatusRequestMessage": "module_status_request",
+    "ModuleSubTypeMessage": "module_subtype",
+    "ModuleTypeMessage": "module_type",
+    "ModuleType2Message": "module_type",
+    "ModuleTypeRequestMessage": "module_type_request",
+    "PushButtonStatusMessage": "push_button_status",
+    "ReadDataBlockFromMemoryMessage": "read_data_block_from_memory",
+    "ReadDataFromMemoryMessage": "read_data_from_memory",
+    "RealtimeClockStatusRequest": "realtime_clock_status_request",
+    "ReceiveBufferFullMessage": "receive_buffer_full",
+    "ReceiveReadyMessage": "receive_ready",
+    "RelayStatusMessage": "relay_status",
+    "RestoreDimmerMessage": "restore_dimmer",
+    "SelectProgramMessage": "select_program",
+    "SensorTempRequest": "sensor_temp_request",
+    "SensorTemperatureMessage": "sensor_temperature",
+    "SetDate": "set_date",
+    "SetDaylightSaving": "set_daylight_saving",
+    "SetDimmerMessage": "set_dimmer",
+    "SetLedMessage": "set_led",
+    "SetRealtimeClock": "set_realtime_clock",
+    "SetTemperatureMessage": "set_temperature",
+    "SliderStatusMessage": "slider_status",
+    "SlowBlinkingLedMessage": "slow_blinking_led",
+    "StartRelayBlinkingTimerMessage": "start_relay_blinking_timer",
+    "StartRelayTimerMessage": "start_relay_timer",
+    "SwitchRelayOffMessage": "switch_relay_off",
+    "SwitchRelayOnMessage": "switch_relay_on",
+    "SwitchToComfortMessage": "switch_to_comfort",
+    "SwitchToDayMessage": "switch_to_day",
+    "SwitchToNightMessage": "switch_to_night",
+    "SwitchToSafeMessage": "switch_to_safe",
+    "TempSensorSettingsPart1": "temp_sensor_settings_part1",
+    "TempSensorSettingsPart2": "temp_sensor_settings_part2",
+    "TempSensorSettingsPart3": "temp_sensor_settings_part3",
+    "TempSensorSettingsPart4": "temp_sensor_settings_part4",
+    "TempSensorSettingsRequest": "temp_sensor_settings_request",
+    "TempSensorStatusMessage": "temp_sensor_status",
+    "TempSetCoolingMessage": "temp_set_cooling",
+    "TempSetHeatingMessage": "temp_set_heating",
+    "UpdateLedStatusMessage": "update_led_status",
+    "VeryFastBlinkingLedMessage": "very_fast_blinking_led",
+    "WriteDataToMemoryMessage": "write_data_to_memory",
+    "WriteMemoryBlockMessage": "write_memory_block",
+    "WriteModuleAddressAndSerialNumberMessage": "write_module_address_and_serial_number",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
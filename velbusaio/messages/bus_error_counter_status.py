@@ -5,12 +5,21 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xDA
 
 
 @register(COMMAND_CODE)
+@layout(
+    COMMAND_CODE,
+    UInt("transmit_error_counter"),
+    UInt("receive_error_counter"),
+    UInt("bus_off_counter"),
+    priority=PRIORITY_LOW,
+)
 class BusErrorCounterStatusMessage(Message):
     """
     send by: VMB6IN, VMB4RYLD
@@ -23,27 +32,3 @@ class BusErrorCounterStatusMessage(Message):
         self.receive_error_counter = 0
         self.bus_off_counter = 0
         self.set_defaults(address)
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 3)
-        self.transmit_error_counter = data[0]
-        self.receive_error_counter = data[1]
-        self.bus_off_counter = data[2]
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes(
-            [
-                COMMAND_CODE,
-                self.transmit_error_counter,
-                self.receive_error_counter,
-                self.bus_off_counter,
-            ]
-        )
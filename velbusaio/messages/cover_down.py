@@ -7,12 +7,20 @@ from __future__ import annotations
 import struct
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_HIGH
+from velbusaio.fields import ChannelByte, UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0x06
 
 
 @register(COMMAND_CODE, ["VMB1BLE", "VMB2BLE", "VMB1BLS"])
+@layout(
+    COMMAND_CODE,
+    ChannelByte("channel"),
+    UInt("delay_time", 3),
+    priority=PRIORITY_HIGH,
+)
 class CoverDownMessage(Message):
     """
     sent by:
@@ -25,32 +33,12 @@ class CoverDownMessage(Message):
         self.delay_time = 0
         self.set_defaults(address)
 
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_high_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 4)
-        self.set_attributes(priority, address, rtr)
-        self.channel = self.byte_to_channel(data[0])
-        (self.delay_time,) = struct.unpack(">L", bytes([0]) + data[1:])
-
     def set_defaults(self, address):
         if address is not None:
             self.set_address(address)
         self.set_high_priority()
         self.set_no_rtr()
 
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return (
-            bytes([COMMAND_CODE, self.channels_to_byte([self.channel])])
-            + struct.pack(">L", self.delay_time)[-3:]
-        )
-
 
 @register(COMMAND_CODE, ["VMB1BL", "VMB2BL"])
 class CoverDownMessage2(Message):
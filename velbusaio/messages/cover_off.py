@@ -5,12 +5,15 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_HIGH
+from velbusaio.fields import ChannelByte, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0x04
 
 
 @register(COMMAND_CODE, ["VMB1BLE", "VMB2BLE", "VMB1BLS"])
+@layout(COMMAND_CODE, ChannelByte("channel"), priority=PRIORITY_HIGH)
 class CoverOffMessage(Message):
     """
     sent by:
@@ -22,28 +25,12 @@ class CoverOffMessage(Message):
         self.channel = 0
         self.set_defaults(address)
 
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_high_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 1)
-        self.set_attributes(priority, address, rtr)
-        self.channel = self.byte_to_channel(data[0])
-
     def set_defaults(self, address):
         if address is not None:
             self.set_address(address)
         self.set_high_priority()
         self.set_no_rtr()
 
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes([COMMAND_CODE, self.channels_to_byte([self.channel])])
-
 
 @register(COMMAND_CODE, ["VMB1BL", "VMB2BL"])
 class CoverOffMessage2(Message):
@@ -4,9 +4,9 @@
 
 from __future__ import annotations
 
-import struct
-
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import ChannelByte, UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xB8
@@ -23,6 +23,15 @@ LED_VERY_FAST_BLINKING = 1 << 4
 
 
 @register(COMMAND_CODE, ["VMB4DC", "VMBDMI", "VMBDMI-R", "VMB8DC-20"])
+@layout(
+    COMMAND_CODE,
+    ChannelByte("channel"),
+    UInt("disable_inhibit_forced"),
+    UInt("dimmer_state"),
+    UInt("led_status"),
+    UInt("delay_time", 3),
+    priority=PRIORITY_LOW,
+)
 class DimmerChannelStatusMessage(Message):
     """
     sent by: VMB4DC
@@ -38,20 +47,6 @@ class DimmerChannelStatusMessage(Message):
         self.delay_time = 0
         self.set_defaults(address)
 
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 7)
-        self.set_attributes(priority, address, rtr)
-        self.channel = self.byte_to_channel(data[0])
-        self.disable_inhibit_forced = data[1]
-        self.dimmer_state = int.from_bytes([data[2]], byteorder="big", signed=False)
-        self.led_status = data[3]
-        (self.delay_time,) = struct.unpack(">L", bytes([0]) + data[4:])
-
     def is_normal(self):
         """
         :return: bool
@@ -81,20 +76,3 @@ class DimmerChannelStatusMessage(Message):
         :return: int
         """
         return self.dimmer_state
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return (
-            bytes(
-                [
-                    COMMAND_CODE,
-                    self.channels_to_byte([self.channel]),
-                    self.disable_inhibit_forced,
-                    self.dimmer_state,
-                    self.led_status,
-                ]
-            )
-            + struct.pack(">L", self.delay_time)[-3:]
-        )
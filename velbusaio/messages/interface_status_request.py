@@ -5,29 +5,17 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0x0E
 
 
 @register(COMMAND_CODE)
+@layout(COMMAND_CODE, priority=PRIORITY_LOW)
 class InterfaceStatusRequestMessage(Message):
     """
     send by: VMB1USB
     received by:
     """
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_no_data(data)
-        self.set_attributes(priority, address, rtr)
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes([COMMAND_CODE])
@@ -5,6 +5,8 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import Bit, Bits, ChannelMask, Padding, UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xED
@@ -13,6 +15,14 @@ PROGRAM_SELECTION = {0: "none", 1: "summer", 2: "winter", 3: "holiday"}
 
 
 @register(COMMAND_CODE)
+@layout(
+    COMMAND_CODE,
+    ChannelMask("closed"),
+    ChannelMask("led_on"),
+    ChannelMask("led_slow_blinking"),
+    ChannelMask("led_fast_blinking"),
+    priority=PRIORITY_LOW,
+)
 class ModuleStatusMessage(Message):
     """
     send by: VMB6IN
@@ -27,33 +37,6 @@ class ModuleStatusMessage(Message):
         self.led_fast_blinking = []
         self.set_defaults(address)
 
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 4)
-        self.set_attributes(priority, address, rtr)
-        self.closed = self.byte_to_channels(data[0])
-        self.led_on = self.byte_to_channels(data[1])
-        self.led_slow_blinking = self.byte_to_channels(data[2])
-        self.led_fast_blinking = self.byte_to_channels(data[3])
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes(
-            [
-                COMMAND_CODE,
-                self.channels_to_byte(self.closed),
-                self.channels_to_byte(self.led_on),
-                self.channels_to_byte(self.led_slow_blinking),
-                self.channels_to_byte(self.led_fast_blinking),
-            ]
-        )
-
 
 @register(
     COMMAND_CODE,
@@ -89,6 +72,16 @@ class ModuleStatusMessage(Message):
         "VMBGP4PIR-20",
     ],
 )
+@layout(
+    COMMAND_CODE,
+    ChannelMask("closed"),
+    ChannelMask("enabled"),
+    ChannelMask("normal"),
+    ChannelMask("locked"),
+    ChannelMask("programenabled"),
+    Bits(Bit("selected_program", 0, 2)),
+    priority=PRIORITY_LOW,
+)
 class ModuleStatusMessage2(Message):
     def __init__(self, address=None):
         Message.__init__(self)
@@ -101,34 +94,29 @@ class ModuleStatusMessage2(Message):
         self.selected_program_str = PROGRAM_SELECTION[self.selected_program]
 
     def populate(self, priority, address, rtr, data):
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 6)
-        self.set_attributes(priority, address, rtr)
-        self.closed = self.byte_to_channels(data[0])
-        self.enabled = self.byte_to_channels(data[1])
-        self.normal = self.byte_to_channels(data[2])
-        self.locked = self.byte_to_channels(data[3])
-        self.programenabled = self.byte_to_channels(data[4])
-        self.selected_program = data[5] & 0x03
+        self._layout.populate(self, priority, address, rtr, data)
         self.selected_program_str = PROGRAM_SELECTION[self.selected_program]
 
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes(
-            [
-                COMMAND_CODE,
-                self.channels_to_byte(self.closed),
-                self.channels_to_byte(self.enabled),
-                self.channels_to_byte(self.normal),
-                self.channels_to_byte(self.locked),
-            ]
-        )
-
 
 @register(COMMAND_CODE, ["VMBPIRO", "VMBPIRM", "VMBPIRC", "VMBELPIR"])
+@layout(
+    COMMAND_CODE,
+    Bits(
+        Bit("dark", 0),
+        Bit("light", 1),
+        Bit("motion1", 2),
+        Bit("light_motion1", 3),
+        Bit("motion2", 4),
+        Bit("light_motion2", 5),
+        Bit("low_temp_alarm", 6),
+        Bit("high_temp_alarm", 7),
+    ),
+    UInt("light_value", 2),
+    Padding(2),
+    Bits(Bit("selected_program", 0, 2)),
+    length=7,
+    priority=PRIORITY_LOW,
+)
 class ModuleStatusPirMessage(Message):
     def __init__(self, address=None):
         Message.__init__(self)
@@ -148,28 +136,9 @@ class ModuleStatusPirMessage(Message):
         self.selected_program_str = PROGRAM_SELECTION[self.selected_program]
 
     def populate(self, priority, address, rtr, data):
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 7)
-        self.set_attributes(priority, address, rtr)
-        self.dark = bool(data[0] & (1 << 0))
-        self.light = bool(data[0] & (1 << 1))
-        self.motion1 = bool(data[0] & (1 << 2))
-        self.light_motion1 = bool(data[0] & (1 << 3))
-        self.motion2 = bool(data[0] & (1 << 4))
-        self.light_motion2 = bool(data[0] & (1 << 5))
-        self.low_temp_alarm = bool(data[0] & (1 << 6))
-        self.high_temp_alarm = bool(data[0] & (1 << 7))
-        self.light_value = (data[1] << 8) + data[2]
-        self.selected_program = data[5] & 0x03
+        self._layout.populate(self, priority, address, rtr, data)
         self.selected_program_str = PROGRAM_SELECTION[self.selected_program]
 
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        raise NotImplementedError
-
 
 @register(COMMAND_CODE, ["VMBGP4PIR", "VMBGP4PIR-2"])
 class ModuleStatusGP4PirMessage(Message):
@@ -5,12 +5,15 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import ChannelMask, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xFA
 
 
 @register(COMMAND_CODE)
+@layout(COMMAND_CODE, ChannelMask("channels"), priority=PRIORITY_LOW)
 class ModuleStatusRequestMessage(Message):
     """
     send by:
@@ -22,19 +25,3 @@ class ModuleStatusRequestMessage(Message):
         self.channels = []
         self.wait_after_send = 500
         self.set_defaults(address)
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 1)
-        self.set_attributes(priority, address, rtr)
-        self.channels = self.byte_to_channels(data[0])
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes([COMMAND_CODE, self.channels_to_byte(self.channels)])
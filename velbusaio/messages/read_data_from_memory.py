@@ -5,12 +5,20 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xFD
 
 
 @register(COMMAND_CODE)
+@layout(
+    COMMAND_CODE,
+    UInt("high_address"),
+    UInt("low_address"),
+    priority=PRIORITY_LOW,
+)
 class ReadDataFromMemoryMessage(Message):
     """
     send by:
@@ -22,20 +30,3 @@ class ReadDataFromMemoryMessage(Message):
         self.high_address = 0x00
         self.low_address = 0x00
         self.set_defaults(address)
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 2)
-        self.set_attributes(priority, address, rtr)
-        self.low_address = data[1]
-        self.high_address = data[0]
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes([COMMAND_CODE, self.high_address, self.low_address])
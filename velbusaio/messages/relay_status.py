@@ -4,9 +4,9 @@
 
 from __future__ import annotations
 
-import struct
-
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import ChannelByte, UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xFB
@@ -25,6 +25,15 @@ LED_VERY_FAST_BLINKING = 1 << 4
 
 
 @register(COMMAND_CODE)
+@layout(
+    COMMAND_CODE,
+    ChannelByte("channel"),
+    UInt("disable_inhibit_forced"),
+    UInt("status"),
+    UInt("led_status"),
+    UInt("delay_time", 3),
+    priority=PRIORITY_LOW,
+)
 class RelayStatusMessage(Message):
     """
     send by: VMB4RYLD
@@ -40,20 +49,6 @@ class RelayStatusMessage(Message):
         self.delay_time = 0
         self.set_defaults(address)
 
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 7)
-        self.set_attributes(priority, address, rtr)
-        self.channel = self.byte_to_channel(data[0])
-        self.disable_inhibit_forced = data[1]
-        self.status = data[2]
-        self.led_status = data[3]
-        (self.delay_time,) = struct.unpack(">L", bytes([0]) + data[4:])
-
     def is_normal(self):
         """
         :return: bool
@@ -90,23 +85,6 @@ class RelayStatusMessage(Message):
         """
         return self.status == INTERVAL_TIMER_ON
 
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return (
-            bytes(
-                [
-                    COMMAND_CODE,
-                    self.channels_to_byte([self.channel]),
-                    self.disable_inhibit_forced,
-                    self.status,
-                    self.led_status,
-                ]
-            )
-            + struct.pack(">L", self.delay_time)[-3:]
-        )
-
 
 @register(COMMAND_CODE, ["VMB4RY"])
 class RelayStatusMessage2(RelayStatusMessage):
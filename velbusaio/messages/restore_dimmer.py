@@ -20,6 +20,8 @@ class RestoreDimmerMessage(Message):
     received by: VMBDME, VMB4DC
     """
 
+    channel_mask = "dimmer_channels"
+
     def __init__(self, address=None):
         Message.__init__(self)
         self.dimmer_channels = []
@@ -59,6 +61,9 @@ class RestoreDimmerMessage(Message):
 
 @register(COMMAND_CODE, ["VMBDALI", "VMBDALI-20"])
 class RestoreDimmerMessage2(RestoreDimmerMessage):
+    # a channel number, not a bitmask
+    channel_mask = None
+
     def byte_to_channels(self, byte: int) -> list[int]:
         return [byte]
 
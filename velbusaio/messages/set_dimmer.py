@@ -19,6 +19,8 @@ class SetDimmerMessage(Message):
     received by: VMBDME, VMB4DC
     """
 
+    channel_mask = "dimmer_channels"
+
     def __init__(self, address=None):
         Message.__init__(self)
         self.dimmer_channels = []
@@ -62,6 +64,9 @@ class SetDimmerMessage2(SetDimmerMessage):
     received by: VMBDALI
     """
 
+    # a channel number, not a bitmask
+    channel_mask = None
+
     def byte_to_channels(self, byte: int) -> list[int]:
         return [byte]
 
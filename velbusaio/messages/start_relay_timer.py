@@ -4,15 +4,21 @@
 
 from __future__ import annotations
 
-import struct
-
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_HIGH
+from velbusaio.fields import ChannelMask, UInt, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0x03
 
 
 @register(COMMAND_CODE)
+@layout(
+    COMMAND_CODE,
+    ChannelMask("relay_channels"),
+    UInt("delay_time", 3),
+    priority=PRIORITY_HIGH,
+)
 class StartRelayTimerMessage(Message):
     """
     send by:
@@ -30,23 +36,3 @@ class StartRelayTimerMessage(Message):
             self.set_address(address)
         self.set_high_priority()
         self.set_no_rtr()
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_high_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 4)
-        self.set_attributes(priority, address, rtr)
-        self.relay_channels = self.byte_to_channels(data)
-        (self.delay_time,) = struct.unpack(">L", bytes([0]) + data[1:])
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return (
-            bytes([COMMAND_CODE, self.channels_to_byte(self.relay_channels)])
-            + struct.pack(">L", self.delay_time)[-3:]
-        )
@@ -5,12 +5,15 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_HIGH
+from velbusaio.fields import ChannelMask, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0x02
 
 
 @register(COMMAND_CODE)
+@layout(COMMAND_CODE, ChannelMask("relay_channels"), priority=PRIORITY_HIGH)
 class SwitchRelayOnMessage(Message):
     """
     send by:
@@ -27,19 +30,3 @@ class SwitchRelayOnMessage(Message):
             self.set_address(address)
         self.set_high_priority()
         self.set_no_rtr()
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_high_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 1)
-        self.set_attributes(priority, address, rtr)
-        self.relay_channels = self.byte_to_channels(data[0])
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes([COMMAND_CODE, self.channels_to_byte(self.relay_channels)])
@@ -5,12 +5,21 @@
 from __future__ import annotations
 
 from velbusaio.command_registry import register
+from velbusaio.const import PRIORITY_LOW
+from velbusaio.fields import ChannelMask, layout
 from velbusaio.message import Message
 
 COMMAND_CODE = 0xF4
 
 
 @register(COMMAND_CODE)
+@layout(
+    COMMAND_CODE,
+    ChannelMask("led_on"),
+    ChannelMask("led_slow_blinking"),
+    ChannelMask("led_fast_blinking"),
+    priority=PRIORITY_LOW,
+)
 class UpdateLedStatusMessage(Message):
     """
     send by:
@@ -23,28 +32,3 @@ class UpdateLedStatusMessage(Message):
         self.led_slow_blinking = []
         self.led_fast_blinking = []
         self.set_defaults(address)
-
-    def populate(self, priority, address, rtr, data):
-        """
-        :return: None
-        """
-        self.needs_low_priority(priority)
-        self.needs_no_rtr(rtr)
-        self.needs_data(data, 3)
-        self.set_attributes(priority, address, rtr)
-        self.led_on = self.byte_to_channels(data[0])
-        self.led_slow_blinking = self.byte_to_channels(data[1])
-        self.led_fast_blinking = self.byte_to_channels(data[2])
-
-    def data_to_binary(self):
-        """
-        :return: bytes
-        """
-        return bytes(
-            [
-                COMMAND_CODE,
-                self.channels_to_byte(self.led_on),
-                self.channels_to_byte(self.led_slow_blinking),
-                self.channels_to_byte(self.led_fast_blinking),
-            ]
-        )
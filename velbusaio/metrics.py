@@ -0,0 +1,238 @@
+"""
+Prometheus metrics endpoint
+
+Velbus.start_metrics_server serves the counters of the controller on
+http://127.0.0.1:9420/metrics in the Prometheus text format, with asyncio
+and nothing else. A scrape reads the counters the components keep anyway,
+nothing is collected in between. The metric headers are fixed text and the
+line of a module is only formatted again when the module sent a frame since
+the last scrape.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from velbusaio.const import METRICS_PORT
+from velbusaio.stats import Histogram
+
+if TYPE_CHECKING:
+    from velbusaio.controller import Velbus
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# seconds a client gets to send its request
+REQUEST_TIMEOUT = 5
+
+# name => (type, help)
+METRICS = {
+    "velbus_up": ("gauge", "1 when connected to the bus"),
+    "velbus_reconnects_total": ("counter", "Reconnects after a lost connection"),
+    "velbus_queue_depth": ("gauge", "Messages waiting to be sent"),
+    "velbus_frames_total": ("counter", "Frames received and sent"),
+    "velbus_bytes_total": ("counter", "Bytes received and sent"),
+    "velbus_bus_occupancy_ratio": (
+        "gauge",
+        "Estimated share of the bus capacity in use, last 10 seconds",
+    ),
+    "velbus_parse_errors_total": ("counter", "Received data the parser threw away"),
+    "velbus_discarded_bytes_total": ("counter", "Bytes the parser threw away"),
+    "velbus_frames_decoded_total": ("counter", "Received frames that were decoded"),
+    "velbus_frames_skipped_total": (
+        "counter",
+        "Received frames that were not decoded",
+    ),
+    "velbus_requests_pending": ("gauge", "Requests waiting for their answer"),
+    "velbus_requests_answered_total": ("counter", "Answered requests"),
+    "velbus_request_timeouts_total": ("counter", "Requests without an answer"),
+    "velbus_request_rtt_seconds": (
+        "histogram",
+        "Time from sending a request to its answer",
+    ),
+    "velbus_commands_confirmed_total": ("counter", "Commands a module confirmed"),
+    "velbus_commands_failed_total": ("counter", "Commands a module never confirmed"),
+    "velbus_command_retries_total": ("counter", "Commands sent again"),
+    "velbus_scan_address": ("gauge", "Last address the scan asked for"),
+    "velbus_scan_complete": ("gauge", "1 when the scan is done"),
+    "velbus_modules": ("gauge", "Modules found"),
+    "velbus_cache_writes_total": ("counter", "Module cache records written"),
+    "velbus_cache_flushes_total": ("counter", "Module cache flushes"),
+    "velbus_cache_pending": ("gauge", "Module cache records waiting for a flush"),
+    "velbus_cache_flush_seconds_max": ("gauge", "Slowest module cache flush"),
+    "velbus_module_last_seen_timestamp_seconds": (
+        "gauge",
+        "Unix time of the last frame from a module",
+    ),
+}
+HEADERS = {
+    name: f"# HELP {name} {text}\n# TYPE {name} {kind}\n"
+    for name, (kind, text) in METRICS.items()
+}
+
+
+def _value(value: float | None) -> str:
+    if value is None:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsExporter:
+    """
+    Render the counters of a controller, and serve them over http
+    """
+
+    def __init__(self, velbus: Velbus) -> None:
+        self._log = logging.getLogger("velbus-metrics")
+        self._velbus = velbus
+        # address => (last seen, rendered line)
+        self._module_lines: dict[int, tuple[float, str]] = {}
+        self._server: asyncio.AbstractServer | None = None
+        self.scrapes = 0
+
+    def _sample(self, out: list[str], name: str, value, labels: str = "") -> None:
+        out.append(f"{name}{labels} {_value(value)}\n")
+
+    def _histogram(self, out: list[str], name: str, histogram: Histogram) -> None:
+        out.append(HEADERS[name])
+        for bound, count in histogram.buckets():
+            out.append(f'{name}_bucket{{le="{_value(bound)}"}} {count}\n')
+        out.append(f"{name}_sum {_value(histogram.sum)}\n")
+        out.append(f"{name}_count {histogram.count}\n")
+
+    def _modules(self, out: list[str]) -> None:
+        name = "velbus_module_last_seen_timestamp_seconds"
+        out.append(HEADERS[name])
+        lines = self._module_lines
+        for address, module in self._velbus.get_modules().items():
+            if address != module.get_addresses()[0]:
+                # a sub address of a module that is already listed
+                continue
+            seen = module.get_last_seen()
+            if seen is None:
+                continue
+            cached = lines.get(address)
+            if cached is None or cached[0] != seen:
+                cached = lines[address] = (
+                    seen,
+                    f'{name}{{address="{address}",type="{module.get_type_name()}"}}'
+                    f" {_value(seen)}\n",
+                )
+            out.append(cached[1])
+
+    def render(self) -> str:
+        velbus = self._velbus
+        protocol = velbus._protocol
+        out: list[str] = []
+
+        def metric(name: str, value, labels: str = "") -> None:
+            out.append(HEADERS[name])
+            self._sample(out, name, value, labels)
+
+        metric("velbus_up", int(protocol.transport is not None))
+        metric("velbus_reconnects_total", velbus._reconnects)
+
+        out.append(HEADERS["velbus_queue_depth"])
+        for queue, depth in protocol.queue_depths().items():
+            self._sample(out, "velbus_queue_depth", depth, f'{{queue="{queue}"}}')
+
+        totals = protocol.traffic.totals()
+        for name, key in (
+            ("velbus_frames_total", "frames"),
+            ("velbus_bytes_total", "bytes"),
+        ):
+            out.append(HEADERS[name])
+            for direction, counts in totals.items():
+                self._sample(out, name, counts[key], f'{{direction="{direction}"}}')
+        metric("velbus_bus_occupancy_ratio", protocol.traffic.occupancy(10))
+
+        errors = protocol.parse_errors()
+        metric("velbus_parse_errors_total", errors["errors"])
+        metric("velbus_discarded_bytes_total", errors["discarded_bytes"])
+        decoded = velbus._handler.decode_counters()
+        metric("velbus_frames_decoded_total", decoded["decoded"])
+        metric("velbus_frames_skipped_total", decoded["skipped"])
+
+        requests = velbus._requests
+        stats = requests.stats()
+        metric("velbus_requests_pending", stats["pending"])
+        metric("velbus_requests_answered_total", stats["answered"])
+        metric("velbus_request_timeouts_total", stats["timeouts"])
+        self._histogram(out, "velbus_request_rtt_seconds", requests.rtt)
+
+        confirms = velbus.confirm_stats()
+        for name, key in (
+            ("velbus_commands_confirmed_total", "confirmed"),
+            ("velbus_commands_failed_total", "failed"),
+            ("velbus_command_retries_total", "retries"),
+        ):
+            out.append(HEADERS[name])
+            for address, counts in confirms.items():
+                self._sample(out, name, counts[key], f'{{address="{address}"}}')
+
+        scan = velbus._handler.scan_progress()
+        metric("velbus_scan_address", scan["address"])
+        metric("velbus_scan_complete", int(scan["complete"]))
+        metric(
+            "velbus_modules",
+            len({id(module) for module in velbus.get_modules().values()}),
+        )
+
+        cache = velbus.cache_stats()
+        metric("velbus_cache_writes_total", cache["writes"])
+        metric("velbus_cache_flushes_total", cache["flushes"])
+        metric("velbus_cache_pending", cache["pending"])
+        metric("velbus_cache_flush_seconds_max", cache["max_flush_latency"])
+
+        self._modules(out)
+        self.scrapes += 1
+        return "".join(out)
+
+    async def start(self, host: str = "127.0.0.1", port: int = METRICS_PORT) -> None:
+        await self.stop()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._log.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def sockets(self) -> list:
+        return list(self._server.sockets) if self._server is not None else []
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            # the headers do not matter
+            while True:
+                line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request.split()
+            method = parts[0] if parts else b""
+            path = parts[1].split(b"?")[0] if len(parts) > 1 else b""
+            if method not in (b"GET", b"HEAD"):
+                status, body = "405 Method Not Allowed", b""
+            elif path != b"/metrics":
+                status, body = "404 Not Found", b""
+            else:
+                status, body = "200 OK", self.render().encode("utf-8")
+            writer.write(
+                f"HTTP/1.0 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("ascii")
+            )
+            if method == b"GET":
+                writer.write(body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as err:
+            self._log.debug(f"Metrics request failed: {err!r}")
+        finally:
+            writer.close()
@@ -5,29 +5,12 @@ This represents a velbus module
 from __future__ import annotations
 
 import logging
-import pathlib
-import struct
-import sys
-import json
 import os
-from typing import Awaitable, Callable
-
-from velbusaio.channels import (
-    Blind,
-    Button,
-    ButtonCounter,
-    Channel,
-    Dimmer,
-    EdgeLit,
-    LightSensor,
-    Memo,
-    Relay,
-    SelectedProgram,
-    Sensor,
-    SensorNumber,
-    Temperature,
-    ThermostatChannel,
-)
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable
+
+from velbusaio.channels import Button, ButtonCounter, Channel, Dimmer
+from velbusaio.channels import Temperature as TemperatureChannelType
 from velbusaio.command_registry import commandRegistry
 from velbusaio.const import (
     CHANNEL_LIGHT_VALUE,
@@ -35,62 +18,42 @@ from velbusaio.const import (
     CHANNEL_SELECTED_PROGRAM,
     PRIORITY_LOW,
 )
-from velbusaio.helpers import handle_match, keys_exists
+from velbusaio.descriptor import get_descriptor
+from velbusaio.exceptions import VelbusException
+from velbusaio.helpers import handle_match
 from velbusaio.message import Message
-from velbusaio.messages.dali_device_settings import DaliDeviceSettingMsg
-from velbusaio.messages.blind_status import BlindStatusMessage, BlindStatusNgMessage
-from velbusaio.messages.channel_name_part1 import (
-    ChannelNamePart1Message,
-    ChannelNamePart1Message2,
-    ChannelNamePart1Message3,
-)
-from velbusaio.messages.channel_name_part2 import (
-    ChannelNamePart2Message,
-    ChannelNamePart2Message2,
-    ChannelNamePart2Message3,
-)
-from velbusaio.messages.channel_name_part3 import (
-    ChannelNamePart3Message,
-    ChannelNamePart3Message2,
-    ChannelNamePart3Message3,
-)
-from velbusaio.messages.channel_name_request import (
-    COMMAND_CODE as CHANNEL_NAME_REQUEST_COMMAND_CODE,
-)
-from velbusaio.messages.channel_name_request import ChannelNameRequestMessage
-from velbusaio.messages.clear_led import ClearLedMessage
-from velbusaio.messages.counter_status import CounterStatusMessage
-from velbusaio.messages.counter_status_request import CounterStatusRequestMessage
-from velbusaio.messages.dali_device_settings import DeviceType as DaliDeviceType
-from velbusaio.messages.dali_device_settings import DeviceTypeMsg as DaliDeviceTypeMsg
-from velbusaio.messages.dali_device_settings import MemberOfGroupMsg
-from velbusaio.messages.dali_device_settings_request import (
-    COMMAND_CODE as DALI_DEVICE_SETTINGS_REQUEST_COMMAND_CODE,
-)
-from velbusaio.messages.dali_device_settings_request import DaliDeviceSettingsRequest
-from velbusaio.messages.dali_dim_value_status import DimValueStatus
-from velbusaio.messages.dimmer_channel_status import DimmerChannelStatusMessage
-from velbusaio.messages.dimmer_status import DimmerStatusMessage
-from velbusaio.messages.fast_blinking_led import FastBlinkingLedMessage
-from velbusaio.messages.memory_data import MemoryDataMessage
-from velbusaio.messages.raw import MeteoRawMessage, SensorRawMessage
-from velbusaio.messages.module_status import (
-    ModuleStatusGP4PirMessage,
-    ModuleStatusMessage,
-    ModuleStatusMessage2,
-    ModuleStatusPirMessage,
-)
-from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
-from velbusaio.messages.push_button_status import PushButtonStatusMessage
-from velbusaio.messages.read_data_from_memory import ReadDataFromMemoryMessage
-from velbusaio.messages.relay_status import RelayStatusMessage, RelayStatusMessage2
-from velbusaio.messages.sensor_temperature import SensorTemperatureMessage
-from velbusaio.messages.set_led import SetLedMessage
-from velbusaio.messages.slider_status import SliderStatusMessage
-from velbusaio.messages.slow_blinking_led import SlowBlinkingLedMessage
-from velbusaio.messages.temp_sensor_status import TempSensorStatusMessage
-from velbusaio.messages.update_led_status import UpdateLedStatusMessage
-from velbusaio.channels import Temperature as TemperatureChannelType
+from velbusaio.press import PressScheduler
+
+if TYPE_CHECKING:
+    from velbusaio.cache import ModuleCache
+    from velbusaio.confirm import CommandConfirmer
+    from velbusaio.messages.blind_status import BlindStatusMessage, BlindStatusNgMessage
+    from velbusaio.messages.clear_led import ClearLedMessage
+    from velbusaio.messages.counter_status import CounterStatusMessage
+    from velbusaio.messages.dali_device_settings import DaliDeviceSettingMsg
+    from velbusaio.messages.dali_device_settings_request import (
+        DaliDeviceSettingsRequest,
+    )
+    from velbusaio.messages.dali_dim_value_status import DimValueStatus
+    from velbusaio.messages.dimmer_channel_status import DimmerChannelStatusMessage
+    from velbusaio.messages.fast_blinking_led import FastBlinkingLedMessage
+    from velbusaio.messages.memory_data import MemoryDataMessage
+    from velbusaio.messages.module_status import (
+        ModuleStatusGP4PirMessage,
+        ModuleStatusMessage,
+        ModuleStatusMessage2,
+        ModuleStatusPirMessage,
+    )
+    from velbusaio.messages.push_button_status import PushButtonStatusMessage
+    from velbusaio.messages.raw import MeteoRawMessage, SensorRawMessage
+    from velbusaio.messages.relay_status import RelayStatusMessage
+    from velbusaio.messages.sensor_temperature import SensorTemperatureMessage
+    from velbusaio.messages.set_led import SetLedMessage
+    from velbusaio.messages.slider_status import SliderStatusMessage
+    from velbusaio.messages.slow_blinking_led import SlowBlinkingLedMessage
+    from velbusaio.messages.temp_sensor_status import TempSensorStatusMessage
+    from velbusaio.messages.update_led_status import UpdateLedStatusMessage
+    from velbusaio.stats import StageMetrics
 
 
 class Module:
@@ -108,7 +71,6 @@ class Module:
         memorymap: int | None = None,
         build_year: int | None = None,
         build_week: int | None = None,
-        cache_dir: str | None = None,
     ) -> Module:
         if module_type == 0x45 or module_type == 0x5A:
             return VmbDali(
@@ -119,7 +81,6 @@ class Module:
                 memorymap,
                 build_year,
                 build_week,
-                cache_dir,
             )
 
         return Module(
@@ -130,7 +91,6 @@ class Module:
             memorymap,
             build_year,
             build_week,
-            cache_dir,
         )
 
     def __init__(
@@ -142,11 +102,11 @@ class Module:
         memorymap: int | None = None,
         build_year: int | None = None,
         build_week: int | None = None,
-        cache_dir: str | None = None,
     ) -> None:
         self._address = module_address
         self._type = module_type
         self._data = module_data
+        self._descriptor = get_descriptor(module_type, module_data)
 
         self._name = {}
         self._sub_address = {}
@@ -154,14 +114,34 @@ class Module:
         self.memory_map_version = memorymap
         self.build_year = build_year
         self.build_week = build_week
-        self._cache_dir = cache_dir
         self._is_loading = False
         self._channels = {}
         self.loaded = False
-
-    def initialize(self, writer: Callable[[Message], Awaitable[None]]) -> None:
+        self._module_cache: ModuleCache | None = None
+        self._confirmer: CommandConfirmer | None = None
+        # seconds an optimistic channel state waits for the bus, None is off
+        self._optimistic_timeout: float | None = None
+        self._presser: PressScheduler | None = None
+        self._metrics: StageMetrics | None = None
+        # wall clock time of the last frame from the module
+        self._last_seen: float | None = None
+
+    def initialize(
+        self,
+        writer: Callable[[Message], Awaitable[None]],
+        cache: ModuleCache | None = None,
+        confirmer: CommandConfirmer | None = None,
+        optimistic_timeout: float | None = None,
+        presser: PressScheduler | None = None,
+        metrics: StageMetrics | None = None,
+    ) -> None:
         self._log = logging.getLogger("velbus-module")
         self._writer = writer
+        self._module_cache = cache
+        self._confirmer = confirmer
+        self._optimistic_timeout = optimistic_timeout
+        self._presser = presser
+        self._metrics = metrics
         for chan in self._channels.values():
             chan._writer = writer
 
@@ -186,17 +166,49 @@ class Module:
                         del self._channels[i]
 
     def _cache(self) -> None:
-        cfile = pathlib.Path(f"{self._cache_dir}/{self._address}.json")
-        with cfile.open("w") as fl:
-            json.dump(self.to_cache(), fl, indent=4)
+        if self._module_cache is not None:
+            self._module_cache.mark_dirty(self)
+
+    def _record_state(self, channel: int, key: str, value) -> None:
+        if self._module_cache is not None:
+            self._module_cache.record_state(self._address, channel, key, value)
+
+    def get_presser(self) -> PressScheduler:
+        """
+        The scheduler of the button presses, shared by all modules of a
+        controller
+        """
+        if self._presser is None:
+            self._presser = PressScheduler(self._writer)
+        return self._presser
+
+    async def send_confirmed(
+        self,
+        msg: Message,
+        expect: Iterable[int],
+        match: Callable[[Message], bool] | None = None,
+    ) -> Message:
+        """
+        Send msg and wait for one of the expected status messages
+        """
+        if self._confirmer is None:
+            raise VelbusException("Confirmed commands need a connected controller")
+        return await self._confirmer.send(msg, expect, match)
 
     def __getstate__(self) -> dict:
         d = self.__dict__
-        self_dict = {k: d[k] for k in d if k != "_writer" and k != "_log"}
+        self_dict = {
+            k: d[k]
+            for k in d
+            if k not in ("_writer", "_log", "_module_cache", "_confirmer", "_presser")
+        }
         return self_dict
 
     def __setstate__(self, state: dict) -> None:
         self.__dict__ = state
+        self._module_cache = None
+        self._confirmer = None
+        self._presser = None
 
     def __repr__(self) -> str:
         return f"<{self._name} type:{self._type} address:{self._address} loaded:{self.loaded} loading:{self._is_loading} channels: {self._channels}>"
@@ -204,8 +216,25 @@ class Module:
     def __str__(self) -> str:
         return self.__repr__()
 
+    def get_identity(self) -> dict:
+        """
+        What the module type message told about this module
+        """
+        return {
+            "type": self._type,
+            "serial": self.serial,
+            "memorymap": self.memory_map_version,
+            "build_year": self.build_year,
+            "build_week": self.build_week,
+        }
+
     def to_cache(self) -> dict:
-        d = {"name": self._name, "channels": {}}
+        d = {
+            "name": self._name,
+            **self.get_identity(),
+            "sub_addresses": dict(self._sub_address),
+            "channels": {},
+        }
         for num, chan in self._channels.items():
             d["channels"][num] = chan.to_cache()
         return d
@@ -227,9 +256,19 @@ class Module:
         return self._type
 
     def get_type_name(self) -> str:
-        if "Type" in self._data:
-            return self._data["Type"]
-        return "UNKNOWN"
+        return self._descriptor.type_name
+
+    def mark_seen(self) -> None:
+        """
+        A frame from the module was received
+        """
+        self._last_seen = time()
+
+    def get_last_seen(self) -> float | None:
+        """
+        Get the time of the last frame from the module, None if none yet
+        """
+        return self._last_seen
 
     def get_serial(self) -> str | None:
         return self.serial
@@ -249,270 +288,331 @@ class Module:
                     break
         return _channel_offset
 
+    # message class name => handler method
+    # subclasses of these messages are handled by the same method
+    _MESSAGE_HANDLERS: dict[str, str] = {
+        "ChannelNamePart1Message": "_on_channel_name_part1",
+        "ChannelNamePart2Message": "_on_channel_name_part2",
+        "ChannelNamePart3Message": "_on_channel_name_part3",
+        "MemoryDataMessage": "_process_memory_data_message",
+        "RelayStatusMessage": "_on_relay_status",
+        "SensorTemperatureMessage": "_on_sensor_temperature",
+        "TempSensorStatusMessage": "_on_temp_sensor_status",
+        "PushButtonStatusMessage": "_on_push_button_status",
+        "ModuleStatusMessage": "_on_module_status",
+        "ModuleStatusMessage2": "_on_module_status2",
+        "CounterStatusMessage": "_on_counter_status",
+        "ModuleStatusPirMessage": "_on_module_status_pir",
+        "ModuleStatusGP4PirMessage": "_on_module_status_gp4pir",
+        "UpdateLedStatusMessage": "_on_update_led_status",
+        "SetLedMessage": "_on_set_led",
+        "ClearLedMessage": "_on_clear_led",
+        "SlowBlinkingLedMessage": "_on_slow_blinking_led",
+        "FastBlinkingLedMessage": "_on_fast_blinking_led",
+        "DimmerChannelStatusMessage": "_on_dimmer_status",
+        "DimmerStatusMessage": "_on_dimmer_status",
+        "SliderStatusMessage": "_on_slider_status",
+        "BlindStatusNgMessage": "_on_blind_status_ng",
+        "BlindStatusMessage": "_on_blind_status",
+        "MeteoRawMessage": "_on_meteo_raw",
+        "SensorRawMessage": "_on_sensor_raw",
+    }
+    _handler_cache: dict[tuple[type, type], Callable | None] = {}
+    # handlers that only update the channel in the channel byte of the
+    # message => whether that channel number is translated first
+    _CHANNEL_HANDLERS: dict[str, bool] = {
+        "_on_relay_status": False,
+        "_on_dimmer_status": True,
+        "_on_slider_status": True,
+        "_on_blind_status_ng": True,
+        "_on_blind_status": True,
+    }
+
+    @classmethod
+    def _message_handler(cls, msg_class: type) -> Callable | None:
+        """
+        Find the handler for a message class
+        """
+        try:
+            return cls._handler_cache[(cls, msg_class)]
+        except KeyError:
+            pass
+        handler = None
+        for klass in msg_class.__mro__:
+            if klass.__name__ in cls._MESSAGE_HANDLERS:
+                handler = getattr(cls, cls._MESSAGE_HANDLERS[klass.__name__])
+                break
+        cls._handler_cache[(cls, msg_class)] = handler
+        return handler
+
+    def handles(self, msg_class: type[Message], data: bytes) -> bool:
+        """
+        Check if on_message would use a message of msg_class with this data
+
+        Frames for a channel the module does not have are not used.
+        """
+        if type(self).on_message is not Module.on_message:
+            # the subclass decides for itself
+            return True
+        handler = self._message_handler(msg_class)
+        if handler is None:
+            return False
+        translate = self._CHANNEL_HANDLERS.get(handler.__name__)
+        spec = msg_class._layout
+        if translate is None or spec is None:
+            return True
+        channel = spec.channel(data)
+        if channel is None:
+            return True
+        if translate:
+            channel = self._translate_channel_name(channel)
+        return channel in self._channels
+
+    def reply_channel(self, message: Message) -> int | None:
+        """
+        The channel a status message updates, numbered like the message
+        handlers do, None if it does not update a single channel
+        """
+        handler = self._message_handler(type(message))
+        if handler is None:
+            return None
+        translate = self._CHANNEL_HANDLERS.get(handler.__name__)
+        if translate is None:
+            return None
+        if translate:
+            return self._translate_channel_name(message.channel)
+        return message.channel
+
     async def on_message(self, message: Message) -> None:
         """
         Process received message
         """
-        self._log.debug(f"RX: {message}")
-        _channel_offset = self.calc_channel_offset(message.address)
+        # formatting a message is a json dump, only do it when it is logged
+        self._log.debug("RX: %s", message)
+        start = perf_counter() if self._metrics is not None else 0.0
+        handler = self._message_handler(type(message))
+        if handler is not None:
+            await handler(self, message)
+        if self._metrics is not None:
+            self._metrics.observe("dispatch", perf_counter() - start)
+
+    async def _on_channel_name_part1(self, message: Message) -> None:
+        self._process_channel_name_message(1, message)
+        self._cache()
 
-        if isinstance(
-            message,
-            (
-                ChannelNamePart1Message,
-                ChannelNamePart1Message2,
-                ChannelNamePart1Message3,
-            ),
-        ):
-            self._process_channel_name_message(1, message)
-            self._cache()
-        elif isinstance(
-            message,
-            (
-                ChannelNamePart2Message,
-                ChannelNamePart2Message2,
-                ChannelNamePart2Message3,
-            ),
-        ):
-            self._process_channel_name_message(2, message)
-            self._cache()
-        elif isinstance(
-            message,
-            (
-                ChannelNamePart3Message,
-                ChannelNamePart3Message2,
-                ChannelNamePart3Message3,
-            ),
-        ):
-            self._process_channel_name_message(3, message)
-            self._cache()
-        elif isinstance(message, MemoryDataMessage):
-            await self._process_memory_data_message(message)
-        elif isinstance(message, (RelayStatusMessage, RelayStatusMessage2)):
-            await self._update_channel(
-                message.channel,
-                {
-                    "on": message.is_on(),
-                    "inhibit": message.is_inhibited(),
-                    "forced_on": message.is_forced_on(),
-                    "disabled": message.is_disabled(),
-                },
-            )
-        elif isinstance(message, SensorTemperatureMessage):
-            chan = self._translate_channel_name(self._data["TemperatureChannel"])
-            await self._channels[chan].maybe_update_temperature(
-                message.getCurTemp(), 1 / 64
-            )
+    async def _on_channel_name_part2(self, message: Message) -> None:
+        self._process_channel_name_message(2, message)
+        self._cache()
+
+    async def _on_channel_name_part3(self, message: Message) -> None:
+        self._process_channel_name_message(3, message)
+        self._cache()
+
+    async def _on_relay_status(self, message: RelayStatusMessage) -> None:
+        await self._update_channel(
+            message.channel,
+            {
+                "on": message.is_on(),
+                "inhibit": message.is_inhibited(),
+                "forced_on": message.is_forced_on(),
+                "disabled": message.is_disabled(),
+            },
+        )
+
+    async def _on_sensor_temperature(self, message: SensorTemperatureMessage) -> None:
+        chan = self._descriptor.temperature_channel
+        await self._channels[chan].maybe_update_temperature(
+            message.getCurTemp(), 1 / 64
+        )
+        await self._update_channel(
+            chan,
+            {
+                "min": message.getMinTemp(),
+                "max": message.getMaxTemp(),
+            },
+        )
+
+    async def _on_temp_sensor_status(self, message: TempSensorStatusMessage) -> None:
+        # update the current temp
+        chan = self._descriptor.temperature_channel
+        if chan in self._channels:
             await self._update_channel(
                 chan,
                 {
-                    "min": message.getMinTemp(),
-                    "max": message.getMaxTemp(),
+                    "target": message.target_temp,
+                    "cmode": message.mode_str,
+                    "cstatus": message.status_str,
+                    "sleep_timer": message.sleep_timer,
+                    "cool_mode": message.cool_mode,
                 },
             )
-        elif isinstance(message, TempSensorStatusMessage):
-            # update the current temp
-            chan = self._translate_channel_name(self._data["TemperatureChannel"])
-            if chan in self._channels:
-                await self._update_channel(
-                    chan,
-                    {
-                        "target": message.target_temp,
-                        "cmode": message.mode_str,
-                        "cstatus": message.status_str,
-                        "sleep_timer": message.sleep_timer,
-                        "cool_mode": message.cool_mode,
-                    },
-                )
-                await self._channels[chan].maybe_update_temperature(
-                    message.current_temp, 1 / 2
-                )
-            # update the thermostat channels
-            channel_name_to_msg_prop_map = {
-                "Heater": "heater",
-                "Boost": "boost",
-                "Pump": "pump",
-                "Cooler": "cooler",
-                "Alarm 1": "alarm1",
-                "Alarm 2": "alarm2",
-                "Alarm 3": "alarm3",
-                "Alarm 4": "alarm4",
-            }
-            for channel_str in self._data["Channels"]:
-                if keys_exists(self._data, "Channels", channel_str, "Type"):
-                    if (
-                        self._data["Channels"][channel_str]["Type"]
-                        == "ThermostatChannel"
-                    ):
-                        channel = self._translate_channel_name(channel_str)
-                        channel_name = self._data["Channels"][channel_str]["Name"]
-                        if channel in self._channels:
-                            await self._update_channel(
-                                channel,
-                                {
-                                    "closed": getattr(
-                                        message,
-                                        channel_name_to_msg_prop_map[channel_name],
-                                    )
-                                },
-                            )
-        elif isinstance(message, PushButtonStatusMessage):
-            _update_buttons = False
-            for channel_types in self._data["Channels"]:
-                if keys_exists(self._data, "Channels", channel_types, "Type"):
-                    if (
-                        self._data["Channels"][channel_types]["Type"] == "Button"
-                        or self._data["Channels"][channel_types]["Type"] == "Sensor"
-                        or self._data["Channels"][channel_types]["Type"]
-                        == "ButtonCounter"
-                    ):
-                        _update_buttons = True
-                        break
-            if _update_buttons:
-                for channel_id in range(1, 9):
-                    channel = self._translate_channel_name(channel_id + _channel_offset)
-                    if channel_id in message.closed:
-                        await self._update_channel(channel, {"closed": True})
-                    if channel_id in message.closed_long:
-                        await self._update_channel(channel, {"long": True})
-                    if channel_id in message.opened:
-                        await self._update_channel(
-                            channel, {"closed": False, "long": False}
-                        )
-        elif isinstance(message, (ModuleStatusMessage)):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.closed:
-                    await self._update_channel(channel, {"closed": True})
-                elif channel in self._channels and isinstance(
-                    self._channels[channel], (Button, ButtonCounter)
-                ):
-                    await self._update_channel(channel, {"closed": False})
-        elif isinstance(message, (ModuleStatusMessage2)):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.closed:
-                    await self._update_channel(channel, {"closed": True})
-                elif isinstance(self._channels[channel], (Button, ButtonCounter)):
-                    await self._update_channel(channel, {"closed": False})
-                if channel_id in message.enabled:
-                    await self._update_channel(channel, {"enabled": True})
-                elif channel in self._channels and isinstance(
-                    self._channels[channel], (Button, ButtonCounter)
-                ):
-                    await self._update_channel(channel, {"enabled": False})
-            # self.selected_program_str = message.selected_program_str
-            await self._update_channel(
-                CHANNEL_SELECTED_PROGRAM,
-                {"selected_program_str": message.selected_program_str},
-            )
-        elif isinstance(message, CounterStatusMessage) and isinstance(
-            self._channels[message.channel], ButtonCounter
-        ):
-            channel = self._translate_channel_name(message.channel)
-            await self._update_channel(
-                channel,
-                {
-                    "pulses": message.pulses,
-                    "counter": message.counter,
-                    "delay": message.delay,
-                },
-            )
-        elif isinstance(message, ModuleStatusPirMessage):
-            await self._update_channel(
-                CHANNEL_LIGHT_VALUE, {"cur": message.light_value}
-            )
-            await self._update_channel(1, {"closed": message.dark})
-            await self._update_channel(2, {"closed": message.light})
-            await self._update_channel(3, {"closed": message.motion1})
-            await self._update_channel(4, {"closed": message.light_motion1})
-            await self._update_channel(5, {"closed": message.motion2})
-            await self._update_channel(6, {"closed": message.light_motion2})
-            if 7 in self._channels:
-                await self._update_channel(7, {"closed": message.low_temp_alarm})
-            if 8 in self._channels:
-                await self._update_channel(8, {"closed": message.high_temp_alarm})
-            # self.selected_program_str = message.selected_program_str
-            await self._update_channel(
-                CHANNEL_SELECTED_PROGRAM,
-                {"selected_program_str": message.selected_program_str},
+            await self._channels[chan].maybe_update_temperature(
+                message.current_temp, 1 / 2
             )
-        elif isinstance(message, ModuleStatusGP4PirMessage):
+        # update the thermostat channels
+        for channel, prop in self._descriptor.thermostat_channels:
+            if channel in self._channels:
+                await self._update_channel(channel, {"closed": getattr(message, prop)})
+
+    async def _on_push_button_status(self, message: PushButtonStatusMessage) -> None:
+        if not self._descriptor.has_buttons:
+            return
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel_id in range(1, 9):
+            channel = self._translate_channel_name(channel_id + _channel_offset)
+            if channel_id in message.closed:
+                await self._update_channel(channel, {"closed": True})
+            if channel_id in message.closed_long:
+                await self._update_channel(channel, {"long": True})
+            if channel_id in message.opened:
+                await self._update_channel(channel, {"closed": False, "long": False})
+
+    async def _on_module_status(self, message: ModuleStatusMessage) -> None:
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel_id in range(1, 9):
+            channel = self._translate_channel_name(channel_id + _channel_offset)
+            if channel_id in message.closed:
+                await self._update_channel(channel, {"closed": True})
+            elif channel in self._channels and isinstance(
+                self._channels[channel], (Button, ButtonCounter)
+            ):
+                await self._update_channel(channel, {"closed": False})
+
+    async def _on_module_status2(self, message: ModuleStatusMessage2) -> None:
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel_id in range(1, 9):
+            channel = self._translate_channel_name(channel_id + _channel_offset)
+            if channel_id in message.closed:
+                await self._update_channel(channel, {"closed": True})
+            elif isinstance(self._channels[channel], (Button, ButtonCounter)):
+                await self._update_channel(channel, {"closed": False})
+            if channel_id in message.enabled:
+                await self._update_channel(channel, {"enabled": True})
+            elif channel in self._channels and isinstance(
+                self._channels[channel], (Button, ButtonCounter)
+            ):
+                await self._update_channel(channel, {"enabled": False})
+        # self.selected_program_str = message.selected_program_str
+        await self._update_channel(
+            CHANNEL_SELECTED_PROGRAM,
+            {"selected_program_str": message.selected_program_str},
+        )
+
+    async def _on_counter_status(self, message: CounterStatusMessage) -> None:
+        if not isinstance(self._channels[message.channel], ButtonCounter):
+            return
+        channel = self._translate_channel_name(message.channel)
+        await self._update_channel(
+            channel,
+            {
+                "pulses": message.pulses,
+                "counter": message.counter,
+                "delay": message.delay,
+            },
+        )
+
+    async def _on_module_status_pir(self, message: ModuleStatusPirMessage) -> None:
+        await self._update_channel(CHANNEL_LIGHT_VALUE, {"cur": message.light_value})
+        await self._update_channel(1, {"closed": message.dark})
+        await self._update_channel(2, {"closed": message.light})
+        await self._update_channel(3, {"closed": message.motion1})
+        await self._update_channel(4, {"closed": message.light_motion1})
+        await self._update_channel(5, {"closed": message.motion2})
+        await self._update_channel(6, {"closed": message.light_motion2})
+        if 7 in self._channels:
+            await self._update_channel(7, {"closed": message.low_temp_alarm})
+        if 8 in self._channels:
+            await self._update_channel(8, {"closed": message.high_temp_alarm})
+        # self.selected_program_str = message.selected_program_str
+        await self._update_channel(
+            CHANNEL_SELECTED_PROGRAM,
+            {"selected_program_str": message.selected_program_str},
+        )
+
+    async def _on_module_status_gp4pir(
+        self, message: ModuleStatusGP4PirMessage
+    ) -> None:
+        await self._update_channel(CHANNEL_LIGHT_VALUE, {"cur": message.light_value})
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel_id in range(1, 9):
+            channel = self._translate_channel_name(channel_id + _channel_offset)
             await self._update_channel(
-                CHANNEL_LIGHT_VALUE, {"cur": message.light_value}
+                channel, {"closed": channel_id in message.closed}
             )
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
+            if type(self._channels[channel]) is Button:
+                # only treat 'enabled' if the channel is a Button
                 await self._update_channel(
-                    channel, {"closed": channel_id in message.closed}
+                    channel, {"enabled": channel_id in message.enabled}
                 )
-                if type(self._channels[channel]) is Button:
-                    # only treat 'enabled' if the channel is a Button
-                    await self._update_channel(
-                        channel, {"enabled": channel_id in message.enabled}
-                    )
-            # self.selected_program_str = message.selected_program_str
-            await self._update_channel(
-                CHANNEL_SELECTED_PROGRAM,
-                {"selected_program_str": message.selected_program_str},
-            )
-        elif isinstance(message, UpdateLedStatusMessage):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.led_slow_blinking:
-                    await self._update_channel(channel, {"led_state": "slow"})
-                if channel_id in message.led_fast_blinking:
-                    await self._update_channel(channel, {"led_state": "fast"})
-                if channel_id in message.led_on:
-                    await self._update_channel(channel, {"led_state": "on"})
-                if (
-                    channel_id not in message.led_slow_blinking
-                    and channel_id not in message.led_fast_blinking
-                    and channel_id not in message.led_on
-                ):
-                    await self._update_channel(channel, {"led_state": "off"})
-        elif isinstance(message, SetLedMessage):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.leds:
-                    await self._update_channel(channel, {"led_state": "on"})
-        elif isinstance(message, ClearLedMessage):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.leds:
-                    await self._update_channel(channel, {"led_state": "off"})
-        elif isinstance(message, SlowBlinkingLedMessage):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.leds:
-                    await self._update_channel(channel, {"led_state": "slow"})
-        elif isinstance(message, FastBlinkingLedMessage):
-            for channel_id in range(1, 9):
-                channel = self._translate_channel_name(channel_id + _channel_offset)
-                if channel_id in message.leds:
-                    await self._update_channel(channel, {"led_state": "fast"})
-        elif isinstance(message, (DimmerChannelStatusMessage, DimmerStatusMessage)):
-            channel = self._translate_channel_name(message.channel)
-            await self._update_channel(channel, {"state": message.cur_dimmer_state()})
-        elif isinstance(message, SliderStatusMessage):
-            channel = self._translate_channel_name(message.channel)
-            await self._update_channel(channel, {"state": message.cur_slider_state()})
-        elif isinstance(message, BlindStatusNgMessage):
-            channel = self._translate_channel_name(message.channel)
-            await self._update_channel(
-                channel, {"state": message.status, "position": message.position}
-            )
-        elif isinstance(message, BlindStatusMessage):
-            channel = self._translate_channel_name(message.channel)
-            await self._update_channel(channel, {"state": message.status})
-        elif isinstance(message, MeteoRawMessage):
-            await self._update_channel(11, {"cur": message.rain})
-            await self._update_channel(12, {"cur": message.light})
-            await self._update_channel(13, {"cur": message.wind})
-        elif isinstance(message, SensorRawMessage):
-            await self._update_channel(
-                message.sensor, {"cur": message.value, "unit": message.unit}
-            )
+        # self.selected_program_str = message.selected_program_str
+        await self._update_channel(
+            CHANNEL_SELECTED_PROGRAM,
+            {"selected_program_str": message.selected_program_str},
+        )
+
+    async def _on_update_led_status(self, message: UpdateLedStatusMessage) -> None:
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel_id in range(1, 9):
+            channel = self._translate_channel_name(channel_id + _channel_offset)
+            if channel_id in message.led_slow_blinking:
+                await self._update_channel(channel, {"led_state": "slow"})
+            if channel_id in message.led_fast_blinking:
+                await self._update_channel(channel, {"led_state": "fast"})
+            if channel_id in message.led_on:
+                await self._update_channel(channel, {"led_state": "on"})
+            if (
+                channel_id not in message.led_slow_blinking
+                and channel_id not in message.led_fast_blinking
+                and channel_id not in message.led_on
+            ):
+                await self._update_channel(channel, {"led_state": "off"})
+
+    async def _update_led_state(self, message: Message, state: str) -> None:
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel_id in range(1, 9):
+            channel = self._translate_channel_name(channel_id + _channel_offset)
+            if channel_id in message.leds:
+                await self._update_channel(channel, {"led_state": state})
+
+    async def _on_set_led(self, message: SetLedMessage) -> None:
+        await self._update_led_state(message, "on")
+
+    async def _on_clear_led(self, message: ClearLedMessage) -> None:
+        await self._update_led_state(message, "off")
+
+    async def _on_slow_blinking_led(self, message: SlowBlinkingLedMessage) -> None:
+        await self._update_led_state(message, "slow")
+
+    async def _on_fast_blinking_led(self, message: FastBlinkingLedMessage) -> None:
+        await self._update_led_state(message, "fast")
+
+    async def _on_dimmer_status(self, message: DimmerChannelStatusMessage) -> None:
+        channel = self._translate_channel_name(message.channel)
+        await self._update_channel(channel, {"state": message.cur_dimmer_state()})
+
+    async def _on_slider_status(self, message: SliderStatusMessage) -> None:
+        channel = self._translate_channel_name(message.channel)
+        await self._update_channel(channel, {"state": message.cur_slider_state()})
+
+    async def _on_blind_status_ng(self, message: BlindStatusNgMessage) -> None:
+        channel = self._translate_channel_name(message.channel)
+        await self._update_channel(
+            channel, {"state": message.status, "position": message.position}
+        )
+
+    async def _on_blind_status(self, message: BlindStatusMessage) -> None:
+        channel = self._translate_channel_name(message.channel)
+        await self._update_channel(channel, {"state": message.status})
+
+    async def _on_meteo_raw(self, message: MeteoRawMessage) -> None:
+        await self._update_channel(11, {"cur": message.rain})
+        await self._update_channel(12, {"cur": message.light})
+        await self._update_channel(13, {"cur": message.wind})
+
+    async def _on_sensor_raw(self, message: SensorRawMessage) -> None:
+        await self._update_channel(
+            message.sensor, {"cur": message.value, "unit": message.unit}
+        )
 
     async def _update_channel(self, channel: int, updates: dict):
         try:
@@ -532,12 +632,9 @@ class Module:
         # start the loading
         self._is_loading = True
         # see if we have a cache
-        try:
-            cfile = pathlib.Path(f"{self._cache_dir}/{self._address}.json")
-            with cfile.open("r") as fl:
-                cache = json.load(fl)
-        except OSError:
-            cache = {}
+        cache = {}
+        if self._module_cache is not None:
+            cache = self._module_cache.get(self._address) or {}
         # load default channels
         await self.__load_default_channels()
 
@@ -557,6 +654,14 @@ class Module:
                 self._channels[int(num)]._is_loaded = True
         else:
             await self._request_channel_name()
+        # the last known state comes from the journal
+        if self._module_cache is not None:
+            for num, state in self._module_cache.journal_state(self._address).items():
+                if num in self._channels:
+                    self._channels[num].restore_state(state)
+        # a cache without the identity, store it
+        if cache and cache.get("type") is None:
+            self._cache()
         # load the module specific stuff
         self._load()
         # stop the loading
@@ -585,14 +690,10 @@ class Module:
         await self._channels[CHANNEL_MEMO_TEXT].set(txt)
 
     async def _process_memory_data_message(self, message: MemoryDataMessage) -> None:
-        addr = "{high:02X}{low:02X}".format(
-            high=message.high_address, low=message.low_address
-        )
-        if "Memory" not in self._data:
-            return
-        if "Address" not in self._data["Memory"]:
+        addr = (message.high_address << 8) | message.low_address
+        mdata = self._descriptor.memory_map.get(addr)
+        if mdata is None:
             return
-        mdata = self._data["Memory"]["Address"][addr]
         if "ModuleName" in mdata and isinstance(self._name, dict):
             # if self._name is a dict we are still loading
             # if its a string it was already complete
@@ -629,17 +730,7 @@ class Module:
         self._channels[channel].set_name_part(part, message.name)
 
     def _translate_channel_name(self, channel: str) -> int:
-        if keys_exists(
-            self._data,
-            "ChannelNumbers",
-            "Name",
-            "Map",
-            f"{int(channel):02X}",
-        ):
-            return int(
-                self._data["ChannelNumbers"]["Name"]["Map"][f"{int(channel):02X}"]
-            )
-        return int(channel)
+        return self._descriptor.translate_channel(channel)
 
     def is_loaded(self) -> bool:
         """
@@ -664,27 +755,31 @@ class Module:
 
     async def _request_module_status(self) -> None:
         """Request current state of channels."""
-        if "Channels" not in self._data:
+        if not self._descriptor.channels:
             # some modules have no channels
             return
         self._log.info(f"Request module status {self._address}")
+        from velbusaio.messages.counter_status_request import (
+            CounterStatusRequestMessage,
+        )
+        from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
 
         mod_stat_req_msg = ModuleStatusRequestMessage(self._address)
-        counter_msg = None
-        for chan, chan_data in self._data["Channels"].items():
-            if int(chan) < 9 and chan_data["Type"] in ("Blind", "Dimmer", "Relay"):
-                mod_stat_req_msg.channels.append(int(chan))
-            if chan_data["Type"] == "ButtonCounter":
-                if counter_msg is None:
-                    counter_msg = CounterStatusRequestMessage(self._address)
-                counter_msg.channels.append(int(chan))
+        mod_stat_req_msg.channels = list(self._descriptor.status_channels)
         await self._writer(mod_stat_req_msg)
-        if counter_msg is not None:
+        if self._descriptor.counter_channels:
+            counter_msg = CounterStatusRequestMessage(self._address)
+            counter_msg.channels = list(self._descriptor.counter_channels)
             await self._writer(counter_msg)
 
     async def _request_channel_name(self) -> None:
         # request the module channel names
-        if keys_exists(self._data, "AllChannelStatus"):
+        from velbusaio.messages.channel_name_request import (
+            COMMAND_CODE as CHANNEL_NAME_REQUEST_COMMAND_CODE,
+        )
+        from velbusaio.messages.channel_name_request import ChannelNameRequestMessage
+
+        if self._descriptor.all_channel_status:
             msg = ChannelNameRequestMessage(self._address)
             msg.priority = PRIORITY_LOW
             msg.channels = 0xFF
@@ -702,44 +797,26 @@ class Module:
         """
         Request all needed memory addresses
         """
-        if "Memory" not in self._data:
-            self._name = None
-            return
-
-        if self._type == 0x0C:
+        if self._descriptor.memory_plan is None:
             self._name = None
             return
 
-        for memory_key, memory_part in self._data["Memory"].items():
+        from velbusaio.messages.read_data_from_memory import ReadDataFromMemoryMessage
 
-            if memory_key == "Address":
-                for addr_int in memory_part.keys():
-                    addr = struct.unpack(
-                        ">BB", struct.pack(">h", int("0x" + addr_int, 0))
-                    )
-                    msg = ReadDataFromMemoryMessage(self._address)
-                    msg.priority = PRIORITY_LOW
-                    msg.high_address = addr[0]
-                    msg.low_address = addr[1]
-                    await self._writer(msg)
+        for addr in self._descriptor.memory_plan:
+            msg = ReadDataFromMemoryMessage(self._address)
+            msg.priority = PRIORITY_LOW
+            msg.high_address = addr >> 8
+            msg.low_address = addr & 0xFF
+            await self._writer(msg)
 
     async def __load_default_channels(self) -> None:
-        if "Channels" not in self._data:
-            return
-
-        for chan, chan_data in self._data["Channels"].items():
-            edit = True
-            if "Editable" not in chan_data or chan_data["Editable"] != "yes":
-                edit = False
-            cls = getattr(sys.modules[__name__], chan_data["Type"])
-            self._channels[int(chan)] = cls(
-                self, int(chan), chan_data["Name"], edit, self._writer, self._address
+        for spec in self._descriptor.channels:
+            self._channels[spec.num] = spec.cls(
+                self, spec.num, spec.name, spec.editable, self._writer, self._address
             )
-            if chan_data["Type"] == "Temperature":
-                if "Thermostat" in self._data or (
-                    "ThermostatAddr" in self._data and self._data["ThermostatAddr"] != 0
-                ):
-                    await self._update_channel(int(chan), {"thermostat": True})
+            if spec.type == "Temperature" and self._descriptor.thermostat:
+                await self._update_channel(spec.num, {"thermostat": True})
 
 
 class VmbDali(Module):
@@ -757,7 +834,6 @@ class VmbDali(Module):
         memorymap: int | None = None,
         build_year: int | None = None,
         build_week: int | None = None,
-        cache_dir: str | None = None,
     ) -> None:
         super().__init__(
             module_address,
@@ -767,7 +843,6 @@ class VmbDali(Module):
             memorymap,
             build_year,
             build_week,
-            cache_dir,
         )
         self.group_members: dict[int, set[int]] = {}
 
@@ -783,6 +858,10 @@ class VmbDali(Module):
         await self._request_dali_channels()
 
     async def _request_dali_channels(self):
+        from velbusaio.messages.dali_device_settings_request import (
+            COMMAND_CODE as DALI_DEVICE_SETTINGS_REQUEST_COMMAND_CODE,
+        )
+
         msg_type = commandRegistry.get_command(
             DALI_DEVICE_SETTINGS_REQUEST_COMMAND_CODE, self.get_type()
         )
@@ -792,69 +871,81 @@ class VmbDali(Module):
         msg.settings = None  # all
         await self._writer(msg)
 
-    async def on_message(self, message: Message) -> None:
-        if isinstance(message, DaliDeviceSettingMsg):
-            if isinstance(message.data, DaliDeviceTypeMsg):
-                if message.data.device_type == DaliDeviceType.NoDevicePresent:
-                    if message.channel in self._channels:
-                        del self._channels[message.channel]
-                elif message.data.device_type == DaliDeviceType.LedModule:
-                    if self._channels.get(message.channel).__class__ != Dimmer:
-                        # New or changed type, replace channel:
-                        self._channels[message.channel] = Dimmer(
-                            self,
-                            message.channel,
-                            None,
-                            True,
-                            self._writer,
-                            self._address,
-                            slider_scale=254,
-                        )
-                        await self._request_single_channel_name(message.channel)
-
-            elif isinstance(message.data, MemberOfGroupMsg):
-                for group in range(0, 15 + 1):
-                    this_group_members = self.group_members.setdefault(group, set())
-                    if message.data.member_of_group[group]:
-                        this_group_members.add(message.channel)
-                    elif message.channel in this_group_members:
-                        this_group_members.remove(message.channel)
-
-        elif isinstance(message, PushButtonStatusMessage):
-            _channel_offset = self.calc_channel_offset(message.address)
-            for channel in message.opened:
-                if _channel_offset + channel > 64:  # ignore groups
-                    continue
-                await self._update_channel((_channel_offset + channel), {"state": 0})
-            # ignore message.closed: we don't know at what dimlevel they're started
-
-        elif isinstance(message, DimValueStatus):
-            for offset, dim_value in enumerate(message.dim_values):
-                channel = message.channel + offset
-                if channel <= 64:  # channel
-                    await self._update_channel(channel, {"state": dim_value})
-                elif channel <= 80:  # group
-                    group_num = channel - 65
-                    for chan in self.group_members.get(group_num, []):
-                        await self._update_channel(chan, {"state": dim_value})
-                else:  # broadcast
-                    for chan in self._channels.values():
-                        await chan.update({"state": dim_value})
-
-        elif isinstance(
-            message,
-            (
-                SetLedMessage,
-                ClearLedMessage,
-                FastBlinkingLedMessage,
-                SlowBlinkingLedMessage,
-            ),
-        ):
-            pass
+    # the led messages of a dali module say nothing about its channels
+    _MESSAGE_HANDLERS: dict[str, str] = {
+        **{
+            name: method
+            for name, method in Module._MESSAGE_HANDLERS.items()
+            if name
+            not in (
+                "SetLedMessage",
+                "ClearLedMessage",
+                "FastBlinkingLedMessage",
+                "SlowBlinkingLedMessage",
+            )
+        },
+        "DaliDeviceSettingMsg": "_on_dali_device_settings",
+        "PushButtonStatusMessage": "_on_dali_push_button_status",
+        "DimValueStatus": "_on_dim_value_status",
+    }
+
+    async def _on_dali_device_settings(self, message: DaliDeviceSettingMsg) -> None:
+        from velbusaio.messages.dali_device_settings import DeviceType as DaliDeviceType
+        from velbusaio.messages.dali_device_settings import (
+            DeviceTypeMsg as DaliDeviceTypeMsg,
+        )
+        from velbusaio.messages.dali_device_settings import MemberOfGroupMsg
+
+        if isinstance(message.data, DaliDeviceTypeMsg):
+            if message.data.device_type == DaliDeviceType.NoDevicePresent:
+                if message.channel in self._channels:
+                    del self._channels[message.channel]
+            elif message.data.device_type == DaliDeviceType.LedModule:
+                if self._channels.get(message.channel).__class__ != Dimmer:
+                    # New or changed type, replace channel:
+                    self._channels[message.channel] = Dimmer(
+                        self,
+                        message.channel,
+                        None,
+                        True,
+                        self._writer,
+                        self._address,
+                        slider_scale=254,
+                    )
+                    await self._request_single_channel_name(message.channel)
+
+        elif isinstance(message.data, MemberOfGroupMsg):
+            for group in range(0, 15 + 1):
+                this_group_members = self.group_members.setdefault(group, set())
+                if message.data.member_of_group[group]:
+                    this_group_members.add(message.channel)
+                elif message.channel in this_group_members:
+                    this_group_members.remove(message.channel)
+        self._cache()
 
-        else:
-            return await super().on_message(message)
+    async def _on_dali_push_button_status(
+        self, message: PushButtonStatusMessage
+    ) -> None:
+        _channel_offset = self.calc_channel_offset(message.address)
+        for channel in message.opened:
+            if _channel_offset + channel > 64:  # ignore groups
+                continue
+            await self._update_channel((_channel_offset + channel), {"state": 0})
+        # ignore message.closed: we don't know at what dimlevel they're started
+        self._cache()
 
+    async def _on_dim_value_status(self, message: DimValueStatus) -> None:
+        for offset, dim_value in enumerate(message.dim_values):
+            channel = message.channel + offset
+            if channel <= 64:  # channel
+                await self._update_channel(channel, {"state": dim_value})
+            elif channel <= 80:  # group
+                group_num = channel - 65
+                for chan in self.group_members.get(group_num, []):
+                    await self._update_channel(chan, {"state": dim_value})
+            else:  # broadcast
+                for chan in self._channels.values():
+                    await chan.update({"state": dim_value})
         self._cache()
 
     async def _request_channel_name(self) -> None:
@@ -863,6 +954,10 @@ class VmbDali(Module):
         pass
 
     async def _request_single_channel_name(self, channel_num: int) -> None:
+        from velbusaio.messages.channel_name_request import (
+            COMMAND_CODE as CHANNEL_NAME_REQUEST_COMMAND_CODE,
+        )
+
         msg_type = commandRegistry.get_command(
             CHANNEL_NAME_REQUEST_COMMAND_CODE, self.get_type()
         )
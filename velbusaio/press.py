@@ -0,0 +1,135 @@
+"""
+Virtual button presses
+
+A press sends the "pressed" frame, and the "released" frame some time later.
+Instead of a sleeping task per press, all releases wait in one heap with a
+single loop timer armed for the earliest one. Presses and releases of the
+same module that happen together are sent as one push button status frame,
+the channel masks hold all their buttons.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable
+
+from velbusaio.const import LONG_PRESS_DELAY, LONG_PRESS_DURATION, PRESS_DURATION
+from velbusaio.message import Message
+from velbusaio.messages.push_button_status import PushButtonStatusMessage
+
+# releases closer together than this are sent in the same frame
+PRESS_TOLERANCE = 0.02
+
+
+class PressScheduler:
+    """
+    Send the frames of button presses at the right time
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[Message], Awaitable[None]],
+        duration: float = PRESS_DURATION,
+        long_delay: float = LONG_PRESS_DELAY,
+        long_duration: float = LONG_PRESS_DURATION,
+    ) -> None:
+        self._log = logging.getLogger("velbus-press")
+        self._writer = writer
+        self._duration = duration
+        self._long_delay = long_delay
+        self._long_duration = long_duration
+        # address => push button status attribute => channels, for the next frame
+        self._frames: dict[int, dict[str, set[int]]] = {}
+        # futures to resolve once the next frames are sent
+        self._done: list[asyncio.Future] = []
+        self._flush_handle: asyncio.Handle | None = None
+        # (when, seq, address, attribute, channel, future)
+        self._heap: list[tuple] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._frames_sent = 0
+
+    def press(self, address: int, channel: int, long: bool = False) -> asyncio.Future:
+        """
+        Press a button, returns a future that is done when it is released
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        future = loop.create_future()
+        self._add(address, "closed", channel)
+        if long:
+            self._at(now + self._long_delay, address, "closed_long", channel, None)
+            self._at(now + self._long_duration, address, "opened", channel, future)
+        else:
+            self._at(now + self._duration, address, "opened", channel, future)
+        return future
+
+    def _add(self, address: int, attr: str, channel: int) -> None:
+        self._frames.setdefault(address, {}).setdefault(attr, set()).add(channel)
+        if self._flush_handle is None:
+            # presses made in the same loop iteration share the frame
+            self._flush_handle = asyncio.get_running_loop().call_soon(self._start_flush)
+
+    def _at(
+        self,
+        when: float,
+        address: int,
+        attr: str,
+        channel: int,
+        future: asyncio.Future | None,
+    ) -> None:
+        heapq.heappush(
+            self._heap, (when, next(self._seq), address, attr, channel, future)
+        )
+        if self._heap[0][0] == when:
+            self._arm()
+
+    def _arm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        if self._heap:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_at(self._heap[0][0], self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        limit = asyncio.get_running_loop().time() + PRESS_TOLERANCE
+        while self._heap and self._heap[0][0] <= limit:
+            _, _, address, attr, channel, future = heapq.heappop(self._heap)
+            self._add(address, attr, channel)
+            if future is not None:
+                self._done.append(future)
+        self._arm()
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        frames, self._frames = self._frames, {}
+        done, self._done = self._done, []
+        asyncio.ensure_future(self._flush(frames, done))
+
+    async def _flush(
+        self, frames: dict[int, dict[str, set[int]]], done: list[asyncio.Future]
+    ) -> None:
+        try:
+            for address, masks in frames.items():
+                msg = PushButtonStatusMessage(address)
+                for attr, channels in masks.items():
+                    setattr(msg, attr, sorted(channels))
+                await self._writer(msg)
+                self._frames_sent += 1
+        except Exception as err:
+            self._log.error(f"Could not send a button press: {err}")
+            for future in done:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for future in done:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._heap), "frames": self._frames_sent}
@@ -5,16 +5,35 @@ import binascii
 import logging
 import typing as t
 from asyncio import transports
+from collections import deque
+from time import perf_counter
 
 import backoff
 
-from velbusaio.const import MAXIMUM_MESSAGE_SIZE, MINIMUM_MESSAGE_SIZE, SLEEP_TIME
+from velbusaio.capture import RX, TX, CaptureWriter
+from velbusaio.const import (
+    CAPTURE_BACKUPS,
+    CAPTURE_MAX_BYTES,
+    HEADER_LENGTH,
+    MAXIMUM_MESSAGE_SIZE,
+    MINIMUM_MESSAGE_SIZE,
+    SLEEP_TIME,
+    TAIL_LENGTH,
+    TRACE_RATE_LIMIT,
+    TRACE_SAMPLE,
+)
 from velbusaio.raw_message import RawMessage
 from velbusaio.raw_message import create as create_message_info
+from velbusaio.stats import StageMetrics
+from velbusaio.trace import FrameTracer
+from velbusaio.traffic import TrafficMonitor
+
+# tells the writer that the background queue has a message
+_WAKEUP = object()
 
 
 def _on_write_backoff(details):
-    logging.debug(
+    logging.getLogger("velbus-protocol").debug(
         f"Transport is not open, waiting {details.wait} seconds after {details.tries}"
     )
 
@@ -29,11 +48,13 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         self,
         message_received_callback: t.Callable[[RawMessage], t.Awaitable[None]],
         connection_lost_callback=None,
+        message_sent_callback: t.Callable[[RawMessage], None] | None = None,
     ) -> None:
         super().__init__()
         self._log = logging.getLogger("velbus-protocol")
         self._message_received_callback = message_received_callback
         self._connection_lost_callback = connection_lost_callback
+        self._message_sent_callback = message_sent_callback
 
         # everything for reading from Velbus
         self._buffer = bytearray(MAXIMUM_MESSAGE_SIZE)
@@ -42,9 +63,21 @@ class VelbusProtocol(asyncio.BufferedProtocol):
 
         self._serial_buf = b""
         self.transport = None
-
-        # everything for writing to Velbus
+        self._capture: CaptureWriter | None = None
+        self._tracer: FrameTracer | None = None
+        # bytes the parser threw away, and how often it did
+        self._parse_errors = 0
+        self._discarded_bytes = 0
+        # rolling frame and byte counters of the bus
+        self.traffic = TrafficMonitor()
+        # stage latencies, None when the instrumentation is off
+        self._metrics: StageMetrics | None = None
+
+        # everything for writing to Velbus, the queues hold the message and
+        # when it was queued, None when the instrumentation is off
         self._send_queue = asyncio.Queue()
+        # only written when the send queue is empty
+        self._background_queue: deque[tuple[RawMessage, float | None]] = deque()
         self._write_transport_lock = asyncio.Lock()
         self._writer_task = None
         self._restart_writer = False
@@ -63,7 +96,7 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         """Pause writing."""
         self._restart_writer = False
         if self._writer_task:
-            self._send_queue.put_nowait(None)
+            self._send_queue.put_nowait((None, None))
         await asyncio.sleep(0.1)
 
     def restart_writing(self) -> None:
@@ -79,6 +112,40 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         self._restart_writer = False
         if self.transport:
             self.transport.close()
+        self.stop_capture()
+
+    def start_capture(
+        self,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        """Write every received and sent frame to a capture file."""
+        self.stop_capture()
+        self._capture = CaptureWriter(path, max_bytes, backups)
+
+    def stop_capture(self) -> None:
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+    def capture_stats(self) -> dict | None:
+        return self._capture.stats() if self._capture is not None else None
+
+    def start_trace(
+        self,
+        sample: int = TRACE_SAMPLE,
+        limit: int = TRACE_RATE_LIMIT,
+        level: int = logging.DEBUG,
+    ) -> None:
+        """Log one in sample frames on the velbus-trace logger."""
+        self._tracer = FrameTracer(sample, limit, level)
+
+    def stop_trace(self) -> None:
+        self._tracer = None
+
+    def trace_stats(self) -> dict | None:
+        return self._tracer.stats() if self._tracer is not None else None
 
     def connection_lost(self, exc: t.Optional[Exception]) -> None:
         self.transport = None
@@ -105,28 +172,35 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         Called when asyncio.Protocol detects received data from serial port.
         """
         self._serial_buf += data
-        self._log.debug(
-            "Received {nbytes} bytes from Velbus: {data_hex}".format(
-                nbytes=len(data),
-                data_hex=binascii.hexlify(self._serial_buf[: len(data)], " "),
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug(
+                "Received %d bytes from Velbus: %s",
+                len(data),
+                binascii.hexlify(data, " "),
             )
-        )
         _recheck = True
+        metrics = self._metrics
+        read_start = start = perf_counter() if metrics is not None else 0.0
 
-        while len(self._serial_buf) > MINIMUM_MESSAGE_SIZE and _recheck:
+        while len(self._serial_buf) >= MINIMUM_MESSAGE_SIZE and _recheck:
             # try to construct a Velbus message from the buffer
 
             _remaining_buf = self._serial_buf[MAXIMUM_MESSAGE_SIZE:]
-            msg, remaining_data = create_message_info(
-                bytearray(self._serial_buf[:MAXIMUM_MESSAGE_SIZE])
-            )
+            received = bytearray(self._serial_buf[:MAXIMUM_MESSAGE_SIZE])
+            msg, remaining_data = create_message_info(received)
+            self._count_discarded(received, msg, remaining_data)
 
             if msg is not None:
-                asyncio.ensure_future(self._process_message(msg))
+                self._frame_received(msg, start)
+                if metrics is not None:
+                    start = perf_counter()
                 _recheck = True
             else:
                 _recheck = False
             self._serial_buf = bytes(remaining_data) + _remaining_buf
+        if metrics is not None:
+            metrics.observe("read", perf_counter() - read_start)
+            metrics.count("rx_bytes", len(data))
 
     def buffer_updated(self, nbytes: int) -> None:
         """Receive data from the Buffered Streaming protocol.
@@ -142,14 +216,63 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         #    )
         # )
 
-        if self._buffer_pos > MINIMUM_MESSAGE_SIZE:
+        metrics = self._metrics
+        read_start = start = perf_counter() if metrics is not None else 0.0
+        # a read can hold several messages, or only a part of one
+        while self._buffer_pos >= MINIMUM_MESSAGE_SIZE:
             # try to construct a Velbus message from the buffer
-            msg, remaining_data = create_message_info(self._buffer)
-
-            if msg is not None:
-                asyncio.ensure_future(self._process_message(msg))
-
+            received = self._buffer[: self._buffer_pos]
+            msg, remaining_data = create_message_info(received)
+            self._count_discarded(received, msg, remaining_data)
             self._new_buffer(remaining_data)
+            if msg is None:
+                break
+            self._frame_received(msg, start)
+            if metrics is not None:
+                start = perf_counter()
+        if metrics is not None:
+            metrics.observe("read", perf_counter() - read_start)
+            metrics.count("rx_bytes", nbytes)
+
+    def _count_discarded(
+        self, received: bytearray, msg: RawMessage | None, remaining: bytes
+    ) -> None:
+        # the parser drops the bytes in front of the frame
+        used = len(received) - len(remaining)
+        if msg is not None:
+            used -= len(msg.data) + HEADER_LENGTH + TAIL_LENGTH
+        if used:
+            self._parse_errors += 1
+            self._discarded_bytes += used
+            if self._capture is not None:
+                self._capture.write_discarded(bytes(received[:used]))
+
+    def parse_errors(self) -> dict[str, int]:
+        """The bytes the parser could not use, and how often it happened."""
+        return {"errors": self._parse_errors, "discarded_bytes": self._discarded_bytes}
+
+    def queue_depths(self) -> dict[str, int]:
+        """The messages waiting in the send queues."""
+        return {
+            "send": self._send_queue.qsize(),
+            "background": len(self._background_queue),
+        }
+
+    def _frame_received(self, msg: RawMessage, start: float) -> None:
+        """
+        A frame was parsed, start is when its parsing started
+        """
+        self.traffic.record(RX, msg)
+        if self._capture is not None:
+            self._capture.write(RX, msg.to_bytes())
+        if self._tracer is not None:
+            self._tracer.frame(RX, msg)
+        if self._metrics is None:
+            asyncio.ensure_future(self._process_message(msg))
+            return
+        parsed = perf_counter()
+        self._metrics.observe("frame", parsed - start)
+        asyncio.ensure_future(self._process_message(msg, parsed))
 
     def _new_buffer(self, remaining_data=None) -> None:
         new_buffer = bytearray(MAXIMUM_MESSAGE_SIZE)
@@ -160,9 +283,14 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         self._buffer_pos = len(remaining_data) if remaining_data else 0
         self._buffer_view = memoryview(self._buffer)
 
-    async def _process_message(self, msg: RawMessage) -> None:
+    async def _process_message(
+        self, msg: RawMessage, parsed: float | None = None
+    ) -> None:
         # self._log.debug(f"RX: {msg}")
         await self._message_received_callback(msg)
+        if parsed is not None and self._metrics is not None:
+            # from the parsed frame to the last callback
+            self._metrics.observe("receive", perf_counter() - parsed)
 
     # Everything write-related
 
@@ -171,23 +299,47 @@ class VelbusProtocol(asyncio.BufferedProtocol):
         if not self.transport.is_closing():
             self.transport.write(authkey.encode("utf-8"))
 
-    async def send_message(self, msg: RawMessage) -> None:
-        self._send_queue.put_nowait(msg)
+    async def send_message(self, msg: RawMessage, background: bool = False) -> None:
+        """Queue a message, background messages wait for all others"""
+        queued = perf_counter() if self._metrics is not None else None
+        if not background:
+            self._send_queue.put_nowait((msg, queued))
+            return
+        self._background_queue.append((msg, queued))
+        if self._send_queue.empty():
+            self._send_queue.put_nowait((_WAKEUP, None))
 
     async def _get_message_from_send_queue(self) -> None:
         self._log.debug("Starting Velbus write message from send queue")
         self._log.debug("Acquiring write lock")
         await self._write_transport_lock.acquire()
+        try:
+            await self._write_from_send_queue()
+        finally:
+            self._write_transport_lock.release()
+        self._log.debug("Ending Velbus write message from send queue")
+
+    async def _write_from_send_queue(self) -> None:
         while self._restart_writer:
             # wait for an item from the queue
-            msg_info = await self._send_queue.get()
+            if self._send_queue.empty() and self._background_queue:
+                msg_info, queued = self._background_queue.popleft()
+            else:
+                msg_info, queued = await self._send_queue.get()
             if msg_info is None:
-                self._restart_writer = False
+                # pause_writing already stopped us, unless the connection
+                # was made again since, then the done callback restarts
                 return
+            if msg_info is _WAKEUP:
+                continue
+            if self._metrics is not None and queued is not None:
+                self._metrics.observe("wait", perf_counter() - queued)
             message_sent = False
             try:
                 while not message_sent:
                     message_sent = await self._write_message(msg_info)
+                if self._message_sent_callback:
+                    self._message_sent_callback(msg_info)
                 if msg_info.command == 0xEF:
                     # 'channel name request' command provokes in worst case 99 answer packets from VMBGPOD
                     queue_sleep_time = SLEEP_TIME * 33
@@ -201,9 +353,6 @@ class VelbusProtocol(asyncio.BufferedProtocol):
             except Exception as exc:
                 self._log.error(f"Restarting Velbus writer due to {exc!r}")
                 self._restart_writer = True
-        if self._write_transport_lock.locked():
-            self._write_transport_lock.release()
-        self._log.debug("Ending Velbus write message from send queue")
 
     @backoff.on_predicate(
         backoff.expo,
@@ -214,7 +363,18 @@ class VelbusProtocol(asyncio.BufferedProtocol):
     async def _write_message(self, msg: RawMessage) -> bool:
         # self._log.debug(f"TX: {msg}")
         if not self.transport.is_closing():
-            self.transport.write(msg.to_bytes())
+            metrics = self._metrics
+            start = perf_counter() if metrics is not None else 0.0
+            data = msg.to_bytes()
+            self.transport.write(data)
+            self.traffic.record(TX, msg)
+            if self._capture is not None:
+                self._capture.write(TX, data)
+            if self._tracer is not None:
+                self._tracer.frame(TX, msg)
+            if metrics is not None:
+                metrics.observe("write", perf_counter() - start)
+                metrics.count("tx_bytes", len(data))
             return True
         else:
             return False
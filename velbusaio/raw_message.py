@@ -5,6 +5,7 @@ from typing import NamedTuple, Optional, Tuple
 from velbusaio.const import (
     END_BYTE,
     HEADER_LENGTH,
+    MAX_BODY_SIZE,
     MAXIMUM_MESSAGE_SIZE,
     MINIMUM_MESSAGE_SIZE,
     NO_RTR,
@@ -16,6 +17,8 @@ from velbusaio.const import (
 from velbusaio.util import checksum
 from velbusaio.util import checksum as calculate_checksum
 
+_log = logging.getLogger("velbus-parser")
+
 
 class RawMessage(NamedTuple):
     priority: int
@@ -59,13 +62,13 @@ def create(rawmessage: bytearray) -> Tuple[Optional[RawMessage], bytearray]:
 
     while True:
         if len(rawmessage) < MINIMUM_MESSAGE_SIZE:
-            logging.debug("Buffer does not yet contain a full message")
+            _log.debug("Buffer does not yet contain a full message")
             return None, rawmessage
 
         try:
             return _parse(rawmessage)
         except ParseError:
-            logging.error(
+            _log.error(
                 f"Could not parse the message {binascii.hexlify(rawmessage)}. Truncating invalid data."
             )
             rawmessage = _trim_buffer_garbage(
@@ -93,6 +96,10 @@ def _parse(rawmessage: bytearray) -> Tuple[Optional[RawMessage], bytearray]:
 
     rtr = rawmessage[3] & RTR == RTR  # high nibble of the 4th byte
     data_size = rawmessage[3] & 0x0F  # low nibble of the 4th byte
+    if data_size > MAX_BODY_SIZE:
+        raise ParseError(
+            f"Invalid data size {data_size} in {binascii.hexlify(rawmessage)}"
+        )
 
     if HEADER_LENGTH + data_size + TAIL_LENGTH > len(rawmessage):
         return (
@@ -138,11 +145,11 @@ def _trim_buffer_garbage(rawmessage: bytearray) -> bytearray:
             #            )
             return rawmessage[start_index:]
         else:
-            logging.debug(
-                "Trimming whole buffer as it does not contain the start byte: {buffer}".format(
-                    buffer=binascii.hexlify(rawmessage)
+            if _log.isEnabledFor(logging.DEBUG):
+                _log.debug(
+                    "Trimming whole buffer as it does not contain the start byte: %s",
+                    binascii.hexlify(rawmessage),
                 )
-            )
             return []
 
     else:
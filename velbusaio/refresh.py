@@ -0,0 +1,231 @@
+"""
+Periodic status refresh
+
+Modules broadcast their changes, but a missed frame leaves a channel wrong
+until the next change. The refresh scheduler polls the state again, every
+channel type at its own interval (REFRESH_INTERVALS).
+
+The channels of a module that share a request are polled together, one
+request with a channel mask per module. The modules are spread over the
+interval and at most one module is polled every REFRESH_SPACING seconds, in
+the background lane of the send queue, so the refresh never competes with
+commands.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+from typing import TYPE_CHECKING, Mapping
+
+from velbusaio.const import REFRESH_INTERVALS, REFRESH_SPACING
+from velbusaio.message import Message
+from velbusaio.messages.counter_status_request import CounterStatusRequestMessage
+from velbusaio.messages.light_value_request import LightValueRequest
+from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
+from velbusaio.messages.sensor_temp_request import SensorTempRequest
+from velbusaio.stats import Histogram
+
+if TYPE_CHECKING:
+    from velbusaio.controller import Velbus
+    from velbusaio.module import Module
+
+# channel type => the request that polls it
+REQUEST_KINDS = {
+    "Blind": "status",
+    "Dimmer": "status",
+    "Relay": "status",
+    "ButtonCounter": "counter",
+    "Temperature": "temperature",
+    "LightSensor": "light",
+}
+
+
+class RefreshJob:
+    """
+    One request for one module
+    """
+
+    __slots__ = ("address", "kind", "channels", "interval", "due")
+
+    def __init__(
+        self, address: int, kind: str, channels: list[int], interval: float
+    ) -> None:
+        self.address = address
+        self.kind = kind
+        self.channels = channels
+        self.interval = interval
+        self.due = 0.0
+
+    def __lt__(self, other: RefreshJob) -> bool:
+        return (self.due, self.address, self.kind) < (
+            other.due,
+            other.address,
+            other.kind,
+        )
+
+    def message(self) -> Message:
+        if self.kind == "status":
+            msg = ModuleStatusRequestMessage(self.address)
+            msg.channels = list(self.channels)
+        elif self.kind == "counter":
+            msg = CounterStatusRequestMessage(self.address)
+            msg.channels = list(self.channels)
+        elif self.kind == "temperature":
+            msg = SensorTempRequest(self.address)
+        else:
+            msg = LightValueRequest(self.address)
+        return msg
+
+
+class RefreshScheduler:
+    """
+    Poll the module status in the background
+    """
+
+    def __init__(
+        self,
+        velbus: Velbus,
+        intervals: Mapping[str, float] = REFRESH_INTERVALS,
+        spacing: float = REFRESH_SPACING,
+    ) -> None:
+        self._log = logging.getLogger("velbus-refresh")
+        self._velbus = velbus
+        self._intervals = intervals
+        self._spacing = spacing
+        self._jobs: list[RefreshJob] = []
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._sent = 0
+        # how late a request was sent, in seconds
+        self._lag = Histogram()
+        self._last_lag = 0.0
+
+    def _module_jobs(self, module: Module) -> list[RefreshJob]:
+        # kind => [channels], [intervals]
+        kinds: dict[str, tuple[list[int], list[float]]] = {}
+        for num, chan in module.get_channels().items():
+            chan_type = type(chan).__name__
+            kind = REQUEST_KINDS.get(chan_type)
+            interval = self._intervals.get(chan_type)
+            if kind is None or interval is None:
+                continue
+            if kind == "status" and num not in module._descriptor.status_channels:
+                continue
+            channels, intervals = kinds.setdefault(kind, ([], []))
+            channels.append(num)
+            intervals.append(interval)
+        return [
+            RefreshJob(module.get_addresses()[0], kind, channels, min(intervals))
+            for kind, (channels, intervals) in kinds.items()
+        ]
+
+    def plan(self) -> None:
+        """
+        Build the schedule for the current modules
+        """
+        modules = {}
+        for module in self._velbus.get_modules().values():
+            modules[module.get_addresses()[0]] = module
+        jobs = []
+        now = asyncio.get_running_loop().time()
+        for index, address in enumerate(sorted(modules)):
+            for job in self._module_jobs(modules[address]):
+                # spread the modules over the interval
+                job.due = now + job.interval * (index + 1) / len(modules)
+                jobs.append(job)
+        heapq.heapify(jobs)
+        self._jobs = jobs
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """
+        Plan and start polling
+        """
+        self.plan()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._jobs:
+                await self._wakeup.wait()
+                continue
+            delay = self._jobs[0].due - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                    # the plan changed
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            await self._poll(self._jobs[0].address, loop.time())
+            await asyncio.sleep(self._spacing)
+
+    async def _poll(self, address: int, now: float) -> None:
+        """
+        Send every request of the module that is due
+        """
+        due = [heapq.heappop(self._jobs)]
+        # poll the other requests of this module that are (almost) due too
+        rest = []
+        for job in self._jobs:
+            if job.address == address and job.due <= now + self._spacing:
+                due.append(job)
+            else:
+                rest.append(job)
+        if len(due) > 1:
+            heapq.heapify(rest)
+            self._jobs = rest
+        for job in due:
+            self._last_lag = max(now - job.due, 0.0)
+            self._lag.observe(self._last_lag)
+            try:
+                await self._velbus.send(job.message(), background=True)
+                self._sent += 1
+            except Exception as err:
+                self._log.warning(f"Refresh of module {address} failed: {err}")
+            # keep the phase, unless the refresh fell behind a whole interval
+            job.due += job.interval
+            if job.due < now:
+                job.due = now + job.interval
+            heapq.heappush(self._jobs, job)
+
+    def schedule(self) -> list[dict]:
+        """
+        The planned requests, the next one first
+        """
+        now = asyncio.get_running_loop().time()
+        return [
+            {
+                "address": job.address,
+                "kind": job.kind,
+                "channels": list(job.channels),
+                "interval": job.interval,
+                "due_in": job.due - now,
+            }
+            for job in sorted(self._jobs)
+        ]
+
+    def stats(self) -> dict:
+        """
+        Refresh metrics, the lag is how late requests were sent, in seconds
+        """
+        return {
+            "jobs": len(self._jobs),
+            "sent": self._sent,
+            "last_lag": self._last_lag,
+            "lag": self._lag.snapshot(),
+        }
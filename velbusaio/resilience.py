@@ -0,0 +1,225 @@
+"""
+Fault-injection harness
+
+Runs the protocol and the packet handler against the bus simulator under a
+fault profile and reports how they cope:
+
+- throughput: frames per second that reached the packet handler
+- lost: frames the modules sent that never reached it
+- divergence: relay channels whose state differs from the module when the
+  faults stop
+- recovery_time: seconds from the end of the faults, and the frames still
+  on the bus, until every channel matches its module again. Status requests
+  are sent like the refresh does, None if that did not happen within the
+  recovery timeout
+
+The modules toggle their relays by themselves and the harness switches
+relays too, so both the receive and the send path are busy.
+
+    python -m velbusaio.resilience --profile lossy --profile fragmented
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+from typing import Iterable
+
+from velbusaio.controller import Velbus
+from velbusaio.messages.module_status_request import ModuleStatusRequestMessage
+from velbusaio.simulator import FAULT_PROFILES, BusSimulator, FaultProfile
+
+VMB4RYLD = 0x10
+FIRST_ADDRESS = 0x10
+# seconds between two status requests for a module that is still wrong
+RECOVERY_POLL = 0.5
+
+
+def _divergent(velbus: Velbus, simulator: BusSimulator) -> dict[int, list[int]]:
+    """
+    Address => relay channels that differ from the module
+    """
+    result = {}
+    for address, sim in simulator.modules.items():
+        module = velbus.get_module(address)
+        channels = module.get_channels() if module is not None else {}
+        wrong = [
+            num
+            for num, state in sim.state.items()
+            if num in sim.descriptor.status_channels
+            and (num not in channels or channels[num].is_on() != state["on"])
+        ]
+        if wrong:
+            result[address] = wrong
+    return result
+
+
+async def run_profile(
+    profile: FaultProfile,
+    modules: int = 4,
+    duration: float = 2.0,
+    rate: float = 50.0,
+    speed: float = 1.0,
+    recovery_timeout: float = 10.0,
+    cache_dir: str | None = None,
+) -> dict:
+    """
+    Run the workload under one fault profile
+
+    rate is the number of relay changes per second, half of them made by
+    the modules and half by the harness.
+    """
+    loop = asyncio.get_running_loop()
+    rnd = random.Random(profile.seed)
+    simulator = BusSimulator(
+        {FIRST_ADDRESS + num: VMB4RYLD for num in range(modules)}, speed=speed
+    )
+    port = await simulator.serve_tcp()
+    with tempfile.TemporaryDirectory() as tmp:
+        velbus = Velbus(f"127.0.0.1:{port}", cache_dir=cache_dir or tmp)
+        # the harness reconnects itself, without scanning the bus again
+        velbus._auto_reconnect = False
+        await velbus._handler.read_protocol_data()
+        for address in simulator.modules:
+            velbus.add_module(
+                address, VMB4RYLD, velbus._handler.pdata.module_type(VMB4RYLD)
+            )
+            await velbus.get_module(address)._Module__load_default_channels()
+        velbus._handler._scan_complete = True
+
+        received = 0
+        handle = velbus._handler.handle
+
+        async def count(msg) -> None:
+            nonlocal received
+            received += 1
+            await handle(msg)
+
+        velbus._protocol._message_received_callback = count
+
+        reconnects = 0
+        closing = False
+
+        async def reconnect() -> None:
+            nonlocal reconnects
+            while not closing:
+                try:
+                    await loop.create_connection(
+                        lambda: velbus._protocol, "127.0.0.1", port
+                    )
+                    reconnects += 1
+                    return
+                except OSError:
+                    await asyncio.sleep(0.05)
+
+        velbus._protocol._connection_lost_callback = lambda exc: (
+            None if closing else asyncio.ensure_future(reconnect())
+        )
+        await velbus.connect(test_connect=True)
+
+        relays = [
+            (address, num)
+            for address, sim in simulator.modules.items()
+            for num in sim.descriptor.status_channels
+        ]
+        # the start state is known
+        for address, num in relays:
+            await velbus.get_module(address).get_channels()[num].update({"on": False})
+
+        simulator.set_faults(profile)
+        start = loop.time()
+        sent_before = simulator.stats()["sent"]
+        received = 0
+        while loop.time() - start < duration:
+            address, num = rnd.choice(relays)
+            on = rnd.random() < 0.5
+            if rnd.random() < 0.5:
+                simulator.change(address, num, on=on)
+            else:
+                channel = velbus.get_module(address).get_channels()[num]
+                await (channel.turn_on() if on else channel.turn_off())
+            await asyncio.sleep(1 / rate)
+        elapsed = loop.time() - start
+        simulator.set_faults(FaultProfile())
+        # wait for the bus to drain
+        await asyncio.sleep(0.2)
+        faults_end = loop.time()
+        sent = simulator.stats()["sent"] - sent_before
+        delivered = received
+        divergence = _divergent(velbus, simulator)
+
+        recovery_time = None
+        last_poll: dict[int, float] = {}
+        while loop.time() - faults_end < recovery_timeout:
+            wrong = _divergent(velbus, simulator)
+            if not wrong:
+                recovery_time = loop.time() - faults_end
+                break
+            for address, channels in wrong.items():
+                if loop.time() - last_poll.get(address, 0.0) < RECOVERY_POLL:
+                    continue
+                last_poll[address] = loop.time()
+                msg = ModuleStatusRequestMessage(address)
+                msg.channels = channels
+                await velbus.send(msg)
+            await asyncio.sleep(0.02)
+
+        closing = True
+        await velbus.stop()
+        await simulator.close()
+
+    return {
+        "profile": profile.name,
+        "duration": elapsed,
+        "sent": sent,
+        "received": delivered,
+        "lost": max(sent - delivered, 0),
+        "throughput": delivered / elapsed if elapsed else 0.0,
+        "divergence": sum(len(channels) for channels in divergence.values()),
+        "recovery_time": recovery_time,
+        "reconnects": reconnects,
+        "faults": simulator.stats()["faults"],
+    }
+
+
+async def run_profiles(profiles: Iterable[FaultProfile], **kwargs) -> list[dict]:
+    """
+    Run the workload under every profile, one after the other
+    """
+    return [await run_profile(profile, **kwargs) for profile in profiles]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(FAULT_PROFILES),
+        action="append",
+        help="Fault profile to run, all of them if not given",
+    )
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--modules", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+    profiles = [FAULT_PROFILES[name] for name in args.profile or FAULT_PROFILES]
+    reports = asyncio.run(
+        run_profiles(
+            profiles,
+            modules=args.modules,
+            duration=args.duration,
+            rate=args.rate,
+            speed=args.speed,
+        )
+    )
+    for report in reports:
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
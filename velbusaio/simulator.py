@@ -0,0 +1,799 @@
+"""
+Velbus bus simulator
+
+A stand-in for a Velbus installation, to scan, control and benchmark the
+library without hardware. The modules are built from the protocol data of
+their type. They answer the scan (module type, sub type, memory and channel
+name requests) and status requests, and apply relay, dimmer, blind, led and
+button commands to their own state, broadcasting the new status like real
+modules do. Other requests are ignored, just like a module that does not
+know them.
+
+The bus is served over TCP, like a network gateway, on a pseudo terminal,
+like the USB interface, or connected in memory to a protocol. Frames from
+one client are seen by the other clients too. Every frame occupies the bus
+for its wire time at BUS_BAUD_RATE and the modules answer RESPONSE_DELAY
+seconds after the request, both multiplied by speed. With speed 0
+everything is answered as fast as possible.
+
+A FaultProfile degrades the link to the clients: dropped and corrupted
+frames, garbage between frames, frames split over several writes, late
+answers, receive buffer full storms and disconnects. FAULT_PROFILES has
+the named profiles, set_faults changes the profile while the bus runs.
+
+    python -m velbusaio.simulator --port 6000 --module 1:0x10 --module 2:0x05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping
+
+from velbusaio.catalog import get_catalog
+from velbusaio.command_registry import commandRegistry
+from velbusaio.const import (
+    BUS_BAUD_RATE,
+    BUS_BITS_PER_BYTE,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+)
+from velbusaio.descriptor import get_descriptor
+from velbusaio.message import Message, ParserError
+from velbusaio.raw_message import RawMessage
+from velbusaio.raw_message import create as create_message_info
+
+# seconds between a request and the answer of the module
+RESPONSE_DELAY = 0.005
+
+# seconds between the parts of a split frame
+SPLIT_PAUSE = 0.002
+# receive buffer full frames in a storm
+STORM_FRAMES = 5
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """
+    What goes wrong between the bus and its clients
+
+    The rates are chances per frame, delay is the maximal extra answer
+    delay in seconds. buffer_full is the chance that a module drops a
+    request and floods the bus with receive buffer full frames instead.
+    """
+
+    name: str = "clean"
+    drop: float = 0.0
+    corrupt: float = 0.0
+    garbage: float = 0.0
+    split: float = 0.0
+    delay: float = 0.0
+    buffer_full: float = 0.0
+    disconnect: float = 0.0
+    seed: int | None = None
+
+
+FAULT_PROFILES = {
+    profile.name: profile
+    for profile in (
+        FaultProfile("clean"),
+        FaultProfile("lossy", drop=0.05),
+        FaultProfile("corrupt", corrupt=0.05),
+        FaultProfile("noisy", garbage=0.1),
+        FaultProfile("fragmented", split=0.3),
+        FaultProfile("slow", delay=0.2),
+        FaultProfile("storm", buffer_full=0.1),
+        FaultProfile("flaky", disconnect=0.02),
+        FaultProfile(
+            "degraded", drop=0.02, corrupt=0.02, garbage=0.05, split=0.1, delay=0.05
+        ),
+    )
+}
+
+# channel name part => number of name characters in it
+NAME_PARTS = {0xF0: 6, 0xF1: 6, 0xF2: 4}
+
+
+def _temperature_bytes(value: float) -> bytes:
+    raw = int(round(value / 0.0625)) << 5
+    return (raw & 0xFFFF).to_bytes(2, "big")
+
+
+class SimModule:
+    """
+    One simulated module and the state of its channels
+    """
+
+    def __init__(
+        self,
+        address: int,
+        module_type: int,
+        name: str | None = None,
+        channel_names: Mapping[int, str] | None = None,
+        serial: int | None = None,
+        sub_addresses: Iterable[int] = (),
+        build: tuple[int, int] = (24, 1),
+        memory_map_version: int = 1,
+        temperature: float = 21.0,
+    ) -> None:
+        data = get_catalog().module_type(module_type)
+        if data is None:
+            raise ValueError(f"Unknown module type {module_type:#04x}")
+        self.address = address
+        self.module_type = module_type
+        self.descriptor = get_descriptor(module_type, data)
+        self.name = (
+            name if name is not None else f"{self.descriptor.type_name} {address}"
+        )
+        self.channel_names = {spec.num: spec.name for spec in self.descriptor.channels}
+        self.channel_names.update(channel_names or {})
+        self.serial = serial if serial is not None else 0x1000 + address
+        self.sub_addresses = list(sub_addresses)
+        self.build = build
+        self.memory_map_version = memory_map_version
+        # channel => state, for the channel types the simulator knows
+        self.state: dict[int, dict] = {}
+        for spec in self.descriptor.channels:
+            if spec.type == "Relay":
+                self.state[spec.num] = {"on": False}
+            elif spec.type == "Dimmer":
+                self.state[spec.num] = {"dimmer": 0}
+            elif spec.type == "Blind":
+                self.state[spec.num] = {"status": 0, "position": 0}
+            elif spec.type in ("Button", "ButtonCounter", "Sensor"):
+                self.state[spec.num] = {"closed": False, "led": False}
+            elif spec.type == "Temperature":
+                self.state[spec.num] = {"cur": temperature}
+        self.memory = self._initial_memory()
+        # channel number => channel number used in the name messages
+        self._name_channels = {
+            dst: src for src, dst in self.descriptor.name_map.items()
+        }
+        # (command, channel) => channel byte, see _channel_byte
+        self._channel_bytes: dict[tuple[int, int], int] = {}
+
+    def _initial_memory(self) -> dict[int, int]:
+        memory = {}
+        name = self.name.encode("ascii", "ignore")
+        for addr, mdata in self.descriptor.memory_map.items():
+            if "ModuleName" in mdata:
+                pos = int(mdata["ModuleName"].split(":")[0])
+                memory[addr] = name[pos] if pos < len(name) else 0xFF
+        return memory
+
+    def _decode(self, frame: RawMessage) -> Message | None:
+        cls = commandRegistry.get_command(frame.command, self.module_type)
+        if cls is None:
+            return None
+        msg = cls()
+        try:
+            msg.populate(frame.priority, frame.address, frame.rtr, frame.data_only)
+        except (ParserError, ValueError, IndexError, TypeError):
+            return None
+        return msg
+
+    def _frame(self, data: bytes) -> RawMessage:
+        return RawMessage(PRIORITY_LOW, self.address, False, bytes(data))
+
+    def _encode(self, command: int, **attrs) -> RawMessage | None:
+        """
+        Encode a status with the message class of this module type
+        """
+        cls = commandRegistry.get_command(command, self.module_type)
+        if cls is None:
+            return None
+        msg = cls(self.address)
+        for attr, value in attrs.items():
+            setattr(msg, attr, value)
+        try:
+            return self._frame(msg.data_to_binary())
+        except (NotImplementedError, AttributeError, ValueError, TypeError):
+            return None
+
+    def _channel_byte(self, command: int, channel: int) -> int | None:
+        """
+        The channel byte that the message class of this module type decodes
+        to channel, it is a bit mask for most types and a number for others
+        """
+        key = (command, channel)
+        if key not in self._channel_bytes:
+            cls = commandRegistry.get_command(command, self.module_type)
+            found = None
+            candidates = [channel, channel << 1]
+            if 0 < channel <= 8:
+                candidates.insert(0, 1 << (channel - 1))
+            for byte in candidates:
+                if byte > 0xFF:
+                    continue
+                msg = cls()
+                try:
+                    msg.populate(
+                        PRIORITY_LOW, self.address, False, bytes([byte]) + b" " * 6
+                    )
+                except (ParserError, ValueError, IndexError, TypeError):
+                    continue
+                if msg.channel == channel:
+                    found = byte
+                    break
+            self._channel_bytes[key] = found
+        return self._channel_bytes[key]
+
+    def handle(self, frame: RawMessage) -> list[RawMessage]:
+        """
+        Apply a frame sent to this module, returns the answers
+        """
+        if frame.rtr and not frame.data:
+            return self._type_frames()
+        msg = self._decode(frame)
+        if msg is None:
+            return []
+        handler = getattr(self, f"_on_{frame.command:02x}", None)
+        if handler is None:
+            return []
+        return [reply for reply in handler(msg) if reply is not None]
+
+    def _type_frames(self) -> list[RawMessage]:
+        data = [
+            0xFF,
+            self.module_type,
+            (self.serial >> 8) & 0xFF,
+            self.serial & 0xFF,
+            self.memory_map_version,
+            *self.build,
+        ]
+        cls = commandRegistry.get_command(0xFF, self.module_type)
+        if cls is not None and cls.__name__ == "ModuleType2Message":
+            # the terminator byte
+            data.append(0)
+        frames = [self._frame(bytes(data))]
+        for offset in range(0, len(self.sub_addresses), 4):
+            subs = self.sub_addresses[offset : offset + 4]
+            subs += [0xFF] * (4 - len(subs))
+            command = {0: 0xB0, 4: 0xA7, 8: 0xA6}.get(offset)
+            if command is not None:
+                frames.append(self._frame(bytes([command, *data[1:4], *subs])))
+        return frames
+
+    # memory read
+    def _on_fd(self, msg: Message) -> list[RawMessage | None]:
+        addr = (msg.high_address << 8) | msg.low_address
+        value = self.memory.get(addr, 0xFF)
+        return [self._frame(bytes([0xFE, msg.high_address, msg.low_address, value]))]
+
+    # channel name request
+    def _on_ef(self, msg: Message) -> list[RawMessage | None]:
+        requested = msg.channels if isinstance(msg.channels, list) else [msg.channels]
+        everything = not requested or requested == list(range(1, 9))
+        frames: list[RawMessage | None] = []
+        for spec in self.descriptor.channels:
+            if not spec.editable:
+                continue
+            channel = self._name_channels.get(spec.num, spec.num)
+            if not everything and channel not in requested:
+                continue
+            name = self.channel_names[spec.num].encode("ascii", "ignore")[:16]
+            name += b"\xff" * (16 - len(name))
+            pos = 0
+            for command, size in NAME_PARTS.items():
+                byte = self._channel_byte(command, channel)
+                if byte is None:
+                    break
+                frames.append(
+                    self._frame(bytes([command, byte]) + name[pos : pos + size])
+                )
+                pos += size
+        return frames
+
+    # module status request
+    def _on_fa(self, msg: Message) -> list[RawMessage | None]:
+        frames = [
+            self._status(num)
+            for num in msg.channels
+            if num in self.descriptor.status_channels
+        ]
+        if self.descriptor.has_buttons:
+            frames.append(self._button_status())
+        return frames
+
+    # temperature request
+    def _on_e5(self, msg: Message) -> list[RawMessage | None]:
+        num = self.descriptor.temperature_channel
+        if num not in self.state:
+            return []
+        cur = _temperature_bytes(self.state[num]["cur"])
+        return [self._frame(bytes([0xE6]) + cur + cur + cur)]
+
+    def _on_02(self, msg: Message) -> list[RawMessage | None]:
+        return self._set(msg.relay_channels, on=True)
+
+    def _on_01(self, msg: Message) -> list[RawMessage | None]:
+        return self._set(msg.relay_channels, on=False)
+
+    # set dimmer
+    def _on_07(self, msg: Message) -> list[RawMessage | None]:
+        return self._set(msg.dimmer_channels, dimmer=msg.dimmer_state)
+
+    # cover off, up and down
+    def _on_04(self, msg: Message) -> list[RawMessage | None]:
+        return self._set([msg.channel], status=0)
+
+    def _on_05(self, msg: Message) -> list[RawMessage | None]:
+        return self._set([msg.channel], status=1, position=0)
+
+    def _on_06(self, msg: Message) -> list[RawMessage | None]:
+        return self._set([msg.channel], status=2, position=100)
+
+    # cover position
+    def _on_1c(self, msg: Message) -> list[RawMessage | None]:
+        num = msg.channel
+        if num not in self.state:
+            return []
+        status = 1 if msg.position < self.state[num]["position"] else 2
+        return self._set([num], status=status, position=msg.position)
+
+    # set and clear led
+    def _on_f6(self, msg: Message) -> list[RawMessage | None]:
+        self._set(msg.leds, led=True)
+        return []
+
+    def _on_f5(self, msg: Message) -> list[RawMessage | None]:
+        self._set(msg.leds, led=False)
+        return []
+
+    # virtual button press
+    def _on_00(self, msg: Message) -> list[RawMessage | None]:
+        self._set(msg.closed, closed=True)
+        self._set(msg.opened, closed=False)
+        return []
+
+    def _set(self, channels: Iterable[int], **changes) -> list[RawMessage | None]:
+        frames = []
+        for num in channels:
+            state = self.state.get(num)
+            if state is None or not set(changes) <= set(state):
+                continue
+            state.update(changes)
+            if num in self.descriptor.status_channels:
+                frames.append(self._status(num))
+        return frames
+
+    def _status(self, num: int) -> RawMessage | None:
+        state = self.state.get(num, {})
+        if "on" in state:
+            return self._encode(0xFB, channel=num, status=int(state["on"]))
+        if "dimmer" in state:
+            return self._encode(0xB8, channel=num, dimmer_state=state["dimmer"])
+        if "position" in state:
+            return self._frame(
+                bytes(
+                    [
+                        0xEC,
+                        1 << (num - 1),
+                        0,
+                        state["status"],
+                        0,
+                        state["position"],
+                        0,
+                        0,
+                    ]
+                )
+            )
+        return None
+
+    def _button_status(self) -> RawMessage | None:
+        closed = [num for num, state in self.state.items() if state.get("closed")]
+        leds = [num for num, state in self.state.items() if state.get("led")]
+        return self._encode(
+            0xED,
+            closed=closed,
+            led_on=leds,
+            enabled=list(range(1, 9)),
+            normal=list(range(1, 9)),
+        )
+
+
+class _Client:
+    """
+    A connection to the simulated bus
+    """
+
+    def __init__(
+        self, write: Callable[[bytes], None], close: Callable[[], None] | None = None
+    ) -> None:
+        self.write = write
+        self.close = close
+        self.buffer = bytearray()
+
+
+class MemoryTransport(asyncio.Transport):
+    """
+    An in-memory connection between a protocol and the simulated bus
+
+    Data written by either side is delivered in a later loop iteration, like
+    a socket would, so no real I/O is needed.
+    """
+
+    def __init__(
+        self,
+        protocol: asyncio.BaseProtocol,
+        write: Callable[[bytes], None],
+        on_close: Callable[[], None],
+    ) -> None:
+        super().__init__()
+        self._loop = asyncio.get_running_loop()
+        self._protocol = protocol
+        self._write = write
+        self._on_close = on_close
+        self._closing = False
+
+    def write(self, data: bytes) -> None:
+        if not self._closing:
+            self._loop.call_soon(self._write, bytes(data))
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        if self._closing:
+            return
+        self._closing = True
+        self._on_close()
+        self._loop.call_soon(self._protocol.connection_lost, None)
+
+    def get_protocol(self) -> asyncio.BaseProtocol:
+        return self._protocol
+
+    def feed(self, data: bytes) -> None:
+        """
+        Deliver bytes from the bus to the protocol
+        """
+        if not self._closing:
+            self._loop.call_soon(self._receive, data)
+
+    def _receive(self, data: bytes) -> None:
+        if self._closing:
+            return
+        protocol = self._protocol
+        if not isinstance(protocol, asyncio.BufferedProtocol):
+            protocol.data_received(data)
+            return
+        # like the event loop, fill the buffer as far as it goes
+        while data:
+            buffer = protocol.get_buffer(len(data))
+            size = min(len(buffer), len(data))
+            buffer[:size] = data[:size]
+            protocol.buffer_updated(size)
+            data = data[size:]
+
+
+class _TcpClient(asyncio.Protocol):
+    def __init__(self, simulator: BusSimulator) -> None:
+        self._simulator = simulator
+        self._client: _Client | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._client = _Client(transport.write, transport.close)
+        self._simulator._clients.append(self._client)
+
+    def data_received(self, data: bytes) -> None:
+        self._simulator.feed(self._client, data)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self._client in self._simulator._clients:
+            self._simulator._clients.remove(self._client)
+
+
+class BusSimulator:
+    """
+    A simulated bus with modules, served over TCP or a pseudo terminal
+    """
+
+    def __init__(
+        self,
+        modules: Mapping[int, int] | None = None,
+        speed: float = 1.0,
+        baudrate: int = BUS_BAUD_RATE,
+        response_delay: float = RESPONSE_DELAY,
+        faults: FaultProfile | None = None,
+    ) -> None:
+        """
+        modules maps addresses to module types
+        """
+        self._log = logging.getLogger("velbus-simulator")
+        self.speed = speed
+        self._byte_time = BUS_BITS_PER_BYTE / baudrate
+        self._response_delay = response_delay
+        self.modules: dict[int, SimModule] = {}
+        for address, module_type in (modules or {}).items():
+            self.add_module(address, module_type)
+        self._clients: list[_Client] = []
+        # (frame, source client) in the order they go over the bus
+        self._bus: asyncio.Queue = asyncio.Queue()
+        self._bus_task: asyncio.Task | None = None
+        self._servers: list[asyncio.AbstractServer] = []
+        self._ptys: list[tuple[int, int]] = []
+        self._received = 0
+        self._sent = 0
+        self.faults = FaultProfile()
+        self._random = random.Random()
+        # fault name => number of times it happened
+        self._faults: dict[str, int] = {}
+        self.set_faults(faults or FaultProfile())
+
+    def set_faults(self, faults: FaultProfile) -> None:
+        """
+        Change the fault profile, the clean profile stops all faults
+        """
+        self.faults = faults
+        if faults.seed is not None:
+            self._random.seed(faults.seed)
+
+    def _fault(self, name: str) -> bool:
+        rate = getattr(self.faults, name)
+        if rate and self._random.random() < rate:
+            self._faults[name] = self._faults.get(name, 0) + 1
+            return True
+        return False
+
+    def change(self, address: int, channel: int, **changes) -> None:
+        """
+        Change the state of a channel on the module itself, like a local
+        button or a timer does, the module broadcasts its new status
+        """
+        self._emit(self.modules[address]._set([channel], **changes))
+
+    def add_module(self, address: int, module_type: int, **kwargs) -> SimModule:
+        """
+        Add a module, kwargs are passed on to SimModule
+        """
+        module = SimModule(address, module_type, **kwargs)
+        self.modules[address] = module
+        for sub in module.sub_addresses:
+            if sub != 0xFF:
+                self.modules[sub] = module
+        return module
+
+    def _start(self) -> None:
+        if self._bus_task is None or self._bus_task.done():
+            self._bus_task = asyncio.ensure_future(self._run_bus())
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """
+        Serve the bus on a TCP port, returns the port
+        """
+        self._start()
+        server = await asyncio.get_running_loop().create_server(
+            lambda: _TcpClient(self), host, port
+        )
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    def open_pty(self) -> str:
+        """
+        Serve the bus on a pseudo terminal, returns the device path
+
+        Only available on POSIX systems.
+        """
+        import tty
+
+        self._start()
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        os.set_blocking(master, False)
+        client = _Client(lambda data: self._write_pty(master, data))
+        self._clients.append(client)
+        asyncio.get_running_loop().add_reader(master, self._read_pty, master, client)
+        # keep the slave open, reading the master fails while nobody has it
+        self._ptys.append((master, slave))
+        return os.ttyname(slave)
+
+    def connect(self, protocol: asyncio.BaseProtocol) -> MemoryTransport:
+        """
+        Connect a protocol to the bus in memory, without a socket
+
+        connection_made of the protocol is called with the transport.
+        """
+        self._start()
+        client = _Client(lambda data: None)
+
+        def on_close() -> None:
+            if client in self._clients:
+                self._clients.remove(client)
+
+        transport = MemoryTransport(
+            protocol, lambda data: self.feed(client, data), on_close
+        )
+        client.write = transport.feed
+        client.close = transport.close
+        self._clients.append(client)
+        protocol.connection_made(transport)
+        return transport
+
+    def _read_pty(self, master: int, client: _Client) -> None:
+        try:
+            data = os.read(master, 1024)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as err:
+            self._log.warning(f"Pseudo terminal closed: {err}")
+            asyncio.get_running_loop().remove_reader(master)
+            return
+        self.feed(client, data)
+
+    def _write_pty(self, master: int, data: bytes) -> None:
+        try:
+            os.write(master, data)
+        except OSError as err:
+            self._log.warning(f"Could not write to the pseudo terminal: {err}")
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        loop = asyncio.get_running_loop()
+        for master, slave in self._ptys:
+            loop.remove_reader(master)
+            os.close(master)
+            os.close(slave)
+        self._ptys = []
+        self._clients = []
+        if self._bus_task is not None:
+            self._bus_task.cancel()
+            try:
+                await self._bus_task
+            except asyncio.CancelledError:
+                pass
+            self._bus_task = None
+
+    def feed(self, client: _Client | None, data: bytes) -> None:
+        """
+        Handle bytes written to the bus by a client
+        """
+        if client is None:
+            return
+        client.buffer += data
+        while True:
+            frame, remaining = create_message_info(client.buffer)
+            client.buffer = bytearray(remaining)
+            if frame is None:
+                return
+            self._received += 1
+            self._bus.put_nowait((frame, client))
+
+    def emit(self, frame: RawMessage) -> None:
+        """
+        Put a frame on the bus, as if a module sent it
+        """
+        self._sent += 1
+        self._bus.put_nowait((frame, None))
+
+    async def _run_bus(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            frame, source = await self._bus.get()
+            data = frame.to_bytes()
+            for client in list(self._clients):
+                if client is not source:
+                    await self._deliver(client, data)
+            if self.speed:
+                await asyncio.sleep(len(data) * self._byte_time * self.speed)
+            if source is None:
+                continue
+            module = self.modules.get(frame.address)
+            if module is None:
+                continue
+            if self._fault("buffer_full"):
+                # the module lost the request
+                replies = [RawMessage(PRIORITY_HIGH, module.address, False, b"\x0b")]
+                replies *= STORM_FRAMES
+                replies.append(
+                    RawMessage(PRIORITY_HIGH, module.address, False, b"\x0c")
+                )
+            else:
+                replies = module.handle(frame)
+            if not replies:
+                continue
+            delay = self._response_delay * self.speed
+            if self.faults.delay:
+                delay += self._random.uniform(0, self.faults.delay)
+            if delay:
+                loop.call_later(delay, self._emit, replies)
+            else:
+                self._emit(replies)
+
+    async def _deliver(self, client: _Client, data: bytes) -> None:
+        """
+        Write a frame to a client, through the fault profile
+        """
+        if self._fault("disconnect") and client.close is not None:
+            self._clients.remove(client)
+            client.close()
+            return
+        if self._fault("drop"):
+            return
+        if self._fault("corrupt"):
+            # the checksum byte
+            data = data[:-2] + bytes([data[-2] ^ 0xFF]) + data[-1:]
+        if self._fault("garbage"):
+            size = self._random.randint(1, 8)
+            data = bytes(self._random.randrange(256) for _ in range(size)) + data
+        if self._fault("split"):
+            cut = self._random.randint(1, len(data) - 1)
+            client.write(data[:cut])
+            await asyncio.sleep(SPLIT_PAUSE)
+            data = data[cut:]
+            if client not in self._clients:
+                return
+        client.write(data)
+
+    def _emit(self, frames: list[RawMessage]) -> None:
+        for frame in frames:
+            self.emit(frame)
+
+    def stats(self) -> dict:
+        """
+        Frames received from the clients and sent by the modules, and how
+        often every fault happened
+        """
+        return {
+            "clients": len(self._clients),
+            "received": self._received,
+            "sent": self._sent,
+            "faults": dict(self._faults),
+        }
+
+
+def _module_spec(value: str) -> tuple[int, int]:
+    address, module_type = value.split(":")
+    return int(address, 0), int(module_type, 0)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    simulator = BusSimulator(
+        dict(args.module), speed=args.speed, faults=FAULT_PROFILES[args.faults]
+    )
+    if args.pty:
+        print(f"Serving the bus on {simulator.open_pty()}")
+    port = await simulator.serve_tcp(args.host, args.port)
+    print(f"Serving the bus on {args.host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6000)
+    parser.add_argument(
+        "--pty", action="store_true", help="Serve on a pseudo terminal too"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Timing factor, 0 is instant"
+    )
+    parser.add_argument("--faults", choices=sorted(FAULT_PROFILES), default="clean")
+    parser.add_argument(
+        "--module",
+        type=_module_spec,
+        action="append",
+        required=True,
+        help="A module as address:type, for example 0x01:0x10",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Metrics helpers
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Iterable
+
+# upper bounds in seconds, from a fast tcp round trip to a slow scan
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    Histogram with fixed bucket bounds
+
+    Observing a value is one bisect and a few additions, nothing is kept per
+    observation. Percentiles are the upper bound of the bucket they fall in.
+    """
+
+    def __init__(self, bounds: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self._bounds = tuple(bounds)
+        # the last bucket counts everything above the highest bound
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def add_counts(self, counts: Iterable[int], total: float, maximum: float) -> None:
+        """
+        Add values that were counted elsewhere, per bucket like buckets()
+        but not cumulative, with their sum and maximum
+        """
+        counts = list(counts)
+        if len(counts) != len(self._counts):
+            raise ValueError("The bucket counts do not match the bounds")
+        for num, count in enumerate(counts):
+            self._counts[num] += count
+        self.count += sum(counts)
+        self.sum += total
+        if maximum > self.max:
+            self.max = maximum
+
+    def percentile(self, q: float) -> float | None:
+        """
+        The bucket bound below which q percent of the values are
+        """
+        if not self.count:
+            return None
+        rank = self.count * q / 100
+        seen = 0
+        for bound, count in zip(self._bounds, self._counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def buckets(self) -> list[tuple[float, int]]:
+        """
+        Cumulative counts per upper bound, the last bound is infinity
+        """
+        result = []
+        seen = 0
+        for bound, count in zip((*self._bounds, float("inf")), self._counts):
+            seen += count
+            result.append((bound, seen))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+# upper bounds in seconds for the stages of the receive and send path
+STAGE_BUCKETS = (
+    0.000001,
+    0.0000025,
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.1,
+    1.0,
+)
+
+
+class StageMetrics:
+    """
+    Latency histograms per stage of the hot paths, and counters
+
+    The stages of a received frame: read (a chunk from the transport),
+    frame (parsing one frame), lookup (the handler finding the module and
+    message class), decode, dispatch (the module message handler, fanout
+    included), fanout (the channel callbacks) and receive (parsed frame to
+    the last callback). Of a sent frame: enqueue (encoding and queueing),
+    wait (in the send queue) and write.
+
+    The components only hold a reference when the instrumentation is on, a
+    None check is all it costs otherwise.
+    """
+
+    def __init__(self, bounds: Iterable[float] = STAGE_BUCKETS) -> None:
+        self._bounds = tuple(bounds)
+        self.stages: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram(self._bounds)
+        histogram.observe(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        return {
+            "stages": {
+                stage: {**histogram.snapshot(), "buckets": histogram.buckets()}
+                for stage, histogram in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
@@ -0,0 +1,212 @@
+"""
+Single file cache store
+
+All cached module data lives in one sqlite database in the cache directory:
+the module identity (type, serial and firmware), the sub addresses, the
+module and channel names. Every flush is one transaction, a crash never
+leaves a half written module behind. The channel state is kept in the state
+journal.
+
+The old layout, one <address>.json file per module, is imported once.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Iterable
+
+STORE_FILE = "velbus.sqlite"
+SCHEMA_VERSION = 2
+
+# schema version => statements to get there from the previous version
+MIGRATIONS: dict[int, tuple[str, ...]] = {
+    1: (
+        """CREATE TABLE modules (
+            address INTEGER PRIMARY KEY,
+            type INTEGER,
+            serial INTEGER,
+            memorymap INTEGER,
+            build_year INTEGER,
+            build_week INTEGER,
+            name TEXT,
+            sub_addresses TEXT NOT NULL DEFAULT '{}'
+        )""",
+        """CREATE TABLE channels (
+            address INTEGER NOT NULL,
+            num INTEGER NOT NULL,
+            type TEXT,
+            name TEXT,
+            unit TEXT,
+            state TEXT NOT NULL DEFAULT '{}',
+            PRIMARY KEY (address, num)
+        )""",
+        "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+    ),
+    # the channel state moved to the state journal
+    2: (
+        """CREATE TABLE channels_v2 (
+            address INTEGER NOT NULL,
+            num INTEGER NOT NULL,
+            type TEXT,
+            name TEXT,
+            unit TEXT,
+            PRIMARY KEY (address, num)
+        )""",
+        "INSERT INTO channels_v2"
+        " SELECT address, num, type, name, unit FROM channels",
+        "DROP TABLE channels",
+        "ALTER TABLE channels_v2 RENAME TO channels",
+    ),
+}
+
+MODULE_COLUMNS = ("type", "serial", "memorymap", "build_year", "build_week")
+
+
+class CacheStore:
+    """
+    The sqlite cache database
+
+    Records use the format of Module.to_cache().
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self._log = logging.getLogger("velbus-store")
+        self._cache_dir = cache_dir
+        self._path = os.path.join(cache_dir, STORE_FILE)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def open(self) -> None:
+        """
+        Open the database, create or upgrade the schema and import json files
+        """
+        with self._lock:
+            if self._conn is not None:
+                return
+            try:
+                self._conn = self._connect()
+            except sqlite3.DatabaseError as err:
+                # the cache can always be rebuilt from the bus
+                self._log.warning(f"Cache store unusable, starting over: {err}")
+                os.replace(self._path, f"{self._path}.corrupt")
+                self._conn = self._connect()
+            self._import_json()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            conn.close()
+            raise sqlite3.DatabaseError(f"unknown schema version {version}")
+        with conn:
+            for step in range(version + 1, SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS[step]:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {step}")
+        return conn
+
+    def _import_json(self) -> None:
+        assert self._conn is not None
+        if self._conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'json_import'"
+        ).fetchone():
+            return
+        records = {}
+        for fname in os.listdir(self._cache_dir):
+            base, ext = os.path.splitext(fname)
+            if ext != ".json" or not base.isdigit():
+                continue
+            try:
+                with open(os.path.join(self._cache_dir, fname)) as fl:
+                    records[int(base)] = json.load(fl)
+            except (OSError, ValueError) as err:
+                self._log.warning(f"Skipping cache file {fname}: {err}")
+        with self._conn:
+            self._save(records, ())
+            self._conn.execute("INSERT INTO meta VALUES ('json_import', '1')")
+        if records:
+            self._log.info(f"Imported {len(records)} modules from the json cache")
+
+    def load_all(self) -> dict[int, dict]:
+        """
+        Read all modules with their channels in one query
+        """
+        assert self._conn is not None
+        records: dict[int, dict] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT m.address, m.type, m.serial, m.memorymap, m.build_year,"
+                " m.build_week, m.name, m.sub_addresses,"
+                " c.num, c.type, c.name, c.unit"
+                " FROM modules m LEFT JOIN channels c ON c.address = m.address"
+                " ORDER BY m.address, c.num"
+            ).fetchall()
+        for row in rows:
+            address = row[0]
+            record = records.get(address)
+            if record is None:
+                record = dict(zip(MODULE_COLUMNS, row[1:6]))
+                if row[6] is not None:
+                    record["name"] = row[6]
+                record["sub_addresses"] = {
+                    int(num): addr for num, addr in json.loads(row[7]).items()
+                }
+                record["channels"] = {}
+                records[address] = record
+            if row[8] is None:
+                continue
+            chan = {"name": row[10], "type": row[9]}
+            if row[11] is not None:
+                chan["Unit"] = row[11]
+            record["channels"][row[8]] = chan
+        return records
+
+    def save(self, records: dict[int, dict], deleted: Iterable[int] = ()) -> None:
+        """
+        Replace the given modules and delete others, in one transaction
+        """
+        assert self._conn is not None
+        with self._lock, self._conn:
+            self._save(records, deleted)
+
+    def _save(self, records: dict[int, dict], deleted: Iterable[int]) -> None:
+        assert self._conn is not None
+        addresses = [(addr,) for addr in (*deleted, *records)]
+        self._conn.executemany("DELETE FROM modules WHERE address = ?", addresses)
+        self._conn.executemany("DELETE FROM channels WHERE address = ?", addresses)
+        self._conn.executemany(
+            "INSERT INTO modules VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    addr,
+                    *(rec.get(col) for col in MODULE_COLUMNS),
+                    rec["name"] if isinstance(rec.get("name"), str) else None,
+                    json.dumps(rec.get("sub_addresses", {})),
+                )
+                for addr, rec in records.items()
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO channels VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    addr,
+                    int(num),
+                    chan.get("type"),
+                    chan.get("name"),
+                    chan.get("Unit"),
+                )
+                for addr, rec in records.items()
+                for num, chan in rec.get("channels", {}).items()
+            ],
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,99 @@
+"""
+Sampled frame trace
+
+Logging every frame slows a busy bus down and floods the log. The tracer
+logs one in sample frames, received and sent, as a structured record on the
+velbus-trace logger, at most limit records per second. The record message
+is a json line, the fields are also in the velbus attribute of the record:
+
+    velbus.start_trace(sample=10)
+    logging.getLogger("velbus-trace").setLevel(logging.DEBUG)
+
+Until it is started, a trace costs the protocol a None check per frame.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Callable
+
+from velbusaio.capture import TX
+from velbusaio.const import TRACE_RATE_LIMIT, TRACE_SAMPLE
+from velbusaio.raw_message import RawMessage
+
+
+class _JsonLine:
+    """
+    Dumps the fields when the record is formatted, not when it is created
+    """
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict) -> None:
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return json.dumps(self.fields, separators=(",", ":"))
+
+
+class FrameTracer:
+    """
+    Log a sample of the frames, limit 0 is no rate limit
+    """
+
+    def __init__(
+        self,
+        sample: int = TRACE_SAMPLE,
+        limit: int = TRACE_RATE_LIMIT,
+        level: int = logging.DEBUG,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._log = logging.getLogger("velbus-trace")
+        self._sample = max(sample, 1)
+        self._limit = limit
+        self._level = level
+        self._clock = clock
+        self._frames = 0
+        self._logged = 0
+        self._dropped = 0
+        self._second = 0
+        self._in_second = 0
+
+    def frame(self, direction: int, msg: RawMessage) -> None:
+        self._frames += 1
+        if self._frames % self._sample:
+            return
+        if not self._log.isEnabledFor(self._level):
+            return
+        now = self._clock()
+        if self._limit:
+            second = int(now)
+            if second != self._second:
+                self._second = second
+                self._in_second = 0
+            if self._in_second >= self._limit:
+                self._dropped += 1
+                return
+            self._in_second += 1
+        fields = {
+            "seq": self._frames,
+            "time": now,
+            "dir": "tx" if direction == TX else "rx",
+            "priority": msg.priority,
+            "address": msg.address,
+            "rtr": msg.rtr,
+            "command": msg.command,
+            "data": msg.data.hex(),
+        }
+        self._log.log(self._level, "%s", _JsonLine(fields), extra={"velbus": fields})
+        self._logged += 1
+
+    def stats(self) -> dict:
+        return {
+            "sample": self._sample,
+            "frames": self._frames,
+            "logged": self._logged,
+            "dropped": self._dropped,
+        }
@@ -0,0 +1,240 @@
+"""
+Bus traffic accounting
+
+The protocol counts every frame it receives and sends in a ring of one
+second slots: frames and bytes per direction, per priority, per address and
+per command. A slot is cleared when the ring comes round to it again, so the
+memory use is fixed, whatever the uptime. The rates are the totals of the
+slots of a window, divided by the seconds it covers.
+
+The bus occupancy is estimated from the frame lengths: every byte takes
+BUS_BITS_PER_BYTE bits at BUS_BAUD_RATE. Received frames carry the address
+of the module that sent them, sent frames the address of the module they
+are for.
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from operator import add
+from typing import Callable
+
+from velbusaio.capture import RX, TX
+from velbusaio.const import (
+    BUS_BAUD_RATE,
+    BUS_BITS_PER_BYTE,
+    HEADER_LENGTH,
+    TAIL_LENGTH,
+    TRAFFIC_SLOTS,
+)
+from velbusaio.raw_message import RawMessage
+
+# the priorities are 0xF8 to 0xFB
+PRIORITY_MASK = 0x03
+PRIORITY_BASE = 0xF8
+DIRECTIONS = {RX: "rx", TX: "tx"}
+
+
+def _zeros(size: int) -> array:
+    return array("I", bytes(4 * size))
+
+
+class _Slot:
+    """
+    The counters of one second
+    """
+
+    __slots__ = (
+        "second",
+        "frames",
+        "bytes",
+        "priority_frames",
+        "priority_bytes",
+        "address_frames",
+        "address_bytes",
+        "command_frames",
+        "command_bytes",
+    )
+
+    def __init__(self) -> None:
+        self.second: int | None = None
+        self.frames = _zeros(2)
+        self.bytes = _zeros(2)
+        self.priority_frames = _zeros(4)
+        self.priority_bytes = _zeros(4)
+        # direction * 256 + address
+        self.address_frames = _zeros(512)
+        self.address_bytes = _zeros(512)
+        self.command_frames = _zeros(256)
+        self.command_bytes = _zeros(256)
+
+    def reset(self, second: int) -> None:
+        self.second = second
+        for name in self.__slots__[1:]:
+            counts = getattr(self, name)
+            counts[:] = _zeros(len(counts))
+
+
+class TrafficMonitor:
+    """
+    Rolling frame and byte counters of the bus
+
+    clock returns seconds, time.monotonic by default.
+    """
+
+    def __init__(
+        self,
+        slots: int = TRAFFIC_SLOTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._slots = [_Slot() for _ in range(max(slots, 1))]
+        self._started = clock()
+        # since the start, per direction
+        self._frames = [0, 0]
+        self._bytes = [0, 0]
+
+    @property
+    def slots(self) -> int:
+        return len(self._slots)
+
+    def record(self, direction: int, msg: RawMessage) -> None:
+        """
+        Count a received (RX) or sent (TX) frame
+        """
+        second = int(self._clock())
+        slot = self._slots[second % len(self._slots)]
+        if slot.second != second:
+            slot.reset(second)
+        size = len(msg.data) + HEADER_LENGTH + TAIL_LENGTH
+        self._frames[direction] += 1
+        self._bytes[direction] += size
+        slot.frames[direction] += 1
+        slot.bytes[direction] += size
+        priority = msg.priority & PRIORITY_MASK
+        slot.priority_frames[priority] += 1
+        slot.priority_bytes[priority] += size
+        address = direction * 256 + msg.address
+        slot.address_frames[address] += 1
+        slot.address_bytes[address] += size
+        if msg.data:
+            command = msg.data[0]
+            slot.command_frames[command] += 1
+            slot.command_bytes[command] += size
+
+    def totals(self) -> dict:
+        """
+        Frames and bytes per direction since the start
+        """
+        return {
+            name: {"frames": self._frames[direction], "bytes": self._bytes[direction]}
+            for direction, name in DIRECTIONS.items()
+        }
+
+    def _window(self, window: float) -> tuple[list[_Slot], float]:
+        """
+        The slots of the last window seconds, and the seconds they cover
+        """
+        window = max(1, min(int(window), len(self._slots)))
+        now = self._clock()
+        second = int(now)
+        slots = [
+            slot
+            for slot in self._slots
+            if slot.second is not None and second - window < slot.second <= second
+        ]
+        # the current second is not over yet, the monitor can be younger
+        span = min(window - 1 + now - second, now - self._started)
+        return slots, max(span, 1e-3)
+
+    def _totals(self, slots: list[_Slot], name: str) -> list[int]:
+        total = [0] * len(getattr(self._slots[0], name))
+        for slot in slots:
+            total = list(map(add, total, getattr(slot, name)))
+        return total
+
+    def occupancy(self, window: float = 10) -> float:
+        """
+        The estimated share of the bus capacity in use, 0 to 1
+        """
+        slots, span = self._window(window)
+        total = sum(sum(slot.bytes) for slot in slots)
+        return total * BUS_BITS_PER_BYTE / (BUS_BAUD_RATE * span)
+
+    def rates(self, window: float = 10) -> dict:
+        """
+        Frames and bytes per second over the last window seconds
+        """
+        slots, span = self._window(window)
+        frames = self._totals(slots, "frames")
+        sizes = self._totals(slots, "bytes")
+        result = {
+            "window": span,
+            "occupancy": sum(sizes) * BUS_BITS_PER_BYTE / (BUS_BAUD_RATE * span),
+            "frames_per_sec": {
+                name: frames[direction] / span for direction, name in DIRECTIONS.items()
+            },
+            "bytes_per_sec": {
+                name: sizes[direction] / span for direction, name in DIRECTIONS.items()
+            },
+        }
+        frames = self._totals(slots, "priority_frames")
+        sizes = self._totals(slots, "priority_bytes")
+        result["priorities"] = {
+            PRIORITY_BASE
+            | priority: {
+                "frames_per_sec": frames[priority] / span,
+                "bytes_per_sec": sizes[priority] / span,
+            }
+            for priority in range(4)
+            if frames[priority]
+        }
+        frames = self._totals(slots, "address_frames")
+        sizes = self._totals(slots, "address_bytes")
+        addresses: dict[int, dict] = {}
+        for index, count in enumerate(frames):
+            if not count:
+                continue
+            direction, address = divmod(index, 256)
+            rates = addresses.setdefault(address, {})
+            name = DIRECTIONS[direction]
+            rates[f"{name}_frames_per_sec"] = count / span
+            rates[f"{name}_bytes_per_sec"] = sizes[index] / span
+        result["addresses"] = addresses
+        frames = self._totals(slots, "command_frames")
+        sizes = self._totals(slots, "command_bytes")
+        result["commands"] = {
+            command: {
+                "frames_per_sec": frames[command] / span,
+                "bytes_per_sec": sizes[command] / span,
+            }
+            for command in range(256)
+            if frames[command]
+        }
+        return result
+
+    def top_talkers(self, count: int = 5, window: float = 60) -> list[dict]:
+        """
+        The addresses with the most bytes on the bus in the last window
+        seconds, both directions, the busiest first
+        """
+        slots, span = self._window(window)
+        frames = self._totals(slots, "address_frames")
+        sizes = self._totals(slots, "address_bytes")
+        total = sum(sizes)
+        talkers = []
+        for address in range(256):
+            size = sizes[address] + sizes[256 + address]
+            if not size:
+                continue
+            talkers.append(
+                {
+                    "address": address,
+                    "frames_per_sec": (frames[address] + frames[256 + address]) / span,
+                    "bytes_per_sec": size / span,
+                    "share": size / total,
+                }
+            )
+        talkers.sort(key=lambda talker: talker["bytes_per_sec"], reverse=True)
+        return talkers[:count]
@@ -0,0 +1,235 @@
+"""
+Virtual time
+
+The scan, the send pacing, the refresh and the button releases all wait on
+the event loop clock. VirtualClockLoop is an event loop whose clock only
+moves when there is nothing to do: instead of sleeping until the next timer
+it jumps to it. Together with the in-memory connection of the bus simulator
+a scan of all 254 addresses, with the real timeouts, takes a fraction of a
+second, and the result does not depend on the speed of the machine.
+
+Work in an executor is waited for in real time, the clock stands still
+meanwhile. Real sockets and pipes still work, but time does not wait for
+them, so use the in-memory connection.
+
+    def test_scan():
+        async def main():
+            simulator = BusSimulator({1: 0x10})
+            velbus = Velbus("", cache_dir=tmp)
+            await connect(velbus, simulator)
+            ...
+        run(main())
+
+The command line sweeps the scan timeout:
+
+    python -m velbusaio.virtual_clock --timeout 100 --timeout 500 --module 1:0x10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import selectors
+import tempfile
+from typing import Awaitable, Iterable, Mapping, TypeVar
+
+import velbusaio.handler
+from velbusaio.controller import Velbus
+from velbusaio.simulator import BusSimulator
+
+T = TypeVar("T")
+
+# virtual seconds after which measure_scan gives up
+SCAN_LIMIT = 3600.0
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    """
+    A selector that advances the clock instead of waiting for its timeout
+    """
+
+    def __init__(self, loop: VirtualClockLoop) -> None:
+        self._loop = loop
+        self._selector = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._selector.modify(fileobj, events, data)
+
+    def select(self, timeout: float | None = None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None or self._loop._executor_jobs:
+            # nothing is scheduled, or a thread will wake us up
+            return self._selector.select(timeout)
+        self._loop._now += timeout
+        return []
+
+    def close(self) -> None:
+        self._selector.close()
+
+    def get_map(self):
+        return self._selector.get_map()
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop with a clock that jumps to the next timer
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+        self._executor_jobs = 0
+        super().__init__(_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        """
+        Move the clock forward, the timers that are due run next
+        """
+        self._now += seconds
+
+    def run_in_executor(self, executor, func, *args) -> asyncio.Future:
+        future = super().run_in_executor(executor, func, *args)
+        self._executor_jobs += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, future: asyncio.Future) -> None:
+        self._executor_jobs -= 1
+
+
+def run(main: Awaitable[T], start: float = 0.0) -> T:
+    """
+    Run a coroutine on a new VirtualClockLoop, like asyncio.run
+    """
+    loop = VirtualClockLoop(start)
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+async def connect(velbus: Velbus, simulator: BusSimulator, scan: bool = True) -> None:
+    """
+    Connect the controller to the simulator in memory
+
+    Does what Velbus.connect does after opening the connection: with scan
+    the bus is scanned and the refresh is started.
+    """
+    await velbus._handler.read_protocol_data()
+    await velbus._cache.load()
+    simulator.connect(velbus._protocol)
+    if not scan:
+        return
+    await velbus._handler.scan()
+    if velbus._refresh_enabled:
+        velbus._refresh.start()
+
+
+async def measure_scan(
+    modules: Mapping[int, int],
+    speed: float = 1.0,
+    cache_dir: str | None = None,
+    limit: float = SCAN_LIMIT,
+) -> dict:
+    """
+    Scan a simulated bus, returns the virtual seconds it took and the
+    modules that were found and loaded
+
+    A scan that takes longer than limit virtual seconds is stopped, its
+    duration is None.
+    """
+    loop = asyncio.get_running_loop()
+    simulator = BusSimulator(modules, speed=speed)
+    with tempfile.TemporaryDirectory() as tmp:
+        velbus = Velbus("", cache_dir=cache_dir or tmp, refresh=False)
+        start = loop.time()
+        try:
+            await asyncio.wait_for(connect(velbus, simulator), limit)
+            duration: float | None = loop.time() - start
+        except asyncio.TimeoutError:
+            duration = None
+        found = sorted(velbus.get_modules())
+        loaded = sorted(
+            address
+            for address, module in velbus.get_modules().items()
+            if module.is_loaded()
+        )
+        await velbus.stop()
+        await simulator.close()
+    return {
+        "duration": duration,
+        "found": found,
+        "loaded": loaded,
+        "frames": simulator.stats()["received"],
+    }
+
+
+def sweep(
+    timeouts: Iterable[int], modules: Mapping[int, int], speed: float = 1.0
+) -> list[dict]:
+    """
+    Scan the bus once for every module type timeout, in milliseconds
+    """
+    original = velbusaio.handler.SCAN_MODULETYPE_TIMEOUT
+    results = []
+    try:
+        for timeout in timeouts:
+            velbusaio.handler.SCAN_MODULETYPE_TIMEOUT = timeout
+            result = run(measure_scan(modules, speed))
+            results.append({"timeout": timeout, **result})
+    finally:
+        velbusaio.handler.SCAN_MODULETYPE_TIMEOUT = original
+    return results
+
+
+def _module_spec(value: str) -> tuple[int, int]:
+    address, module_type = value.split(":")
+    return int(address, 0), int(module_type, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        action="append",
+        help="Module type timeout of the scan in milliseconds, can be repeated",
+    )
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument(
+        "--module",
+        type=_module_spec,
+        action="append",
+        required=True,
+        help="A module as address:type, for example 0x01:0x10",
+    )
+    args = parser.parse_args()
+    timeouts = args.timeout or [velbusaio.handler.SCAN_MODULETYPE_TIMEOUT]
+    for result in sweep(timeouts, dict(args.module), args.speed):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()